@@ -0,0 +1,5 @@
+"""Run the command benchmarks: ``python -m benchmarks --iterations 100 --output bench_output.json``."""
+
+from .harness import main
+
+main()
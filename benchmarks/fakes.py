@@ -0,0 +1,186 @@
+"""Stand-ins for Discord and the bot's backends, used to drive commands offline.
+
+The fakes implement just the parts of ``discord.Interaction`` and friends the
+commands touch, and record when the user would first see a response.
+"""
+# ruff: noqa: D102
+
+import itertools
+import json
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class FakeUser:
+    """Stand-in for ``discord.User``/``discord.Member``."""
+
+    id: int = field(default_factory=lambda: next(_ids))
+    name: str = "bench"
+
+    @property
+    def global_name(self) -> str:
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+@dataclass
+class FakeGuild:
+    """Stand-in for ``discord.Guild``."""
+
+    id: int
+    name: str = "Benchmark guild"
+    members: list[FakeUser] = field(default_factory=list)
+
+
+class FakeMessage:
+    """Stand-in for ``discord.WebhookMessage``."""
+
+    def __init__(self, content: str | None = None) -> None:
+        self.content = content or ""
+
+    async def edit(self, **kwargs: object) -> "FakeMessage":
+        self.content = kwargs.get("content", self.content)
+        return self
+
+    async def delete(self) -> None:
+        pass
+
+
+class FakeResponse:
+    """Stand-in for ``discord.InteractionResponse``."""
+
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content: str | None = None, **kwargs: object) -> None:
+        self._done = True
+        self._interaction.sent(content, visible=_visible(content, kwargs))
+
+    async def defer(self, **_: object) -> None:
+        # "Thinking..." acknowledges the command but shows the user nothing yet.
+        self._done = True
+        self._interaction.sent(None, visible=False)
+
+    async def send_modal(self, _: object) -> None:
+        self._done = True
+        self._interaction.sent(None)
+
+
+def _visible(content: str | None, kwargs: dict[str, object]) -> bool:
+    """Return True if a message sent with ``content`` and ``kwargs`` shows the user something."""
+    return content is not None or any(kwargs.get(key) for key in ("embed", "embeds", "file", "files", "view"))
+
+
+class FakeFollowup:
+    """Stand-in for the interaction's ``discord.Webhook``."""
+
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+
+    async def send(self, content: str | None = None, **kwargs: object) -> FakeMessage:
+        self._interaction.sent(content, visible=_visible(content, kwargs))
+        return FakeMessage(content)
+
+
+class FakeInteraction:
+    """Stand-in for ``discord.Interaction``.
+
+    Attributes
+    ----------
+    received (float): ``perf_counter`` time the interaction was created.
+    first_response (float | None): Time of the first message or modal shown to the user, deferring doesn't count.
+    messages (list[str | None]): Everything sent, in order.
+
+    """
+
+    def __init__(self, *, guild: FakeGuild, user: FakeUser) -> None:
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.message = FakeMessage()
+        self.messages: list[str | None] = []
+        self.received = time.perf_counter()
+        self.first_response: float | None = None
+
+    def sent(self, content: str | None, *, visible: bool = True) -> None:
+        """Record a response, stamping ``first_response`` if it is the first ``visible`` one."""
+        if visible and self.first_response is None:
+            self.first_response = time.perf_counter()
+        self.messages.append(content)
+
+    async def delete_original_response(self) -> None:
+        pass
+
+    async def edit_original_response(self, **_: object) -> FakeMessage:
+        return self.message
+
+
+class FakeTree:
+    """Stand-in for ``app_commands.CommandTree`` collecting the command callbacks."""
+
+    def __init__(self) -> None:
+        self.commands: dict[str, Callable[..., Awaitable[None]]] = {}
+
+    def command(self, *, name: str, **_: object) -> Callable:
+        def register(callback: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+            self.commands[name] = callback
+            return callback
+
+        return register
+
+
+class FakeModel:
+    """Stand-in for the Gemini model used by ``/rabbit-hole``."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate_content_async(self, text: str) -> SimpleNamespace:
+        self.calls += 1
+        summary = {
+            "Intro": text[:200],
+            "Sections": {"Overview": [text[:100]]},
+            "Categories": [],
+        }
+        return SimpleNamespace(text=json.dumps(summary))
+
+
+class Counting:
+    """Proxy counting the calls made to an object's methods.
+
+    Attributes
+    ----------
+    calls (Counter[str]): Calls per method name.
+
+    """
+
+    def __init__(self, target: object) -> None:
+        self._target = target
+        self.calls: Counter[str] = Counter()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        def counted(*args: object, **kwargs: object) -> object:
+            self.calls[name] += 1
+            return attribute(*args, **kwargs)
+
+        return counted
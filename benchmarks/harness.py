@@ -0,0 +1,348 @@
+"""End-to-end command latency benchmarks.
+
+Every command registered by a ``cmds.<name>.main(tree)`` is driven with a fake
+``discord.Interaction``. Nothing leaves the box:
+
+- articles come from a synthetic ``wiki.dump`` backend;
+- HTTP calls go to the ``tests.standin`` server, with optional injected latency;
+- the scoring database is a SQLite file in the scratch directory;
+- Gemini is replaced by a canned model.
+
+Each command is run ``iterations`` times. For each one the harness reports
+p50/p95/p99 of the time to the first visible response and of the whole
+callback, the number of upstream calls per run, and the memory allocated by
+one extra run traced with ``tracemalloc``.
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from tests.standin import StandIn
+
+from .fakes import Counting, FakeGuild, FakeInteraction, FakeModel, FakeTree, FakeUser
+
+ROOT = Path(__file__).resolve().parent.parent
+COMMANDS = ("wiki-guesser", "wiki-animal", "wiki-search", "leaderboard", "rabbit-hole")
+# Command name -> module in ``cmds`` registering it.
+MODULES = {
+    "wiki-guesser": "wikiguesser",
+    "wiki-animal": "wikianimal",
+    "wiki-search": "wikisearch",
+    "wiki-random": "wikirandom",
+    "leaderboard": "leaderboard",
+    "rabbit-hole": "rabbit_hole",
+}
+GUILD_ID = 1234
+ANIMAL = "Gray wolf"
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def corpus(size: int, *, seed: int = 0) -> Iterator[dict]:
+    """Yield ``size`` synthetic articles (plus the ones the commands ask for by name) as dump lines."""
+    rng = random.Random(seed)  # noqa: S311
+    words = ["river", "castle", "theory", "galaxy", "festival", "treaty", "engine", "island", "dynasty", "opera"]
+    titles = [f"{rng.choice(words).title()} {rng.choice(words)} {number}" for number in range(size)]
+    titles += ["Python (programming language)", ANIMAL, "Rickrolling"]
+
+    for pageid, title in enumerate(titles, start=1):
+        sentences = [f"{title} is a {rng.choice(words)} of the {rng.choice(words)}." for _ in range(12)]
+        yield {
+            "pageid": pageid,
+            "title": title,
+            "revid": pageid * 10,
+            "url": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+            "extract": " ".join(sentences),
+            "image_url": f"https://upload.wikimedia.org/{pageid}.png",
+            "links": rng.sample(titles, 60),
+            "categories": [f"{rng.choice(words).title()}s"],
+            "redirects": [title.lower()],
+            "views": rng.randint(0, 100_000),
+        }
+
+
+class Bench:
+    """The bot wired to stand-in backends.
+
+    Attributes
+    ----------
+    standin (StandIn): The HTTP stand-in.
+    database (DatabaseController | None): The scoring database, once started.
+    model (FakeModel): The Gemini stand-in.
+    commands (dict[str, Callable]): Command name -> callback.
+
+    """
+
+    def __init__(self, workdir: Path, *, latency: float = 0.0, corpus_size: int = 2_000) -> None:
+        """Initialize the Bench.
+
+        Args:
+        ----
+        workdir (Path): Scratch directory for the dump, caches and scoring database.
+        latency (float): Seconds the HTTP stand-in waits before every response.
+        corpus_size (int): Number of synthetic articles in the dump.
+
+        """
+        self.workdir = workdir
+        self.standin = StandIn(workdir / "recordings.jsonl", latency=latency)
+        self.database: Any = None
+        self.model = FakeModel()
+        self.commands: dict[str, Callable[..., Awaitable[None]]] = {}
+        self.corpus_size = corpus_size
+        self._backend: Counting | None = None
+        self._storage: Counting | None = None
+
+    async def start(self, commands: tuple[str, ...] = COMMANDS) -> None:
+        """Start the stand-in, point the bot at it and register the commands."""
+        await self.standin.start()
+        self._record_site()
+        self._record_animal()
+
+        dump = self.workdir / "bench.dump"
+        environ = {
+            **self.standin.environ(),
+            "DATABASE_BACKEND": "sqlite",
+            "DATABASE_PATH": str(self.workdir / "scores.sqlite3"),
+            "GEMINI_API_KEY": "bench",
+            "PYWIKIBOT_NO_USER_CONFIG": "1",
+            "WIKI_BACKEND": "dump",
+            "WIKI_DUMP_PATH": str(dump),
+            "WIKI_CACHE_DIR": str(self.workdir / "cache"),
+        }
+        os.environ.update(environ)
+        sys.path.insert(0, str(ROOT / "src"))
+
+        wiki_dump = importlib.import_module("wiki.dump")
+        wiki_dump.import_dump((json.dumps(line) for line in corpus(self.corpus_size)), dump)
+
+        # Swapped before anything imports ``DATA`` from it, to count the storage calls.
+        database_core = importlib.import_module("database.database_core")
+        self._storage = Counting(
+            database_core.SQLiteBackend(self.workdir / "scores.sqlite3", database_core.DB_EXECUTOR)
+        )
+        self.database = database_core.DatabaseController(self._storage)
+        database_core.DATA = self.database
+        await self._seed_leaderboard()
+
+        # pywikibot creates the site synchronously, over HTTP to the stand-in served by this loop.
+        wikiutils = await asyncio.to_thread(importlib.import_module, "wikiutils")
+        self._backend = Counting(wikiutils.BACKEND)
+        wikiutils.BACKEND = self._backend
+        wikiutils.ARTICLE_POOL.start()
+
+        tree = FakeTree()
+        for command in commands:
+            module = importlib.import_module(f"cmds.{MODULES[command]}")
+            if command == "rabbit-hole":
+                module.model = self.model
+            module.main(tree)
+        self.commands = tree.commands
+
+    async def stop(self) -> None:
+        """Stop the pool and the stand-in."""
+        wikiutils = importlib.import_module("wikiutils")
+        await wikiutils.ARTICLE_POOL.stop()
+        await importlib.import_module("http_client").HTTP.close()
+        await self.standin.stop()
+        self.database.close()
+
+    async def _seed_leaderboard(self) -> None:
+        storage = importlib.import_module("database.storage")
+        await self._storage.commit(
+            [
+                storage.UserChange(
+                    guild,
+                    str(10_000 + number),
+                    fields={
+                        "name": f"player {number}",
+                        "score": number * 37 % 5_000,
+                        "times_played": number,
+                        "wins": number // 2,
+                        "failure": number // 3,
+                        "last_played": 0,
+                    },
+                )
+                for guild in (GUILD_ID, 0)
+                for number in range(200)
+            ]
+        )
+        self._storage.calls.clear()
+
+    def _record_site(self) -> None:
+        # pywikibot asks who it is logged in as when the site is created.
+        self.standin.add(
+            "POST",
+            "/w/api.php",
+            {
+                "action": "query",
+                "format": "json",
+                "formatversion": "2",
+                "meta": "userinfo",
+                "uiprop": "blockinfo|groups|hasmsg|ratelimits|rights",
+            },
+            {"query": {"userinfo": {"id": 0, "name": "127.0.0.1", "anon": True, "groups": ["*"], "rights": ["read"]}}},
+        )
+
+    def _record_animal(self) -> None:
+        self.standin.add(
+            "GET",
+            "/wiki/Special:RandomInCategory",
+            {"wpcategory": "Mammals of the United States"},
+            {},
+            status=302,
+            headers={"Location": f"/w/index.php?title={ANIMAL.replace(' ', '_')}"},
+        )
+        self.standin.add("GET", "/w/index.php", {"title": ANIMAL.replace(" ", "_")}, {})
+        self.standin.add(
+            "GET", "/v1/animals", {"name": ANIMAL.split()[-1]}, [{"characteristics": {"weight": "30kg - 80kg"}}]
+        )
+
+    def upstream_calls(self) -> Counter[str]:
+        """Return the calls made to every backend so far."""
+        calls: Counter[str] = Counter()
+        calls.update({f"http:{path}": count for path, count in self.standin.calls.items()})
+        calls.update({f"backend:{name}": count for name, count in self._backend.calls.items()})
+        calls.update({f"database:{name}": count for name, count in self._storage.calls.items()})
+        calls["gemini"] = self.model.calls
+        return calls
+
+    async def invoke(self, command: str) -> FakeInteraction:
+        """Run a command once, as a fresh interaction from a guild member."""
+        user = FakeUser()
+        guild = FakeGuild(GUILD_ID, members=[user])
+        interaction = FakeInteraction(guild=guild, user=user)
+        kwargs = {"query": "Python (programming language)"} if command == "wiki-search" else {}
+        await self.commands[command](interaction, **kwargs)
+        return interaction
+
+
+async def measure(bench: Bench, command: str, iterations: int) -> dict[str, Any]:
+    """Benchmark one command."""
+    first: list[float] = []
+    total: list[float] = []
+    before = bench.upstream_calls()
+
+    for _ in range(iterations):
+        interaction = await bench.invoke(command)
+        done = time.perf_counter()
+        total.append(done - interaction.received)
+        first.append((interaction.first_response or done) - interaction.received)
+
+    calls = bench.upstream_calls()
+    calls.subtract(before)
+
+    # Allocations are measured on a separate run, tracing slows everything down.
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await bench.invoke(command)
+    end_size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def summary(samples: list[float]) -> dict[str, float]:
+        return {
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "mean_ms": statistics.fmean(samples) * 1000,
+            "cold_ms": samples[0] * 1000,
+        }
+
+    return {
+        "iterations": iterations,
+        "first_response": summary(first),
+        "total": summary(total),
+        "upstream_calls_per_run": {name: count / iterations for name, count in sorted(calls.items()) if count},
+        "allocated_kib": (end_size - start_size) / 1024,
+        "peak_kib": (peak - start_size) / 1024,
+    }
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(
+    commands: tuple[str, ...] = COMMANDS,
+    *,
+    iterations: int = 50,
+    latency: float = 0.0,
+    corpus_size: int = 2_000,
+) -> dict[str, Any]:
+    """Benchmark the commands and return the report."""
+    with _workdir() as workdir:
+        bench = Bench(workdir, latency=latency, corpus_size=corpus_size)
+        await bench.start(commands)
+        try:
+            results = {command: await measure(bench, command, iterations) for command in commands}
+        finally:
+            await bench.stop()
+
+    return {
+        "revision": _revision(),
+        "python": sys.version.split()[0],
+        "latency_s": latency,
+        "corpus_size": corpus_size,
+        "commands": results,
+    }
+
+
+@contextmanager
+def _workdir() -> Iterator[Path]:
+    with tempfile.TemporaryDirectory(prefix="wikiwabbit-bench-") as directory:
+        yield Path(directory)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmarks and write the report as JSON."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the bot's commands offline.")
+    parser.add_argument("commands", nargs="*", choices=[[], *sorted(MODULES)], help="Default: all but wiki-random.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every HTTP response.")
+    parser.add_argument("--corpus-size", type=int, default=2_000)
+    parser.add_argument("--output", type=Path, default=Path("bench_output.json"))
+    arguments = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run(
+            tuple(arguments.commands) or COMMANDS,
+            iterations=arguments.iterations,
+            latency=arguments.latency,
+            corpus_size=arguments.corpus_size,
+        )
+    )
+    arguments.output.write_text(json.dumps(report, indent=2) + "\n")
+    for command, result in report["commands"].items():
+        print(
+            f"{command:>14}  first p50 {result['first_response']['p50_ms']:8.2f} ms"
+            f"  total p50 {result['total']['p50_ms']:8.2f} ms  p99 {result['total']['p99_ms']:8.2f} ms"
+        )
@@ -0,0 +1,104 @@
+"""Run blocking calls off the event loop.
+
+Libraries such as pywikibot only offer synchronous APIs. Calling them straight
+from a coroutine blocks the Discord gateway loop for a full HTTP round trip, so
+they are dispatched to a bounded thread pool with a per-call timeout instead.
+"""
+
+import asyncio
+import functools
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+
+
+class BlockingCallTimeoutError(TimeoutError):
+    """A blocking call did not finish within its timeout."""
+
+    def __init__(self, name: str, timeout: float) -> None:
+        super().__init__(f"{name} call timed out after {timeout}s")
+
+
+class BlockingExecutor:
+    """Bounded thread pool that runs blocking callables for coroutines.
+
+    Attributes
+    ----------
+    name (str): Name of the executor, used for thread names and metrics.
+    max_workers (int): The maximum number of calls running at once.
+    timeout (float | None): Default per-call timeout in seconds.
+
+    """
+
+    def __init__(self, name: str, *, max_workers: int, timeout: float | None = None) -> None:
+        """Initialize the BlockingExecutor.
+
+        Args:
+        ----
+        name (str): Name of the executor, used for thread names and metrics.
+        max_workers (int): The maximum number of calls running at once.
+        timeout (float | None): Default per-call timeout in seconds, None to wait forever.
+
+        """
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    async def run[T](
+        self, func: Callable[..., T], /, *args: object, timeout: float | None = None, **kwargs: object
+    ) -> T:
+        """Run ``func(*args, **kwargs)`` on the pool and return its result.
+
+        Callers waiting for a free worker can be cancelled without the call
+        ever starting. Once started, a call that times out keeps its worker
+        until it returns, so the pool never runs more than ``max_workers``.
+
+        Args:
+        ----
+        func (Callable[..., T]): The blocking callable.
+        *args (object): Positional arguments for ``func``.
+        timeout (float | None): Overrides the executor's default timeout.
+        **kwargs (object): Keyword arguments for ``func``.
+
+        Raises:
+        ------
+        BlockingCallTimeoutError: If the call doesn't finish in time.
+
+        """
+        loop = asyncio.get_running_loop()
+        pool, slots = self._ensure_pool()
+        timeout = self.timeout if timeout is None else timeout
+
+        await slots.acquire()
+        start = time.perf_counter()
+        try:
+            future = pool.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except TimeoutError as err:
+            METRICS.incr(f"{self.name}.timeouts")
+            raise BlockingCallTimeoutError(self.name, timeout) from err
+        finally:
+            METRICS.observe(f"{self.name}.latency", time.perf_counter() - start)
+
+    def shutdown(self) -> None:
+        """Stop accepting calls and release the worker threads once they finish."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._slots = None
+
+    def _ensure_pool(self) -> tuple[ThreadPoolExecutor, asyncio.Semaphore]:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._pool, self._slots
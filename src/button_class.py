@@ -13,6 +13,9 @@ from pint import UnitRegistry
 from pywikibot import Page
 from pywikibot.exceptions import InvalidTitleError
 
+from metrics import METRICS
+from wiki.aliases import TitleAliases
+from wiki.metadata import ArticleRecord
 from wikiutils import loss_update, make_embed, search_wikipedia
 
 ACCURACY_THRESHOLD = 0.8
@@ -76,7 +79,8 @@ class _Button:
     score: list[int] | None = None
     winlossmanager: WinLossManagement | None = None
     ranked: bool = False
-    article: Page = None
+    article: Page | ArticleRecord | None = None
+    aliases: TitleAliases | None = None
     user: int = 0
     game_type: GameType = GameType.wikiguesser
     animal_info: dict | None = None
@@ -120,8 +124,7 @@ class GiveUpButton(discord.ui.Button):
         embed = await make_embed(article)
         embed.set_footer(text=msg)
         if self.ranked:
-            for i in [interaction.guild_id, 0]:
-                await loss_update(i, user=interaction.user)
+            await loss_update([interaction.guild_id, 0], user=interaction.user)
         try:
             await interaction.response.send_message(embed=embed, ephemeral=self.ranked)
             await self.clean_view(view=self._view)
@@ -302,9 +305,12 @@ async def wikiguesser_on_submit(info: _Button, interaction: discord.Interaction,
 
     """
     await interaction.response.defer()
-    page = await search_wikipedia(user_guess)
+    aliases = info.aliases or TitleAliases.from_titles(info.article.title())
     try:
-        if page.title() == info.article.title():
+        # Exact titles and redirects are answered locally, only other guesses are searched for.
+        matched = aliases.matches(user_guess)
+        METRICS.incr("guesses.alias_hits" if matched else "guesses.alias_misses")
+        if matched or aliases.matches((await search_wikipedia(user_guess)).title()):
             await info.winlossmanager.on_win(interaction=interaction)
             info.view.clear_items()
             await interaction.message.edit(view=info.view)
@@ -17,9 +17,6 @@ class _GloSer(Enum):
 def main(tree: app_commands.CommandTree) -> None:
     """Create leaderboard command."""
 
-    def _sort_leaders(e: dict) -> int:
-        return e["score"]
-
     @tree.command(
         name="leaderboard",
         description="Returns your guilds leaderboard",
@@ -43,10 +40,8 @@ def main(tree: app_commands.CommandTree) -> None:
         try:
             ser_id = interaction.guild_id if bool(globe.value) else 0
             await interaction.response.defer(thinking=True)
-            board = await DATA.get_server(ser_id)
-            lead = list(board.values())
-            lead.sort(key=_sort_leaders, reverse=True)
-            lead = lead[0:10]
+            # Only the best scores are read, see ``DatabaseController.get_leaderboard``.
+            lead = await DATA.get_leaderboard(ser_id)
             embed = discord.Embed(
                 title=f"Wikiguesser leaderboard for {interaction.guild.name if ser_id != 0 else "THE ENTIRE WORLD"}",
             )
@@ -5,7 +5,7 @@ import asyncio
 import discord
 from discord import app_commands
 
-from wikiutils import make_embed, search_wikipedia
+from wikiutils import get_article_record, make_embed, search_wikipedia
 
 
 def main(tree: app_commands.CommandTree) -> None:
@@ -27,7 +27,10 @@ def main(tree: app_commands.CommandTree) -> None:
         await interaction.response.send_message(
             f"Starting deathmatch between {user.mention} and {interaction.user.mention}..."
         )
-        article = await search_wikipedia("Rickrolling")
+        article = await get_article_record(await search_wikipedia("Rickrolling"), extract_chars=400, links=0)
+        if article is None:
+            await interaction.followup.send("The deathmatch was called off, try again later.")
+            return
         await asyncio.sleep(1)
         embed = await make_embed(article)
         embed.description = (
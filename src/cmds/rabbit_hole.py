@@ -7,7 +7,6 @@ curate a Wikipedia experience, getting lost down a "rabbit hole" of information.
 import json
 import logging
 import os
-import random
 
 import discord
 import google.generativeai as genai
@@ -17,7 +16,8 @@ from discord.errors import NotFound
 from google.api_core.exceptions import ResourceExhausted
 from pywikibot import Page
 
-from wikiutils import rand_wiki
+from wiki.metadata import ArticleRecord
+from wikiutils import get_article_record, rand_wiki, sample_links
 
 sys_ins = """Objective: Summarize a Wikipedia article in a concise and informative manner, retaining key details and ensuring readability. Do not return any commentary or anything else, except the requested summary.
 
@@ -70,57 +70,53 @@ def make_embed(summary: dict) -> Embed:
 class WikiButtons(discord.ui.View):
     """Buttons for exploring more Wikipedia articles."""
 
-    def __init__(self, pages: list[Page]) -> None:
+    def __init__(self, titles: list[str]) -> None:
         """Initialize the WikiButtons class.
 
         Args:
         ----
-        pages (list[Page]): The Wikipedia pages to explore.
+        titles (list[str]): The titles of the Wikipedia pages to explore.
 
         """
         super().__init__(timeout=None)
-        self.pages = pages
+        self.titles = titles
         self.create_buttons()
 
     def create_buttons(self) -> None:
         """Create buttons for each Wikipedia article."""
 
-        def create_callback(page: Page) -> discord.ui.Button.callback:
+        def create_callback(title: str) -> discord.ui.Button.callback:
             async def button_callback(interaction: discord.Interaction) -> None:
                 await interaction.response.defer(thinking=True, ephemeral=True)
-                await rabbit_hole_helper(interaction, page)
+                await rabbit_hole_helper(interaction, title)
 
             return button_callback
 
-        for page in self.pages:
-            button = discord.ui.Button(label=page.title(), style=discord.ButtonStyle.green)
-            button.callback = create_callback(page)
+        for title in self.titles:
+            button = discord.ui.Button(label=title, style=discord.ButtonStyle.green)
+            button.callback = create_callback(title)
             self.add_item(button)
 
 
-async def rabbit_hole_helper(interaction: discord.Interaction, article: Page) -> None:
+async def rabbit_hole_helper(interaction: discord.Interaction, article: Page | ArticleRecord | str) -> None:
     """Functions to help the rabbit hole."""
     try:
-        # Generate a summary and return an embed message
-        text = article.extract(intro=False)
-        response = model.generate_content(text)
+        # Generate a summary from the whole text, pooled records only carry the intro.
+        title = article if isinstance(article, str) else article.title()
+        record = await get_article_record(title, extract_chars=None, intro=False, links=0)
+        response = await model.generate_content_async(record.extract())
         summary = json.loads(response.text)
 
         # Add additional information to the summary
-        summary["Title"] = article.title()
-        summary["URL"] = article.full_url()
-        image_url = article.page_image()
-        try:
-            image_url = image_url.latest_file_info.url
-        except AttributeError:
-            image_url = None
-        summary["Image"] = image_url
+        summary["Title"] = record.title()
+        summary["URL"] = record.full_url()
+        summary["Image"] = record.image_url
 
         # Create an embed message with the summary
         embed = make_embed(summary)
 
-        # Get 3 random Wikipedia pages from the article
-        related_pages = random.sample(tuple(article.linkedPages()), 3)
+        # Get 3 random Wikipedia pages from the article's links, streamed as titles only.
+        related_pages = await sample_links(record.title(), 3)
 
         await interaction.followup.send(embed=embed, view=WikiButtons(related_pages))
     except json.JSONDecodeError:
@@ -24,14 +24,13 @@ def main(tree: app_commands.CommandTree) -> None:
         -----
         This command requires the user to have **MANAGE SERVER** (or 'manage_guild') permissions.
 
-        This command will reset the scores of all users in the server to 0.
+        This command will reset the scores of all users in the server to 0, by
+        starting a new season. The final leaderboard of the previous season is archived.
 
         """
         await interaction.response.defer(thinking=True)
         if interaction.channel.permissions_for(interaction.user).manage_guild:
-            data = await DATA.get_server(interaction.guild_id)
-            for uid in data:
-                await DATA.update_value_for_user(interaction.guild_id, uid, 0, "score")
+            await DATA.reset_scores(interaction.guild_id)
             await interaction.followup.send("Scores Reset!", ephemeral=True)
         else:
             await interaction.followup.send(
@@ -66,6 +66,13 @@ def main(tree: app_commands.CommandTree) -> None:
                         value=(user_data["wins"] / 1),
                         inline=False,
                     )
+                rank, players = await DATA.get_rank(interaction.guild_id, user.id)
+                global_rank, global_players = await DATA.get_rank(0, user.id)
+                embed.add_field(
+                    name="Rank",
+                    value=f"#{rank} of {players} (global #{global_rank} of {global_players})",
+                    inline=False,
+                )
                 embed.add_field(
                     name="Last Played",
                     value=humanize.naturaltime(datetime.now(UTC).timestamp() - user_data["last_played"]),
@@ -10,9 +10,19 @@ from pint import UnitRegistry
 
 import button_class
 from button_class import GameType, GiveUpButton, GuessButton, _Button
-from wikiutils import UA, make_img_embed, search_wikipedia
+from http_client import HTTP
+from retry import RetryBudgetExceededError, RetryPolicy, retry
+from wikiutils import make_img_embed, search_wikipedia
 
 UREG = UnitRegistry()
+WIKIPEDIA_URL = os.environ.get("WIKIPEDIA_URL", "https://en.wikipedia.org")
+API_NINJAS_URL = os.environ.get("API_NINJAS_URL", "https://api.api-ninjas.com")
+
+HTTP.add_upstream(
+    "api_ninjas",
+    timeout=float(os.environ.get("API_NINJAS_TIMEOUT", "20")),
+    headers={"X-Api-Key": os.environ.get("NINJA_API_KEY", "")},
+)
 
 WEIGHT_PATTERN = re.compile(r"(\d+ ?(?:kg|tons|lbs|oz|g|pounds|grams))")
 
@@ -24,6 +34,14 @@ class IncompatibleAnimalError(Exception):
         super().__init__("No valid animal weights")
 
 
+# Budget of an animal draw, every attempt asks Wikipedia for another random animal.
+ANIMAL_RETRY = RetryPolicy(
+    attempts=int(os.environ.get("WIKI_ANIMAL_ATTEMPTS", "5")),
+    deadline=float(os.environ.get("WIKI_ANIMAL_DEADLINE", "30")),
+    retry_on=(IncompatibleAnimalError, aiohttp.ClientError, TimeoutError),
+)
+
+
 class WinLossFunctions(button_class.WinLossManagement):
     """The Basic Win Loss Function for WikiAnimal."""
 
@@ -39,11 +57,8 @@ class WinLossFunctions(button_class.WinLossManagement):
 
 async def find_animal_weight(animal_name: str) -> list[str]:
     """Determine animal's weight ranges based on article text."""
-    api_url = f"https://api.api-ninjas.com/v1/animals?name={animal_name}"
-    async with (
-        aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20)) as session,
-        session.get(api_url, headers={"X-Api-Key": os.environ["NINJA_API_KEY"]}) as response,
-    ):
+    api_url = f"{API_NINJAS_URL}/v1/animals?name={animal_name}"
+    async with HTTP.get(api_url, upstream="api_ninjas") as response:
         if not response.ok:
             logging.error("Error requesting animal data: %s", response.status)
             raise IncompatibleAnimalError
@@ -64,22 +79,29 @@ async def find_animal_weight(animal_name: str) -> list[str]:
     raise IncompatibleAnimalError
 
 
-async def find_new_animal(interaction: discord.Interaction) -> dict:
-    """Return random animal's information."""
-    try:
-        api_url = "https://en.wikipedia.org/wiki/Special:RandomInCategory?wpcategory=Mammals of the United States"
-        async with (
-            aiohttp.ClientSession(headers={"UserAgent": UA}, timeout=aiohttp.ClientTimeout(total=20)) as session,
-            session.get(api_url) as response,
-        ):
-            if response.ok:
-                loc = str(response.real_url)
-                title = loc.split("=")[1].split("&")[0]
-        article = await search_wikipedia(title)
-        animal_name = article.title().split(" ")[-1]
-        weight_ranges = await find_animal_weight(animal_name)
-    except IncompatibleAnimalError:
-        return await find_new_animal(interaction)
+async def find_new_animal(interaction: discord.Interaction) -> dict:  # noqa: ARG001
+    """Return random animal's information.
+
+    Raises
+    ------
+    RetryBudgetExceededError: If no animal with known weights was found within ``ANIMAL_RETRY``.
+
+    """
+    return await retry("find_new_animal", _random_animal, ANIMAL_RETRY)
+
+
+async def _random_animal() -> dict:
+    api_url = f"{WIKIPEDIA_URL}/wiki/Special:RandomInCategory?wpcategory=Mammals of the United States"
+    async with HTTP.get(api_url, upstream="wikimedia") as response:
+        if not response.ok:
+            raise IncompatibleAnimalError
+        loc = str(response.real_url)
+        title = loc.split("=")[1].split("&")[0]
+    article = await search_wikipedia(title)
+    if article is None:
+        raise IncompatibleAnimalError
+    animal_name = article.title().split(" ")[-1]
+    weight_ranges = await find_animal_weight(animal_name)
     return {"name": animal_name, "article": article, "weight_ranges": weight_ranges}
 
 
@@ -99,7 +121,12 @@ def main(tree: app_commands.CommandTree) -> None:
                 content="Starting a game of Wiki Animal, one moment while we catch your animal."
             )
 
-            animal_info = await find_new_animal(interaction)
+            try:
+                animal_info = await find_new_animal(interaction)
+            except RetryBudgetExceededError as e:
+                logging.warning("Wiki-Animal:\nFunc: main\nException %s", e)
+                await interaction.edit_original_response(content="No animals are around right now, try again later.")
+                return
 
             article = animal_info.get("article")
             hint_view = discord.ui.View()
@@ -132,7 +159,7 @@ def main(tree: app_commands.CommandTree) -> None:
 
             hint_view.add_item(give_up_button)
 
-            img_embed = make_img_embed(
+            img_embed = await make_img_embed(
                 article=article, error_message="Sorry this animal's image is missing. Good Luck!"
             )
 
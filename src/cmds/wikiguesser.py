@@ -1,6 +1,7 @@
 """Wiki Guesser Command."""
 
 import logging
+import os
 
 import discord
 from discord import NotFound, app_commands
@@ -8,12 +9,25 @@ from discord.app_commands.errors import CommandInvokeError
 
 import button_class
 from button_class import ExcerptButton, GiveUpButton, GuessButton, LinkListButton, _Button, _Ranked
-from wikiutils import make_embed, rand_wiki, win_update
+from retry import RetryBudgetExceededError, RetryPolicy, retry
+from wiki.aliases import TitleAliases
+from wiki.metadata import ArticleRecord
+from wikiutils import censored_excerpt, get_article_record, make_embed, rand_wiki, win_update
 
 ACCURACY_THRESHOLD = 0.8
 MAX_LEN = 1990
 LEN_OF_STR = 10
 
+# Budget of an article draw, every attempt draws another article if the last one has no record (e.g. deleted).
+ARTICLE_RETRY = RetryPolicy(
+    attempts=int(os.environ.get("WIKI_GUESSER_ATTEMPTS", "3")),
+    deadline=float(os.environ.get("WIKI_GUESSER_DEADLINE", "20")),
+    base_delay=0.0,
+    # * I was encoutering an warning that happened sometimes that said 'rand_wiki' was never awaited but
+    # * when I ran the command again it didn't appear, so it is drawn again if it doesn't work the first time
+    retry_on=(AttributeError,),
+)
+
 
 class WinLossFunctions(button_class.WinLossManagement):
     """The Basic Win Loss Function."""
@@ -30,9 +44,7 @@ class WinLossFunctions(button_class.WinLossManagement):
         msg = f"Congratulations {interaction.user.mention}! You figured it out, your score was {scores[0]}!"
         await interaction.followup.send(content=msg, embed=embed)
         if ranked:
-            user = interaction.user
-            for i in [interaction.guild_id, 0]:
-                await win_update(i, user, scores[0])
+            await win_update([interaction.guild_id, 0], interaction.user, scores[0])
 
     async def on_loss(self) -> None:
         """Clean up on loss."""
@@ -40,6 +52,14 @@ class WinLossFunctions(button_class.WinLossManagement):
         await interaction.followup.send("That's incorrect, please try again.", ephemeral=True)
 
 
+async def _draw_article() -> ArticleRecord | None:
+    """Return the record of a random article, None if it doesn't exist anymore."""
+    article = await rand_wiki()
+    logging.info("The current wikiguesser title is %s", article.title())
+    # Everything the game needs, fetched in a single request (pooled articles already are).
+    return await get_article_record(article, redirects=True)
+
+
 def main(tree: app_commands.CommandTree) -> None:
     """Create Wiki Guesser command."""
 
@@ -71,25 +91,19 @@ def main(tree: app_commands.CommandTree) -> None:
             else:
                 await interaction.response.send_message(content="Starting a game of Wikiguesser")
 
-            # * I was encoutering an warning that happened sometimes that said 'rand_wiki' was never awaited but
-            # * when I ran the command again it didn't appear, so I'm just running this twice if it doesn't work the
-            # * first time
             try:
-                article = await rand_wiki()
-            except AttributeError as e:
-                logging.info("Wiki-Guesser:\nFunc: main\nException %s", e)
-                article = await rand_wiki()
-            logging.info("The current wikiguesser title is %s", article.title())
-
-            links = [link.title() for link in article.linkedPages(total=50)]
-
-            excerpt = article.extract(chars=1200)
+                article = await retry("wiki_guesser_article", _draw_article, ARTICLE_RETRY)
+            except RetryBudgetExceededError as e:
+                logging.warning("Wiki-Guesser:\nFunc: main\nException %s", e)
+                await interaction.edit_original_response(
+                    content="No article could be found right now, try again later."
+                )
+                return
 
-            for i in article.title().split():
-                excerpt = excerpt.replace(i, "~~CENSORED~~")
-                excerpt = excerpt.replace(i.lower(), "~~CENSORED~~")
+            links = list(article.links)
 
-            sentances = [i for i in excerpt.strip("\n").split(".") if i]
+            # Censored when the article entered the pool.
+            sentances = list(censored_excerpt(article).sentences)
             args = {"interaction": interaction, "ranked": ranked, "article": article, "scores": score}
             excerpt_view = discord.ui.View()
             guess_button = GuessButton(
@@ -99,6 +113,7 @@ def main(tree: app_commands.CommandTree) -> None:
                     owners=owners,
                     ranked=ranked,
                     article=article,
+                    aliases=TitleAliases.from_record(article),
                     score=score,
                     user=interaction.user.id,
                     view=excerpt_view,
@@ -1,43 +1,116 @@
-"""Core funcitonaliry for interactions with the scoring database."""
+"""Core funcitonaliry for interactions with the scoring database.
+
+Records are kept by a ``StorageBackend``: the Firebase Realtime Database by
+default, or a local SQLite file with ``DATABASE_BACKEND=sqlite``. Both run their
+blocking calls on ``DB_EXECUTOR``, a small dedicated thread pool, so they never
+block the event loop and at most ``DATABASE_MAX_WORKERS`` run at once. Each
+operation's latency is recorded in ``METRICS`` as ``database.<operation>``.
+Writes are coalesced by a ``WriteBehind`` buffer and committed in batches every
+``DATABASE_FLUSH_INTERVAL`` seconds.
+
+User records are cached in ``USER_CACHE`` for a few minutes. Writes made through
+``DatabaseController`` update the cached copy, so the same user is rarely read
+twice in a row. The cache's hit rate is ``METRICS.ratio("user_cache.hits", "user_cache.misses")``.
+
+Leaderboards are ``TopK`` boards cached in ``LEADERBOARDS``, loaded with a
+query for the ``LEADERBOARD_SIZE`` best scores only and updated by every write.
+
+Ranks are answered by the storage when it has an index of the scores (SQLite).
+Otherwise they come from ``RankIndex`` order statistics cached in
+``RANK_INDEXES``: a guild's index is built from one read of the guild, the
+first time it is needed, and then only updated by the score writes, so
+``/user-info`` finds a rank in O(log n) without reading the guild again. Indexes
+never expire, only the least recently used are dropped when too many guilds are
+cached.
+
+Scores belong to the guild's current epoch, see ``database.epochs``: records are
+stored (and cached) with every season's score and read as the current one.
+Epochs are cached in ``EPOCHS``.
+"""
 
 import os
+from collections.abc import Iterable
+from datetime import UTC, datetime
 from typing import ClassVar, Literal
 
-import firebase_admin
 from dotenv import load_dotenv
-from firebase_admin import db
 
+from blocking import BlockingExecutor
+from lru import LRUCache, TTLCache
+
+from .epochs import current, current_records, score_key, stored
+from .firebase import FirebaseBackend
+from .leaderboard import TopK
+from .ranks import RankIndex
+from .sqlite import SQLiteBackend
+from .storage import StorageBackend, UserChange
 from .user import UserController
+from .writebehind import WriteBehind
 
 if load_dotenv(".env"):
     ...
 else:
     load_dotenv("docker.env")
 
+# Thread pool for the storage's blocking calls.
+DB_EXECUTOR = BlockingExecutor(
+    "database_calls",
+    max_workers=int(os.environ.get("DATABASE_MAX_WORKERS", "4")),
+    timeout=float(os.environ.get("DATABASE_CALL_TIMEOUT", "15")),
+)
+
+# (guild id, user id as a string) -> the user's stored record (every season's score), kept current by writes
+# made through ``DatabaseController``.
+USER_CACHE: TTLCache[tuple[int, str], dict] = TTLCache(
+    int(os.environ.get("USER_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("USER_CACHE_TTL", "300")),
+    name="user_cache",
+)
+
 
 class NullUserError(TypeError):
-    """User Doesn't exist in firebase database."""
+    """User Doesn't exist in the database."""
 
     def __init__(self) -> None:
         super().__init__("User doesn't exist")
 
 
+LEADERBOARD_SIZE = int(os.environ.get("LEADERBOARD_SIZE", "10"))
+# Guild id -> its best scores, kept current by writes made through ``DatabaseController``.
+LEADERBOARDS: TTLCache[int, TopK] = TTLCache(
+    int(os.environ.get("LEADERBOARD_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("LEADERBOARD_TTL", "300")),
+    name="leaderboard_cache",
+)
+
+RANK_BUCKET_WIDTH = int(os.environ.get("RANK_BUCKET_WIDTH", "100"))
+# Guild id -> the ranks of its players, kept current by writes made through ``DatabaseController``.
+RANK_INDEXES: LRUCache[int, RankIndex] = LRUCache(
+    int(os.environ.get("RANK_INDEX_CACHE_SIZE", "256")), name="rank_index_cache"
+)
+
+# Guild id -> its current epoch, only changed through ``DatabaseController.reset_scores``.
+EPOCHS: LRUCache[int, int] = LRUCache(int(os.environ.get("EPOCH_CACHE_SIZE", "1024")), name="epoch_cache")
+
+
+def _user_key(guild_id: int, user_id: int | str) -> tuple[int, str]:
+    return int(guild_id), str(user_id)
+
+
 class DatabaseController:
     """Class to interact with the user section of the Database."""
 
     SERVER_LIST: ClassVar = []
 
-    def __init__(
-        self,
-    ) -> None:
-        self._cred_obj = cred_obj = firebase_admin.credentials.Certificate(os.environ["CERT_PATH"])
-        self._default_app = firebase_admin.initialize_app(
-            cred_obj,
-            {
-                "databaseURL": "https://pure-pulsars-default-rtdb.firebaseio.com/",
-            },
-        )
-        self.SERVER_LIST = self.get_all_servers()
+    def __init__(self, storage: StorageBackend) -> None:
+        """Initialize the DatabaseController.
+
+        Args:
+        ----
+        storage (StorageBackend): Where the records are kept.
+
+        """
+        self._storage = storage
 
     async def add_user(
         self,
@@ -54,9 +127,16 @@ class DatabaseController:
         guild_id (int): The guild id.
 
         """
-        database_user = await self.conn(guild_id, user_id)
         _new_user = user.to_dictionary()
-        database_user.set(_new_user)
+        record = stored(_new_user, await self.get_epoch(guild_id))
+        await self._storage.set_user(guild_id, str(user_id), record)
+        USER_CACHE.put(_user_key(guild_id, user_id), record)
+        board = LEADERBOARDS.get(int(guild_id))
+        if board is not None:
+            board.update(user_id, _new_user)
+        index = RANK_INDEXES.get(int(guild_id))
+        if index is not None:
+            index.set(user_id, _new_user.get("score", 0))
 
     async def update_value_for_user(
         self,
@@ -79,15 +159,74 @@ class DatabaseController:
         NullUserError: If the user doesn't exist.
 
         """
-        """self._ref = db.reference("/users")"""
-        database_user = await self.conn(guild_id, user_id)
-        if database_user.get():
-            database_user.update({key: value})
-            return
-        raise NullUserError
+        # Cached users are known to exist, the check only reads the others.
+        await self.get_user(guild_id, user_id)
+        field = score_key(await self.get_epoch(guild_id)) if key == "score" else key
+        await self._storage.commit([UserChange(guild_id, str(user_id), fields={field: value})])
+        user = USER_CACHE.get(_user_key(guild_id, user_id))
+        if user is not None:
+            USER_CACHE.put(_user_key(guild_id, user_id), {**user, field: value})
+        if key == "score":
+            # Scores set here may go down (e.g. resets), which a top-K board can't follow.
+            LEADERBOARDS.pop(int(guild_id))
+            index = RANK_INDEXES.get(int(guild_id))
+            if index is not None:
+                index.set(user_id, value)
+
+    async def record_result(  # noqa: PLR0913
+        self,
+        guild_ids: Iterable[int],
+        user_id: int,
+        *,
+        name: str,
+        won: bool,
+        score: int = 0,
+    ) -> None:
+        """Record one game for a user in every guild, with a single commit.
+
+        Counters are incremented by the database itself, so nothing is read
+        first and concurrent games never overwrite each other. Users that
+        don't exist yet are created with every counter.
+
+        Args:
+        ----
+        guild_ids (Iterable[int]): The guild ids, e.g. the user's guild and the global ``0``.
+        user_id (int): The user id.
+        name (str): The user's display name.
+        won (bool): Whether the game was won.
+        score (int): The score to add.
+
+        """
+        fields = {"name": name, "last_played": datetime.now(UTC).timestamp()}
+        counters = {"times_played": 1, "wins": int(won), "failure": int(not won)}
+        epochs = {guild_id: await self.get_epoch(guild_id) for guild_id in guild_ids}
+        await self._storage.commit(
+            [
+                UserChange(guild_id, str(user_id), fields=fields, increments={score_key(epoch): score, **counters})
+                for guild_id, epoch in epochs.items()
+            ]
+        )
+
+        # Apply the same increments to the cached copies, uncached users are read when next needed.
+        for guild_id, epoch in epochs.items():
+            cached = USER_CACHE.get(_user_key(guild_id, user_id))
+            if cached is not None:
+                cached = {
+                    **cached,
+                    "name": name,
+                    "last_played": fields["last_played"],
+                    score_key(epoch): cached.get(score_key(epoch), 0) + score,
+                    "times_played": cached.get("times_played", 0) + 1,
+                    "wins": cached.get("wins", 0) + int(won),
+                    "failure": cached.get("failure", 0) + int(not won),
+                }
+                USER_CACHE.put(_user_key(guild_id, user_id), cached)
+                cached = current(cached, epoch)
+            self._update_leaderboard(guild_id, user_id, name, score, cached)
+            self._update_rank(guild_id, user_id, score, cached)
 
     async def get_user(self, guild_id: int, user_id: int) -> dict[str, int | str]:
-        """Return a user's information as a dict.
+        """Return a user's information as a dict, from ``USER_CACHE`` if it is there.
 
         Args:
         ----
@@ -103,10 +242,64 @@ class DatabaseController:
         NullUserError: If the user doesn't exist.
 
         """
-        database_user = await self.conn(guild_id, user_id)
-        if database_user.get():
-            return database_user.get()
-        raise NullUserError
+        key = _user_key(guild_id, user_id)
+        user = USER_CACHE.get(key)
+        if user is None:
+            user = await self._storage.get_user(guild_id, str(user_id))
+            if not user:
+                raise NullUserError
+            USER_CACHE.put(key, user)
+        # A copy, so callers can't change the cached record.
+        return current(user, await self.get_epoch(guild_id))
+
+    async def get_leaderboard(self, guild_id: int) -> list[dict]:
+        """Return the records of the guild's ``LEADERBOARD_SIZE`` best players, highest score first.
+
+        Args:
+        ----
+        guild_id (int): The guild id, 0 for the global leaderboard.
+
+        """
+        board = LEADERBOARDS.get(int(guild_id))
+        if board is None:
+            epoch = await self.get_epoch(guild_id)
+            records = await self._storage.top(guild_id, score_key(epoch), LEADERBOARD_SIZE)
+            board = TopK(LEADERBOARD_SIZE, current_records(records, epoch))
+            LEADERBOARDS.put(int(guild_id), board)
+        return board.top()
+
+    async def get_rank(self, guild_id: int, user_id: int) -> tuple[int | None, int]:
+        """Return a user's rank in a guild and the number of players ranked there.
+
+        Args:
+        ----
+        guild_id (int): The guild id, 0 for the global ranks.
+        user_id (int): The user id.
+
+        Returns:
+        -------
+        tuple[int | None, int]: The rank, from 1 for the best score (None if the
+            user hasn't played there) and the number of players.
+
+        """
+        ranked = await self._storage.rank(guild_id, score_key(await self.get_epoch(guild_id)), str(user_id))
+        if ranked is not None:
+            return ranked
+        index = await self._rank_index(guild_id)
+        return index.rank(user_id), len(index)
+
+    async def get_neighbours(self, guild_id: int, user_id: int, span: int = 2) -> list[tuple[str, int]]:
+        """Return the (user id, score) of the players ranked up to ``span`` places around a user, best first.
+
+        Args:
+        ----
+        guild_id (int): The guild id, 0 for the global ranks.
+        user_id (int): The user id.
+        span (int): How many places above and below the user.
+
+        """
+        index = await self._rank_index(guild_id)
+        return index.around(user_id, span)
 
     async def get_server(self, guild_id: int) -> dict:
         """Get server information as a dict.
@@ -117,33 +310,134 @@ class DatabaseController:
 
         Returns:
         -------
-        dict: The server information.
+        dict: The server information, user id -> record with the current epoch's score.
 
         """
         """Get the specified server."""
-        _ref = db.reference(f"/server/{guild_id}/")
-        return _ref.get()
+        return current_records(await self._storage.get_guild(guild_id), await self.get_epoch(guild_id))
+
+    async def get_epoch(self, guild_id: int) -> int:
+        """Return the guild's current epoch, 0 if its scores were never reset.
+
+        Args:
+        ----
+        guild_id (int): The guild id.
+
+        """
+        epoch = EPOCHS.get(int(guild_id))
+        if epoch is None:
+            epoch = await self._storage.get_epoch(guild_id)
+            EPOCHS.put(int(guild_id), epoch)
+        return epoch
 
-    async def get_all_servers(self) -> list:
-        """Return all servers' information as a list."""
-        return db.reference("/server/").get()
+    async def reset_scores(self, guild_id: int, *, archive: bool = True) -> int:
+        """Start a new epoch for the guild, where every score is 0, in a single write.
 
-    async def conn(self, guild_id: int, user_id: int) -> db.Reference:
-        """Return a connection to the db, for specific guilds/users.
+        The scores of the previous epoch stay in the user records.
 
         Args:
         ----
         guild_id (int): The guild id.
-        user_id (int): The user id.
+        archive (bool): Also save the final leaderboard of the previous epoch, in the same write.
 
         Returns:
         -------
-        db.Reference: The reference to the user.
+        int: The new epoch.
 
         """
-        _ref = db.reference(f"/server/{guild_id}/")
-        return _ref.child(str(user_id))
+        epoch = await self.get_epoch(guild_id)
+        await self._storage.start_epoch(guild_id, epoch + 1, await self.get_leaderboard(guild_id) if archive else None)
+
+        EPOCHS.put(int(guild_id), epoch + 1)
+        # Rebuilt for the new epoch when next needed, cached user records hold every epoch and stay valid.
+        LEADERBOARDS.pop(int(guild_id))
+        RANK_INDEXES.pop(int(guild_id))
+        return epoch + 1
+
+    async def get_all_servers(self) -> dict[int, dict[str, dict]]:
+        """Return all servers' stored records, by guild id then user id."""
+        return await self._storage.get_all()
+
+    def start(self) -> None:
+        """Start the storage's background work, e.g. the write-behind flushes."""
+        self._storage.start()
+
+    async def flush(self) -> None:
+        """Write the changes buffered by the storage."""
+        await self._storage.flush()
+
+    def close(self) -> None:
+        """Release the storage's resources."""
+        self._storage.close()
+
+    @staticmethod
+    def _update_leaderboard(guild_id: int, user_id: int, name: str, score: int, record: dict | None) -> None:
+        """Move a user up a cached leaderboard after a game, dropping the board if their new score is unknown."""
+        board = LEADERBOARDS.get(int(guild_id))
+        if board is None:
+            return
+        if record is None:
+            previous = board.score(user_id)
+            if previous is None:
+                index = RANK_INDEXES.get(int(guild_id))
+                if len(board) < board.size:
+                    # A board with room holds every player who scored.
+                    previous = 0
+                elif index is not None:
+                    # The index holds every player, users new to the guild start from 0.
+                    previous = index.score(user_id) or 0
+                else:
+                    if score > 0:
+                        # Their new score could put them on the board: it is loaded again by the next read.
+                        LEADERBOARDS.pop(int(guild_id))
+                    return
+            record = {"name": name, "score": previous + score}
+        board.update(user_id, record)
+
+    async def _rank_index(self, guild_id: int) -> RankIndex:
+        """Return the guild's ``RankIndex``, building it from the guild's records if it isn't cached."""
+        index = RANK_INDEXES.get(int(guild_id))
+        if index is None:
+            records = await self.get_server(guild_id)
+            index = RankIndex.from_records(records or {}, bucket_width=RANK_BUCKET_WIDTH)
+            RANK_INDEXES.put(int(guild_id), index)
+        return index
+
+    @staticmethod
+    def _update_rank(guild_id: int, user_id: int, score: int, record: dict | None) -> None:
+        """Move a user in a cached rank index after a game."""
+        index = RANK_INDEXES.get(int(guild_id))
+        if index is None:
+            return
+        if record is not None:
+            index.set(user_id, record.get("score", 0))
+        else:
+            # Indexed users are known, users new to the guild start from 0.
+            index.set(user_id, (index.score(user_id) or 0) + score)
+
+
+def _make_storage() -> StorageBackend:
+    storage: StorageBackend
+    if os.environ.get("DATABASE_BACKEND", "firebase") == "sqlite":
+        storage = SQLiteBackend(os.environ.get("DATABASE_PATH", "scores.sqlite3"), DB_EXECUTOR)
+    else:
+        storage = FirebaseBackend(
+            os.environ.get("CERT_PATH", ""),
+            os.environ.get("DATABASE_URL", "https://pure-pulsars-default-rtdb.firebaseio.com/"),
+            DB_EXECUTOR,
+        )
+
+    interval = float(os.environ.get("DATABASE_FLUSH_INTERVAL", "0.5"))
+    if interval <= 0:
+        return storage
+    return WriteBehind(
+        storage,
+        os.environ.get("DATABASE_JOURNAL", "database.journal"),
+        interval=interval,
+        max_entries=int(os.environ.get("DATABASE_FLUSH_ENTRIES", "100")),
+    )
 
 
-# Pre-instantiated controller object.
-DATA = DatabaseController()
+# Pre-instantiated controller object, on Firebase or on SQLite with DATABASE_BACKEND=sqlite, behind a
+# write-behind buffer unless DATABASE_FLUSH_INTERVAL=0.
+DATA = DatabaseController(_make_storage())
@@ -0,0 +1,49 @@
+"""Score seasons of a guild.
+
+Resetting a guild's scores by rewriting every user takes one request per user.
+Instead each guild has an epoch, and a user's score for an epoch is stored in
+its own field of the user's record: ``score`` for epoch 0 (so records written
+before seasons existed are epoch 0 records), ``score_<epoch>`` after that. A
+reset bumps the epoch, which is a single write, and scores of older epochs read
+as 0 since the new field doesn't exist yet. Older fields are left in place as
+the archive of past seasons, and games increment the current field from 0
+without reading the record first.
+"""
+
+from collections.abc import Mapping
+
+SCORE = "score"
+
+
+def score_key(epoch: int) -> str:
+    """Return the field holding scores of ``epoch`` in user records."""
+    return SCORE if epoch == 0 else f"{SCORE}_{epoch}"
+
+
+def key_epoch(key: str) -> int:
+    """Return the epoch whose scores are held by the score field ``key``."""
+    return 0 if key == SCORE else int(key.removeprefix(f"{SCORE}_"))
+
+
+def is_score_key(key: str) -> bool:
+    """Return True if ``key`` is the score field of an epoch."""
+    return key == SCORE or key.startswith(f"{SCORE}_")
+
+
+def current(record: Mapping, epoch: int) -> dict:
+    """Return a stored user record as seen in ``epoch``: its ``score`` is the epoch's, other seasons are left out."""
+    seen = {key: value for key, value in record.items() if not is_score_key(key)}
+    seen[SCORE] = record.get(score_key(epoch), 0)
+    return seen
+
+
+def current_records(records: Mapping[str, Mapping], epoch: int) -> dict[str, dict]:
+    """Return the stored records of a guild, by user id, as seen in ``epoch``."""
+    return {user_id: current(record, epoch) for user_id, record in records.items()}
+
+
+def stored(record: Mapping, epoch: int) -> dict:
+    """Return a user record as stored in ``epoch``, its ``score`` moved to the epoch's field."""
+    fields = dict(record)
+    fields[score_key(epoch)] = fields.pop(SCORE, 0)
+    return fields
@@ -0,0 +1,143 @@
+"""Scoring database stored in the Firebase Realtime Database.
+
+``firebase_admin`` is synchronous, every call is an HTTPS round trip. They run
+on a ``BlockingExecutor`` sharing the SDK's pooled HTTP session, so they never
+block the event loop. Each operation's latency is recorded in ``METRICS`` as
+``database.<operation>``. The app is only initialised by the first call, so
+importing the bot needs no credentials.
+
+Users are stored at ``/server/$guild/$user``, epochs at ``/epochs/$guild``,
+archived leaderboards at ``/archive/$guild/$epoch`` and the token of each
+writer's last batch at ``/batches/$writer``.
+
+Rules can only index a child with a fixed name, so scores of epochs after 0
+(``score_<epoch>`` in the records) are also written, with the user's name, to
+``/scores/$guild/$epoch/$user/score``. Leaderboard queries need
+``".indexOn": "score"`` on ``/server/$guild`` for epoch 0 and on
+``/scores/$guild/$epoch`` after that in the database rules; without it the
+whole guild is downloaded instead.
+"""
+
+import logging
+from collections.abc import Callable, Mapping, Sequence
+
+import firebase_admin
+from firebase_admin import db, exceptions
+
+from blocking import BlockingExecutor
+from metrics import METRICS
+
+from .epochs import SCORE, is_score_key, key_epoch
+from .storage import BatchId, StorageBackend, UserChange
+
+
+def increment(amount: int) -> dict:
+    """Return the server value adding ``amount`` to a counter atomically (from 0 if it doesn't exist)."""
+    return {".sv": {"increment": amount}}
+
+
+class FirebaseBackend(StorageBackend):
+    """Storage in a Firebase Realtime Database."""
+
+    def __init__(self, cert_path: str, database_url: str, executor: BlockingExecutor) -> None:
+        """Initialize the FirebaseBackend.
+
+        Args:
+        ----
+        cert_path (str): Path of the service account file.
+        database_url (str): URL of the database.
+        executor (BlockingExecutor): Runs the blocking firebase_admin calls.
+
+        """
+        self.cert_path = cert_path
+        self.database_url = database_url
+        self._executor = executor
+        self._app: firebase_admin.App | None = None
+
+    async def get_user(self, guild_id: int, user_id: str) -> dict | None:
+        """Return a user's record, None if the user doesn't exist."""
+        return await self._run("get_user", self._reference(f"/server/{guild_id}/{user_id}").get) or None
+
+    async def set_user(self, guild_id: int, user_id: str, record: Mapping[str, object]) -> None:
+        """Replace a user's record, and their indexed scores, with a single multi-location update."""
+        updates: dict[str, object] = {f"server/{guild_id}/{user_id}": dict(record)}
+        for key, value in record.items():
+            if is_score_key(key) and key != SCORE:
+                updates[f"scores/{guild_id}/{key_epoch(key)}/{user_id}"] = {"name": record.get("name"), SCORE: value}
+        await self._run("set_user", self._reference("/").update, updates)
+
+    async def commit(self, changes: Sequence[UserChange], batch: BatchId | None = None) -> None:
+        """Apply every change, and record ``batch``, with a single multi-location update.
+
+        Increments are done by the database.
+        """
+        updates: dict[str, object] = {}
+        for change in changes:
+            path = f"server/{change.guild_id}/{change.user_id}"
+            values = {**change.fields, **{key: increment(amount) for key, amount in change.increments.items()}}
+            updates.update({f"{path}/{key}": value for key, value in values.items()})
+            for key, value in values.items():
+                if is_score_key(key) and key != SCORE:
+                    scores = f"scores/{change.guild_id}/{key_epoch(key)}/{change.user_id}"
+                    updates[f"{scores}/{SCORE}"] = value
+                    if "name" in change.fields:
+                        updates[f"{scores}/name"] = change.fields["name"]
+        if batch is not None:
+            updates[f"batches/{batch.writer}"] = batch.token
+        await self._run("commit", self._reference("/").update, updates)
+
+    async def committed(self, batch: BatchId) -> bool:
+        """Return True if ``batch`` is the last batch committed by its writer."""
+        return await self._run("committed", self._reference(f"/batches/{batch.writer}").get) == batch.token
+
+    async def get_guild(self, guild_id: int) -> dict[str, dict]:
+        """Return the records of a guild, by user id."""
+        return await self._run("get_guild", self._reference(f"/server/{guild_id}/").get) or {}
+
+    async def get_all(self) -> dict[int, dict[str, dict]]:
+        """Return the records of every guild, by guild id then user id."""
+        servers = await self._run("get_all", self._reference("/server/").get) or {}
+        return {int(guild_id): users for guild_id, users in servers.items() if users}
+
+    async def top(self, guild_id: int, score_field: str, count: int) -> dict[str, dict]:
+        """Return the ``count`` best records of a guild, or all of them if ``score_field`` isn't indexed.
+
+        Records of epochs after 0 only hold the user's name and ``score_field``.
+        """
+        epoch = key_epoch(score_field)
+        path = f"/server/{guild_id}/" if epoch == 0 else f"/scores/{guild_id}/{epoch}/"
+        query = self._reference(path).order_by_child(SCORE).limit_to_last(count)
+        try:
+            best = await self._run("top", query.get) or {}
+        except exceptions.InvalidArgumentError as e:
+            logging.warning("Database:\nFunc: top\nException: %s", e)
+            return await self.get_guild(guild_id)
+        if epoch == 0:
+            return best
+        return {
+            user_id: {"name": scores.get("name", ""), score_field: scores.get(SCORE, 0)}
+            for user_id, scores in best.items()
+        }
+
+    async def get_epoch(self, guild_id: int) -> int:
+        """Return the guild's current epoch, 0 if it was never set."""
+        return await self._run("get_epoch", self._reference(f"/epochs/{guild_id}").get) or 0
+
+    async def start_epoch(self, guild_id: int, epoch: int, archive: list[dict] | None = None) -> None:
+        """Set the guild's epoch and archive the previous leaderboard with a single multi-location update."""
+        updates: dict[str, object] = {f"epochs/{guild_id}": epoch}
+        if archive is not None:
+            updates[f"archive/{guild_id}/{epoch - 1}"] = archive
+        await self._run("start_epoch", self._reference("/").update, updates)
+
+    def _reference(self, path: str) -> db.Reference:
+        """Return a reference to ``path``, initialising the app on first use."""
+        if self._app is None:
+            credentials = firebase_admin.credentials.Certificate(self.cert_path)
+            self._app = firebase_admin.initialize_app(credentials, {"databaseURL": self.database_url})
+        return db.reference(path, app=self._app)
+
+    async def _run[T](self, operation: str, func: Callable[..., T], /, *args: object) -> T:
+        """Run a blocking firebase_admin call on the executor, timing it as ``database.<operation>``."""
+        with METRICS.timer(f"database.{operation}"):
+            return await self._executor.run(func, *args)
@@ -0,0 +1,68 @@
+"""Materialized top scores of a guild.
+
+``/leaderboard`` only shows the best few players. Downloading and sorting every
+user of a guild (every player ever, for the global board) to show them is
+wasteful, so ``TopK`` keeps just the ``size`` best records. It is loaded once
+with a query returning ``size`` records and then kept up to date by the score
+updates made through ``DatabaseController``.
+"""
+
+import heapq
+from collections.abc import Mapping
+
+
+class TopK:
+    """The records with the highest scores, by user id.
+
+    Attributes
+    ----------
+    size (int): How many records are kept.
+
+    """
+
+    def __init__(self, size: int, records: Mapping[str, Mapping]) -> None:
+        """Initialize the TopK.
+
+        Args:
+        ----
+        size (int): How many records to keep.
+        records (Mapping[str, Mapping]): User id -> record, with at least the ``size`` best of the guild.
+
+        """
+        self.size = size
+        best = heapq.nlargest(size, records.items(), key=lambda item: item[1].get("score", 0))
+        self._records = {user_id: dict(record) for user_id, record in best}
+
+    def __contains__(self, user_id: object) -> bool:
+        """Return True if the user is among the best."""
+        return str(user_id) in self._records
+
+    def __len__(self) -> int:
+        """Return the number of records kept."""
+        return len(self._records)
+
+    def score(self, user_id: int | str) -> int | None:
+        """Return the user's score, None if they aren't among the best."""
+        record = self._records.get(str(user_id))
+        return record.get("score", 0) if record is not None else None
+
+    def update(self, user_id: int | str, record: Mapping) -> None:
+        """Take a user's new record into account.
+
+        A user who isn't among the best joins them if there's room or if they
+        beat the lowest score, which then drops out. Scores of users already
+        among the best are expected to only go up.
+        """
+        user_id = str(user_id)
+        if self.size <= 0:
+            return
+        if user_id not in self._records and len(self._records) >= self.size:
+            lowest = min(self._records, key=lambda key: self._records[key].get("score", 0))
+            if self._records[lowest].get("score", 0) >= record.get("score", 0):
+                return
+            del self._records[lowest]
+        self._records[user_id] = dict(record)
+
+    def top(self) -> list[dict]:
+        """Return the records, highest score first."""
+        return sorted(self._records.values(), key=lambda record: record.get("score", 0), reverse=True)
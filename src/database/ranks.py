@@ -0,0 +1,210 @@
+"""Order statistics over the scores of a guild.
+
+``RankIndex`` answers "what is the rank of this player" and "who is ranked
+around them" without sorting the guild. Scores are grouped in buckets of
+``bucket_width`` points, a Fenwick tree counts the players per bucket and
+each bucket keeps its few players sorted, so both queries take O(log n) plus
+the size of one bucket. Players without points, e.g. every new player of a
+season, would all share bucket 0: they are kept apart in a set, so adding or
+ranking one is O(log n) too, and only listing them around a player sorts them.
+"""
+
+import bisect
+from array import array
+from collections.abc import Mapping
+
+
+class FenwickTree:
+    """Prefix sums of a growable array of counts.
+
+    Attributes
+    ----------
+    size (int): The number of counts.
+
+    """
+
+    def __init__(self, size: int = 64) -> None:
+        """Initialize the FenwickTree with ``size`` counts of 0."""
+        self.size = max(size, 1)
+        self._tree = array("q", bytes(8 * (self.size + 1)))
+        self._counts = array("q", bytes(8 * self.size))
+
+    def add(self, index: int, amount: int) -> None:
+        """Add ``amount`` to the count at ``index``, growing the array if needed."""
+        if index >= self.size:
+            self._grow(index + 1)
+        self._counts[index] += amount
+        position = index + 1
+        while position <= self.size:
+            self._tree[position] += amount
+            position += position & -position
+
+    def prefix(self, index: int) -> int:
+        """Return the sum of the counts up to ``index`` included."""
+        position = min(index + 1, self.size)
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def find(self, target: int) -> int:
+        """Return the first index whose prefix sum is greater than ``target``."""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            following = position + step
+            if following <= self.size and self._tree[following] <= target:
+                position = following
+                target -= self._tree[following]
+            step >>= 1
+        return position
+
+    def _grow(self, size: int) -> None:
+        counts = self._counts
+        self.size = max(size, 2 * self.size)
+        self._tree = array("q", bytes(8 * (self.size + 1)))
+        self._counts = array("q", bytes(8 * self.size))
+        for index, count in enumerate(counts):
+            if count:
+                self.add(index, count)
+
+
+class RankIndex:
+    """The players of a guild, ordered by score.
+
+    Ranks start at 1 for the highest score, players with the same score share
+    a rank.
+
+    Attributes
+    ----------
+    bucket_width (int): Points per bucket.
+
+    """
+
+    def __init__(self, *, bucket_width: int = 100) -> None:
+        """Initialize the RankIndex.
+
+        Args:
+        ----
+        bucket_width (int): Points per bucket. Buckets should hold few players.
+
+        """
+        self.bucket_width = bucket_width
+        self._scores: dict[str, int] = {}
+        # Bucket -> (-score, user id) of its players with points, highest score first.
+        self._buckets: dict[int, list[tuple[int, str]]] = {}
+        # Players with a score of 0, counted in bucket 0, and their order when it was last needed.
+        self._zeros: set[str] = set()
+        self._zero_order: list[str] | None = None
+        self._tree = FenwickTree()
+
+    @classmethod
+    def from_records(cls, records: Mapping[str, Mapping], *, bucket_width: int = 100) -> "RankIndex":
+        """Build the index of a guild from its user records."""
+        index = cls(bucket_width=bucket_width)
+        index._load({str(user_id): record.get("score", 0) for user_id, record in records.items()})  # noqa: SLF001
+        return index
+
+    def __len__(self) -> int:
+        """Return the number of players."""
+        return len(self._scores)
+
+    def __contains__(self, user_id: object) -> bool:
+        """Return True if the player is indexed."""
+        return str(user_id) in self._scores
+
+    def score(self, user_id: int | str) -> int | None:
+        """Return the player's score, None if they aren't indexed."""
+        return self._scores.get(str(user_id))
+
+    def set(self, user_id: int | str, score: int) -> None:
+        """Set a player's score."""
+        user_id = str(user_id)
+        self.remove(user_id)
+        score = max(int(score), 0)
+        self._scores[user_id] = score
+        bucket = score // self.bucket_width
+        if score:
+            bisect.insort(self._buckets.setdefault(bucket, []), (-score, user_id))
+        else:
+            self._zeros.add(user_id)
+            self._zero_order = None
+        self._tree.add(bucket, 1)
+
+    def remove(self, user_id: int | str) -> None:
+        """Forget a player, if indexed."""
+        score = self._scores.pop(str(user_id), None)
+        if score is None:
+            return
+        bucket = score // self.bucket_width
+        if score:
+            players = self._buckets[bucket]
+            players.pop(bisect.bisect_left(players, (-score, str(user_id))))
+            if not players:
+                del self._buckets[bucket]
+        else:
+            self._zeros.discard(str(user_id))
+            self._zero_order = None
+        self._tree.add(bucket, -1)
+
+    def rank(self, user_id: int | str) -> int | None:
+        """Return the player's rank, None if they aren't indexed."""
+        score = self._scores.get(str(user_id))
+        if score is None:
+            return None
+        bucket = score // self.bucket_width
+        above = len(self) - self._tree.prefix(bucket)
+        return above + bisect.bisect_left(self._buckets.get(bucket, []), (-score, "")) + 1
+
+    def around(self, user_id: int | str, span: int = 2) -> list[tuple[str, int]]:
+        """Return the (user id, score) of the players ranked up to ``span`` places above and below the player."""
+        score = self._scores.get(str(user_id))
+        if score is None:
+            return []
+        position = self._position(str(user_id), score)
+        return [self._at(index) for index in range(max(position - span, 0), min(position + span + 1, len(self)))]
+
+    def _load(self, scores: Mapping[str, int]) -> None:
+        """Index the players of an empty index, sorting each bucket once instead of inserting them one by one."""
+        for user_id, score in scores.items():
+            self._scores[user_id] = max(int(score), 0)
+            bucket = self._scores[user_id] // self.bucket_width
+            if self._scores[user_id]:
+                self._buckets.setdefault(bucket, []).append((-self._scores[user_id], user_id))
+            else:
+                self._zeros.add(user_id)
+            self._tree.add(bucket, 1)
+        for players in self._buckets.values():
+            players.sort()
+
+    def _position(self, user_id: str, score: int) -> int:
+        """Return the 0-based position of the player, highest score first, ties by user id."""
+        bucket = score // self.bucket_width
+        above = len(self) - self._tree.prefix(bucket)
+        if score:
+            return above + bisect.bisect_left(self._buckets[bucket], (-score, user_id))
+        return above + len(self._buckets.get(0, [])) + bisect.bisect_left(self._ordered_zeros(), user_id)
+
+    def _at(self, position: int) -> tuple[str, int]:
+        """Return the (user id, score) at a 0-based position, highest score first."""
+        # The tree counts from the lowest bucket up.
+        from_bottom = len(self) - 1 - position
+        bucket = self._tree.find(from_bottom)
+        below = self._tree.prefix(bucket - 1) if bucket else 0
+        from_bucket_bottom = from_bottom - below
+        if bucket == 0:
+            # The players without points are the bottom of bucket 0.
+            zeros = self._ordered_zeros()
+            if from_bucket_bottom < len(zeros):
+                return zeros[len(zeros) - 1 - from_bucket_bottom], 0
+            from_bucket_bottom -= len(zeros)
+        players = self._buckets[bucket]
+        negative_score, user_id = players[len(players) - 1 - from_bucket_bottom]
+        return user_id, -negative_score
+
+    def _ordered_zeros(self) -> list[str]:
+        """Return the players without points by user id, sorted again only after they changed."""
+        if self._zero_order is None:
+            self._zero_order = sorted(self._zeros)
+        return self._zero_order
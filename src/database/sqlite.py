@@ -0,0 +1,266 @@
+"""Scoring database stored in a local SQLite file.
+
+Needs neither credentials nor network, e.g. to run the bot or its benchmarks
+offline. The database is in WAL mode, so reads don't wait for writes, and every
+statement is a constant bound with parameters, so SQLite prepares each one once
+per connection. Scores are in their own table indexed by
+``(guild_id, field, score)``: leaderboards and ranks are index range scans and
+``commit`` applies a batch of changes, and records its ``BatchId``, in one
+transaction.
+
+The single connection is opened by the first call and shared, behind a lock, by
+the threads of the ``BlockingExecutor`` running the calls.
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+
+from blocking import BlockingExecutor
+from metrics import METRICS
+
+from .epochs import is_score_key
+from .storage import BatchId, StorageBackend, UserChange
+
+COLUMNS = ("name", "last_played", "times_played", "wins", "failure")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    guild_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    last_played REAL NOT NULL DEFAULT 0,
+    times_played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    failure INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scores (
+    guild_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (guild_id, field, score);
+CREATE TABLE IF NOT EXISTS epochs (
+    guild_id INTEGER PRIMARY KEY,
+    epoch INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    writer TEXT PRIMARY KEY,
+    token TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS archive (
+    guild_id INTEGER NOT NULL,
+    epoch INTEGER NOT NULL,
+    leaderboard TEXT NOT NULL,
+    PRIMARY KEY (guild_id, epoch)
+);
+"""
+
+_SELECT_USERS = f"SELECT user_id, {', '.join(COLUMNS)} FROM users"  # noqa: S608
+_SELECT_SCORES = "SELECT user_id, field, score FROM scores"
+_CREATE_USER = "INSERT INTO users (guild_id, user_id) VALUES (?, ?) ON CONFLICT DO NOTHING"
+_REPLACE_USER = f"INSERT OR REPLACE INTO users (guild_id, user_id, {', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)"  # noqa: S608
+# Column -> statement setting it / adding to it.
+_SET_COLUMN = {column: f"UPDATE users SET {column} = ? WHERE guild_id = ? AND user_id = ?" for column in COLUMNS}  # noqa: S608
+_ADD_COLUMN = {
+    column: f"UPDATE users SET {column} = {column} + ? WHERE guild_id = ? AND user_id = ?"  # noqa: S608
+    for column in COLUMNS
+}
+_SET_SCORE = (
+    "INSERT INTO scores (guild_id, user_id, field, score) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT DO UPDATE SET score = excluded.score"
+)
+_ADD_SCORE = (
+    "INSERT INTO scores (guild_id, user_id, field, score) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT DO UPDATE SET score = score + excluded.score"
+)
+_SET_BATCH = "INSERT INTO batches (writer, token) VALUES (?, ?) ON CONFLICT DO UPDATE SET token = excluded.token"
+_TOP = (
+    f"SELECT s.user_id, {', '.join(f'u.{column}' for column in COLUMNS)}, s.score FROM scores AS s "  # noqa: S608
+    "JOIN users AS u USING (guild_id, user_id) "
+    "WHERE s.guild_id = ? AND s.field = ? ORDER BY s.score DESC LIMIT ?"
+)
+
+
+class SQLiteBackend(StorageBackend):
+    """Storage in a local SQLite database.
+
+    Attributes
+    ----------
+    path (Path): The database file, created if needed.
+
+    """
+
+    def __init__(self, path: str | Path, executor: BlockingExecutor) -> None:
+        """Initialize the SQLiteBackend.
+
+        Args:
+        ----
+        path (str | Path): The database file, created if needed.
+        executor (BlockingExecutor): Runs the blocking sqlite3 calls.
+
+        """
+        self.path = Path(path)
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    async def get_user(self, guild_id: int, user_id: str) -> dict | None:
+        """Return a user's record, None if the user doesn't exist."""
+        records = await self._run(
+            "get_user", self._records, "WHERE guild_id = ? AND user_id = ?", guild_id, str(user_id)
+        )
+        return records.get(str(user_id))
+
+    async def set_user(self, guild_id: int, user_id: str, record: Mapping[str, object]) -> None:
+        """Replace a user's record."""
+        await self._run("set_user", self._set_user, guild_id, str(user_id), record)
+
+    async def commit(self, changes: Sequence[UserChange], batch: BatchId | None = None) -> None:
+        """Apply every change, and record ``batch``, in one transaction."""
+        await self._run("commit", self._commit, changes, batch)
+
+    async def committed(self, batch: BatchId) -> bool:
+        """Return True if ``batch`` is the last batch committed by its writer."""
+        rows = await self._run("committed", self._query, "SELECT token FROM batches WHERE writer = ?", batch.writer)
+        return bool(rows) and rows[0][0] == batch.token
+
+    async def get_guild(self, guild_id: int) -> dict[str, dict]:
+        """Return the records of a guild, by user id."""
+        return await self._run("get_guild", self._records, "WHERE guild_id = ?", guild_id)
+
+    async def get_all(self) -> dict[int, dict[str, dict]]:
+        """Return the records of every guild, by guild id then user id."""
+        return await self._run("get_all", self._all)
+
+    async def top(self, guild_id: int, score_field: str, count: int) -> dict[str, dict]:
+        """Return the ``count`` records of a guild with the highest ``score_field``, by user id."""
+        rows = await self._run("top", self._query, _TOP, guild_id, score_field, count)
+        return {
+            user_id: {**dict(zip(COLUMNS, values, strict=True)), score_field: score}
+            for user_id, *values, score in rows
+        }
+
+    async def rank(self, guild_id: int, score_field: str, user_id: str) -> tuple[int | None, int]:
+        """Return a user's rank by ``score_field`` (None if they don't exist) and the number of players."""
+        return await self._run("rank", self._rank, guild_id, score_field, str(user_id))
+
+    async def get_epoch(self, guild_id: int) -> int:
+        """Return the guild's current epoch, 0 if it was never set."""
+        rows = await self._run("get_epoch", self._query, "SELECT epoch FROM epochs WHERE guild_id = ?", guild_id)
+        return rows[0][0] if rows else 0
+
+    async def start_epoch(self, guild_id: int, epoch: int, archive: list[dict] | None = None) -> None:
+        """Set the guild's epoch and archive the previous leaderboard in one transaction."""
+        await self._run("start_epoch", self._start_epoch, guild_id, epoch, archive)
+
+    def close(self) -> None:
+        """Close the connection, the next call opens it again."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _query(self, sql: str, *parameters: object) -> list[tuple]:
+        return self._connect().execute(sql, parameters).fetchall()
+
+    def _records(self, where: str, *parameters: object) -> dict[str, dict]:
+        connection = self._connect()
+        records = {
+            user_id: dict(zip(COLUMNS, values, strict=True))
+            for user_id, *values in connection.execute(f"{_SELECT_USERS} {where}", parameters)
+        }
+        for user_id, score_field, score in connection.execute(f"{_SELECT_SCORES} {where}", parameters):
+            if user_id in records:
+                records[user_id][score_field] = score
+        return records
+
+    def _all(self) -> dict[int, dict[str, dict]]:
+        guilds: dict[int, dict[str, dict]] = {}
+        for (guild_id,) in self._connect().execute("SELECT DISTINCT guild_id FROM users"):
+            guilds[guild_id] = self._records("WHERE guild_id = ?", guild_id)
+        return guilds
+
+    def _set_user(self, guild_id: int, user_id: str, record: Mapping[str, object]) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM scores WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+            connection.execute(
+                _REPLACE_USER,
+                (guild_id, user_id, record.get("name", ""), *(record.get(column, 0) for column in COLUMNS[1:])),
+            )
+            connection.executemany(
+                _SET_SCORE,
+                [(guild_id, user_id, key, value) for key, value in record.items() if is_score_key(key)],
+            )
+
+    def _commit(self, changes: Sequence[UserChange], batch: BatchId | None) -> None:
+        with self._connect() as connection:
+            if batch is not None:
+                connection.execute(_SET_BATCH, (batch.writer, batch.token))
+            for change in changes:
+                key = (change.guild_id, str(change.user_id))
+                connection.execute(_CREATE_USER, key)
+                for field, value in change.fields.items():
+                    if is_score_key(field):
+                        connection.execute(_SET_SCORE, (*key, field, value))
+                    else:
+                        connection.execute(_SET_COLUMN[field], (value, *key))
+                for field, amount in change.increments.items():
+                    if is_score_key(field):
+                        connection.execute(_ADD_SCORE, (*key, field, amount))
+                    else:
+                        connection.execute(_ADD_COLUMN[field], (amount, *key))
+
+    def _rank(self, guild_id: int, score_field: str, user_id: str) -> tuple[int | None, int]:
+        connection = self._connect()
+        (players,) = connection.execute("SELECT COUNT(*) FROM users WHERE guild_id = ?", (guild_id,)).fetchone()
+        exists = connection.execute(
+            "SELECT 1 FROM users WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+        ).fetchone()
+        if exists is None:
+            return None, players
+        row = connection.execute(
+            "SELECT score FROM scores WHERE guild_id = ? AND user_id = ? AND field = ?",
+            (guild_id, user_id, score_field),
+        ).fetchone()
+        (above,) = connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE guild_id = ? AND field = ? AND score > ?",
+            (guild_id, score_field, row[0] if row else 0),
+        ).fetchone()
+        return above + 1, players
+
+    def _start_epoch(self, guild_id: int, epoch: int, archive: list[dict] | None) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO epochs (guild_id, epoch) VALUES (?, ?) ON CONFLICT DO UPDATE SET epoch = excluded.epoch",
+                (guild_id, epoch),
+            )
+            if archive is not None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO archive (guild_id, epoch, leaderboard) VALUES (?, ?, ?)",
+                    (guild_id, epoch - 1, json.dumps(archive)),
+                )
+
+    def _locked[T](self, func: Callable[..., T], *args: object) -> T:
+        with self._lock:
+            return func(*args)
+
+    async def _run[T](self, operation: str, func: Callable[..., T], /, *args: object) -> T:
+        """Run a blocking sqlite3 call on the executor, timing it as ``database.<operation>``."""
+        with METRICS.timer(f"database.{operation}"):
+            return await self._executor.run(self._locked, func, *args)
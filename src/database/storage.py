@@ -0,0 +1,111 @@
+"""Pluggable storage of the scoring database.
+
+``DatabaseController`` keeps the caches and the game rules, the storage only
+reads and writes user records. ``StorageBackend`` is that interface.
+``database.firebase.FirebaseBackend`` stores them in the Firebase Realtime
+Database and ``database.sqlite.SQLiteBackend`` in a local SQLite file, which
+needs neither credentials nor network.
+
+Records are stored records, see ``database.epochs``: the user's name,
+``last_played``, their counters and one score field per epoch.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True, slots=True)
+class UserChange:
+    """Changes to one user record, committed with others by ``StorageBackend.commit``.
+
+    Attributes
+    ----------
+    guild_id (int): The guild id.
+    user_id (str): The user id.
+    fields (Mapping[str, object]): Fields to set.
+    increments (Mapping[str, int]): Amounts to add to fields, missing fields count as 0.
+
+    """
+
+    guild_id: int
+    user_id: str
+    fields: Mapping[str, object] = field(default_factory=dict)
+    increments: Mapping[str, int] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class BatchId:
+    """Identity of a batch of changes, recorded by ``StorageBackend.commit`` in the same write.
+
+    Attributes
+    ----------
+    writer (str): Who commits the batch, e.g. the name of a ``WriteBehind``. Only its last batch is remembered.
+    token (str): Unique token of the batch.
+
+    """
+
+    writer: str
+    token: str
+
+
+class StorageBackend(ABC):
+    """Where user records are stored."""
+
+    @abstractmethod
+    async def get_user(self, guild_id: int, user_id: str) -> dict | None:
+        """Return a user's record, None if the user doesn't exist."""
+
+    @abstractmethod
+    async def set_user(self, guild_id: int, user_id: str, record: Mapping[str, object]) -> None:
+        """Replace a user's record."""
+
+    @abstractmethod
+    async def commit(self, changes: Sequence[UserChange], batch: BatchId | None = None) -> None:
+        """Apply every change at once, in a single request or transaction. Missing users are created.
+
+        ``batch`` is recorded as its writer's last batch in the same request, see ``committed``.
+        """
+
+    @abstractmethod
+    async def committed(self, batch: BatchId) -> bool:
+        """Return True if ``batch`` is the last batch committed by its writer.
+
+        A batch whose commit failed or timed out may have been applied anyway, this tells whether to retry it.
+        """
+
+    @abstractmethod
+    async def get_guild(self, guild_id: int) -> dict[str, dict]:
+        """Return the records of a guild, by user id."""
+
+    @abstractmethod
+    async def get_all(self) -> dict[int, dict[str, dict]]:
+        """Return the records of every guild, by guild id then user id."""
+
+    @abstractmethod
+    async def top(self, guild_id: int, score_field: str, count: int) -> dict[str, dict]:
+        """Return at least the ``count`` records of a guild with the highest ``score_field``, by user id."""
+
+    async def rank(self, guild_id: int, score_field: str, user_id: str) -> tuple[int | None, int] | None:  # noqa: ARG002
+        """Return a user's rank by ``score_field`` and the number of players, see ``DatabaseController.get_rank``.
+
+        Returns None if the storage can't answer without reading the whole guild.
+        """
+        return None
+
+    @abstractmethod
+    async def get_epoch(self, guild_id: int) -> int:
+        """Return the guild's current epoch, 0 if it was never set."""
+
+    @abstractmethod
+    async def start_epoch(self, guild_id: int, epoch: int, archive: list[dict] | None = None) -> None:
+        """Set the guild's epoch in one write, with ``archive`` as the final leaderboard of the previous one."""
+
+    def start(self) -> None:  # noqa: B027
+        """Start the storage's background work on the running event loop, nothing by default."""
+
+    async def flush(self) -> None:  # noqa: B027
+        """Write the changes buffered by the storage, nothing by default."""
+
+    def close(self) -> None:  # noqa: B027
+        """Release the storage's resources, nothing by default."""
@@ -0,0 +1,359 @@
+"""Write-behind buffering of the scoring database's writes.
+
+Every game commits a change per guild (the player's guild and the global
+board). ``WriteBehind`` wraps a ``StorageBackend`` and acknowledges commits as
+soon as they are merged with the other pending changes of the same user and
+appended to a local journal, synced to disk before the commit returns. A
+background task commits everything pending in one batch every ``interval``
+seconds, or as soon as ``max_entries`` users are pending, and then drops the
+journal.
+
+Each batch is committed with a ``BatchId`` (the buffer's ``name`` and a random
+token) recorded in the same write. A batch whose commit failed, timed out or was
+cut short by a crash is kept apart from the newer changes, with its journal, and
+retried as is, unless the storage reports it committed. After a crash the
+journals are replayed, so no acknowledged result is lost, and none is written
+twice. Only a commit still running after its timeout can escape the check.
+
+Reads of a single user see the pending changes. Reads spanning many users flush
+first, as do writes that must be ordered after the pending ones.
+
+The metrics, prefixed by ``name``: ``.pending`` (users) and ``.journal_depth``
+(journal lines) gauges, ``.flush_size`` and ``.lag`` (age of the oldest change
+flushed) timings, ``.flushes``, ``.flushed`` and ``.errors`` counters.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import TextIO
+from uuid import uuid4
+
+from metrics import METRICS
+
+from .storage import BatchId, StorageBackend, UserChange
+
+
+def merge(pending: UserChange | None, change: UserChange) -> UserChange:
+    """Return the change applying ``pending`` then ``change``, which are for the same user.
+
+    Set fields win over earlier increments and absorb later ones, so no field is both set and incremented.
+    """
+    if pending is None:
+        return change
+
+    fields = dict(pending.fields)
+    increments = {key: amount for key, amount in pending.increments.items() if key not in change.fields}
+    fields.update(change.fields)
+    for key, amount in change.increments.items():
+        if key in fields:
+            fields[key] = fields[key] + amount
+        else:
+            increments[key] = increments.get(key, 0) + amount
+    return UserChange(change.guild_id, change.user_id, fields=fields, increments=increments)
+
+
+def _apply(record: Mapping, change: UserChange) -> dict:
+    """Return ``record`` with ``change`` applied."""
+    applied = {**record, **change.fields}
+    for key, amount in change.increments.items():
+        applied[key] = applied.get(key, 0) + amount
+    return applied
+
+
+def _sync_directory(path: Path) -> None:
+    """Sync a directory, so the files created or renamed in it survive a crash of the host."""
+    if os.name != "posix":
+        # Directories can't be opened on Windows, the rename is left to the file system.
+        return
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class WriteBehind(StorageBackend):
+    """Storage buffering the commits made to another one.
+
+    Attributes
+    ----------
+    storage (StorageBackend): Where the changes end up.
+    journal (Path): The journal of the pending changes.
+    name (str): Name of the buffer's batches and prefix of its metrics, unique per storage.
+    interval (float): Seconds between flushes.
+    max_entries (int): Pending users triggering a flush before ``interval``.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        storage: StorageBackend,
+        journal: str | Path,
+        *,
+        name: str = "write_behind",
+        interval: float = 0.5,
+        max_entries: int = 100,
+    ) -> None:
+        """Initialize the WriteBehind, with the changes left in the journal by a previous run.
+
+        Args:
+        ----
+        storage (StorageBackend): Where the changes end up.
+        journal (str | Path): The journal file. ``<journal>.flushing`` holds a batch being committed.
+        name (str): Name of the buffer's batches and prefix of its metrics, unique per storage.
+        interval (float): Seconds between flushes.
+        max_entries (int): Pending users triggering a flush before ``interval``.
+
+        """
+        self.storage = storage
+        self.journal = Path(journal)
+        self.name = name
+        self.interval = interval
+        self.max_entries = max(max_entries, 1)
+        self._flushing_journal = self.journal.with_name(f"{self.journal.name}.flushing")
+        self._pending: dict[tuple[int, str], UserChange] = {}
+        # Monotonic time of the oldest pending change.
+        self._oldest: float | None = None
+        # The batch being (or that failed to be) committed, its changes by user and the time of its oldest change.
+        self._batch: tuple[BatchId, dict[tuple[int, str], UserChange], float] | None = None
+        # Lines in the journal, and in the journal of the batch being (or that failed to be) flushed.
+        self._journal_depth = 0
+        self._flushing_depth = 0
+        self._file: TextIO | None = None
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._replay()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of users with pending changes, counting a failed batch apart."""
+        return len(self._pending) + (len(self._batch[1]) if self._batch is not None else 0)
+
+    @property
+    def running(self) -> bool:
+        """Return True if the flush task is alive."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop, if it isn't running already."""
+        if self.running:
+            return
+
+        self._full = asyncio.Event()
+        if self.pending:
+            self._full.set()
+        self._task = asyncio.create_task(self._flush_forever(), name=f"{self.name}-flush")
+
+    async def flush(self) -> None:
+        """Commit the batch of a failed flush, if any, then every pending change in one batch."""
+        async with self._lock:
+            if self._batch is not None:
+                await self._commit_batch(retry=True)
+            if self._pending:
+                self._rotate_journal()
+                await self._commit_batch(retry=False)
+
+    async def commit(self, changes: Sequence[UserChange], batch: BatchId | None = None) -> None:  # noqa: ARG002
+        """Journal the changes and merge them into the pending ones. They are flushed in the buffer's own batches."""
+        self.start()
+        if not changes:
+            return
+
+        self._write_journal(changes)
+        self._merge(changes)
+        self._gauges()
+        if len(self._pending) >= self.max_entries:
+            self._full.set()
+
+    async def get_user(self, guild_id: int, user_id: str) -> dict | None:
+        """Return a user's record, with their pending changes."""
+        key = (int(guild_id), str(user_id))
+        # Not during a flush, whose batch is neither pending nor surely committed.
+        async with self._lock:
+            record = await self.storage.get_user(guild_id, user_id)
+            change = None
+            if self._batch is not None and key in self._batch[1] and not await self.storage.committed(self._batch[0]):
+                change = self._batch[1][key]
+        if key in self._pending:
+            change = merge(change, self._pending[key])
+        if change is None:
+            return record
+        return _apply(record or {}, change)
+
+    async def committed(self, batch: BatchId) -> bool:
+        """Return True if ``batch`` is the last batch committed by its writer."""
+        return await self.storage.committed(batch)
+
+    async def set_user(self, guild_id: int, user_id: str, record: Mapping[str, object]) -> None:
+        """Replace a user's record, after the pending changes."""
+        await self.flush()
+        await self.storage.set_user(guild_id, user_id, record)
+
+    async def get_guild(self, guild_id: int) -> dict[str, dict]:
+        """Return the records of a guild, after the pending changes."""
+        await self.flush()
+        return await self.storage.get_guild(guild_id)
+
+    async def get_all(self) -> dict[int, dict[str, dict]]:
+        """Return the records of every guild, after the pending changes."""
+        await self.flush()
+        return await self.storage.get_all()
+
+    async def top(self, guild_id: int, score_field: str, count: int) -> dict[str, dict]:
+        """Return the best records of a guild, after the pending changes."""
+        await self.flush()
+        return await self.storage.top(guild_id, score_field, count)
+
+    async def rank(self, guild_id: int, score_field: str, user_id: str) -> tuple[int | None, int] | None:
+        """Return a user's rank, after the pending changes."""
+        await self.flush()
+        return await self.storage.rank(guild_id, score_field, user_id)
+
+    async def get_epoch(self, guild_id: int) -> int:
+        """Return the guild's current epoch."""
+        return await self.storage.get_epoch(guild_id)
+
+    async def start_epoch(self, guild_id: int, epoch: int, archive: list[dict] | None = None) -> None:
+        """Start a new epoch, after the pending changes of the previous one."""
+        await self.flush()
+        await self.storage.start_epoch(guild_id, epoch, archive)
+
+    def close(self) -> None:
+        """Stop the flush task and close the journal and the storage. Pending changes stay in the journal."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.storage.close()
+
+    async def _flush_forever(self) -> None:
+        """Flush every ``interval`` seconds, or as soon as enough users are pending."""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logging.exception("Write-behind %s failed to flush %d users", self.name, self.pending)
+
+    async def _commit_batch(self, *, retry: bool) -> None:
+        """Commit the current batch, skipped if a previous attempt was applied, then drop its journal."""
+        batch, changes, oldest = self._batch
+        try:
+            if not (retry and await self.storage.committed(batch)):
+                await self.storage.commit(list(changes.values()), batch)
+        except Exception:
+            METRICS.incr(f"{self.name}.errors")
+            # Kept with its journal and token, apart from the newer changes, for the next flush.
+            self._gauges()
+            raise
+
+        self._batch = None
+        self._flushing_journal.unlink(missing_ok=True)
+        self._flushing_depth = 0
+        METRICS.incr(f"{self.name}.flushes")
+        METRICS.incr(f"{self.name}.flushed", len(changes))
+        METRICS.observe(f"{self.name}.flush_size", len(changes))
+        METRICS.observe(f"{self.name}.lag", time.monotonic() - oldest)
+        self._gauges()
+
+    def _merge(self, changes: Sequence[UserChange]) -> None:
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        for change in changes:
+            key = (int(change.guild_id), str(change.user_id))
+            self._pending[key] = merge(self._pending.get(key), change)
+
+    def _write_journal(self, changes: Sequence[UserChange]) -> None:
+        """Append the changes to the journal, synced to disk so they survive a crash of the host."""
+        if self._file is None:
+            self.journal.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.journal.open("a", encoding="utf-8")
+            _sync_directory(self.journal.parent)
+        line = [
+            [change.guild_id, str(change.user_id), dict(change.fields), dict(change.increments)] for change in changes
+        ]
+        self._file.write(json.dumps(line) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._journal_depth += 1
+
+    def _rotate_journal(self) -> None:
+        """Make the pending changes a new batch, their journal moved to ``<journal>.flushing``."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.journal.exists():
+            self.journal.replace(self._flushing_journal)
+            _sync_directory(self.journal.parent)
+        self._flushing_depth, self._journal_depth = self._journal_depth, 0
+        self._start_batch(uuid4().hex, journaled=False)
+
+    def _start_batch(self, token: str, *, journaled: bool) -> None:
+        """Make the pending changes the batch ``token``, written at the end of its journal unless ``journaled``."""
+        if not journaled:
+            # Before the first attempt, so a replayed batch is checked before being committed again.
+            with self._flushing_journal.open("a", encoding="utf-8") as flushing:
+                flushing.write(json.dumps(token) + "\n")
+                flushing.flush()
+                os.fsync(flushing.fileno())
+        self._batch = (BatchId(self.name, token), self._pending, self._oldest or time.monotonic())
+        self._pending, self._oldest = {}, None
+
+    def _replay(self) -> None:
+        """Load the batch and the changes journaled by a previous run."""
+        if self._flushing_journal.exists():
+            token = self._replay_journal(self._flushing_journal)
+            self._flushing_depth, self._journal_depth = self._journal_depth, 0
+            if self._pending:
+                # Without a token, the batch was cut short before its first attempt: it gets a new one.
+                self._start_batch(token or uuid4().hex, journaled=token is not None)
+            else:
+                self._flushing_journal.unlink()
+                self._flushing_depth = 0
+        if self.journal.exists():
+            self._replay_journal(self.journal)
+        if self.pending:
+            logging.info("Write-behind %s replayed %d users from its journals", self.name, self.pending)
+        self._gauges()
+
+    def _replay_journal(self, path: Path) -> str | None:
+        """Merge the changes of a journal into the pending ones, counting its lines. Return its token, if any."""
+        token = None
+        text = path.read_text(encoding="utf-8")
+        if text and not text.endswith("\n"):
+            # End the line cut short by the crash, so the next one is written after it.
+            with path.open("a", encoding="utf-8") as journal:
+                journal.write("\n")
+        for line in text.splitlines():
+            try:
+                entries = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by the crash was never acknowledged.
+                logging.warning("Write-behind %s skipped a truncated journal line", self.name)
+                continue
+            if isinstance(entries, str):
+                token = entries
+                continue
+            self._journal_depth += 1
+            self._merge(
+                [
+                    UserChange(guild_id, user_id, fields, increments)
+                    for guild_id, user_id, fields, increments in entries
+                ]
+            )
+        return token
+
+    def _gauges(self) -> None:
+        METRICS.gauge(f"{self.name}.pending", self.pending)
+        METRICS.gauge(f"{self.name}.journal_depth", self._journal_depth + self._flushing_depth)
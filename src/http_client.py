@@ -0,0 +1,161 @@
+"""Shared, pooled HTTP client for every outbound request.
+
+Creating an ``aiohttp.ClientSession`` per request costs a DNS lookup and a new
+TCP+TLS handshake each time. ``HTTP`` is a single process-wide session with
+keep-alive, per-host connection limits and a DNS cache. Each upstream (e.g. the
+Wikimedia REST API or api-ninjas) is registered with its own timeout and headers.
+"""
+
+import os
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import aiohttp
+
+from metrics import METRICS
+
+
+@dataclass(frozen=True)
+class Upstream:
+    """Settings for one upstream service."""
+
+    name: str
+    timeout: aiohttp.ClientTimeout
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class UnknownUpstreamError(KeyError):
+    """The upstream hasn't been registered with ``HttpClient.add_upstream``."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Unknown upstream: {name}")
+
+
+class HttpClient:
+    """Process-wide ``aiohttp`` session with per-upstream settings.
+
+    The session is created by ``start`` (or lazily on the first request) and
+    must be closed with ``close`` on shutdown.
+    """
+
+    def __init__(self, *, limit_per_host: int = 8, keepalive_timeout: float = 30, dns_ttl: int = 300) -> None:
+        """Initialize the HttpClient.
+
+        Args:
+        ----
+        limit_per_host (int): Maximum simultaneous connections to a single host.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        dns_ttl (int): Seconds DNS lookups are cached for.
+
+        """
+        self._session: aiohttp.ClientSession | None = None
+        self._upstreams: dict[str, Upstream] = {}
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+
+    def add_upstream(self, name: str, *, timeout: float, headers: dict[str, str] | None = None) -> None:
+        """Register an upstream service.
+
+        Args:
+        ----
+        name (str): Name used when making requests and in metrics.
+        timeout (float): Total timeout, in seconds, of a request to this upstream.
+        headers (dict[str, str] | None): Headers sent with every request to this upstream.
+
+        """
+        self._upstreams[name] = Upstream(name, aiohttp.ClientTimeout(total=timeout), headers or {})
+
+    async def start(self) -> None:
+        """Open the shared session."""
+        self._ensure_session()
+
+    async def close(self) -> None:
+        """Close the shared session and every pooled connection."""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    def get(self, url: str, *, upstream: str, **kwargs: object) -> aiohttp.client._RequestContextManager:
+        """Make a GET request to a registered upstream, use as an async context manager."""
+        return self.request("GET", url, upstream=upstream, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        upstream: str,
+        **kwargs: object,
+    ) -> aiohttp.client._RequestContextManager:
+        """Make a request to a registered upstream, use as an async context manager.
+
+        Raises
+        ------
+        UnknownUpstreamError: If ``upstream`` wasn't registered.
+
+        """
+        try:
+            settings = self._upstreams[upstream]
+        except KeyError as err:
+            raise UnknownUpstreamError(upstream) from err
+
+        headers = {**settings.headers, **kwargs.pop("headers", {})}
+        kwargs.setdefault("timeout", settings.timeout)
+        return self._ensure_session().request(
+            method,
+            url,
+            headers=headers,
+            trace_request_ctx=SimpleNamespace(upstream=upstream),
+            **kwargs,
+        )
+
+    def stats(self) -> dict[str, float]:
+        """Return connection reuse statistics."""
+        return {
+            "requests": METRICS.counter("http.requests"),
+            "connections_created": METRICS.counter("http.connections_created"),
+            "connections_reused": METRICS.counter("http.connections_reused"),
+            "reuse_rate": METRICS.ratio("http.connections_reused", "http.connections_created"),
+            "dns_cache_hit_rate": METRICS.ratio("http.dns_cache_hits", "http.dns_cache_misses"),
+        }
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[_trace_config()])
+        return self._session
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config recording requests and connection reuse in ``METRICS``."""
+
+    def count(name: str) -> object:
+        async def callback(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+            METRICS.incr(f"http.{name}")
+            upstream = getattr(context.trace_request_ctx, "upstream", None)
+            if upstream is not None:
+                METRICS.incr(f"http.{upstream}.{name}")
+
+        return callback
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(count("requests"))
+    trace_config.on_request_exception.append(count("errors"))
+    trace_config.on_connection_create_end.append(count("connections_created"))
+    trace_config.on_connection_reuseconn.append(count("connections_reused"))
+    trace_config.on_dns_cache_hit.append(count("dns_cache_hits"))
+    trace_config.on_dns_cache_miss.append(count("dns_cache_misses"))
+    return trace_config
+
+
+# Pre-instantiated client shared by the whole bot.
+HTTP = HttpClient(
+    limit_per_host=int(os.environ.get("HTTP_LIMIT_PER_HOST", "8")),
+    keepalive_timeout=float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "30")),
+    dns_ttl=int(os.environ.get("HTTP_DNS_TTL", "300")),
+)
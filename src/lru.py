@@ -0,0 +1,143 @@
+"""Small bounded least-recently-used caches."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+from metrics import METRICS
+
+
+class LRUCache[K, V]:
+    """Mapping that evicts its least recently used entry once ``maxsize`` is reached.
+
+    Attributes
+    ----------
+    maxsize (int): The maximum number of entries kept.
+    name (str | None): If set, hits and misses are recorded as ``<name>.hits``/``<name>.misses``.
+
+    """
+
+    def __init__(self, maxsize: int, *, name: str | None = None) -> None:
+        """Initialize the LRUCache.
+
+        Args:
+        ----
+        maxsize (int): The maximum number of entries kept.
+        name (str | None): Metrics prefix for hit/miss counters.
+
+        """
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self.maxsize = maxsize
+        self.name = name
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Return the value for ``key`` and mark it as recently used, or ``default``."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._record("misses")
+            return default
+
+        self._data.move_to_end(key)
+        self._record("hits")
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entry if needed."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        """Remove ``key`` and return its value, or ``default``."""
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._data.clear()
+
+    def _record(self, outcome: str) -> None:
+        if self.name is not None:
+            METRICS.incr(f"{self.name}.{outcome}")
+
+
+class TTLCache[K, V]:
+    """LRU cache whose entries also expire ``ttl`` seconds after being stored.
+
+    Attributes
+    ----------
+    maxsize (int): The maximum number of entries kept.
+    ttl (float): Default lifetime of an entry in seconds.
+    name (str | None): If set, hits and misses are recorded as ``<name>.hits``/``<name>.misses``.
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        *,
+        ttl: float,
+        name: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the TTLCache.
+
+        Args:
+        ----
+        maxsize (int): The maximum number of entries kept.
+        ttl (float): Default lifetime of an entry in seconds.
+        name (str | None): Metrics prefix for hit/miss counters.
+        clock (Callable[[], float]): Source of the current time.
+
+        """
+        self._entries: LRUCache[K, tuple[float, V]] = LRUCache(maxsize)
+        self._clock = clock
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries._data.get(key)  # noqa: SLF001
+        return entry is not None and entry[0] > self._clock()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Return the unexpired value for ``key`` and mark it as recently used, or ``default``."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                self._entries.pop(key)
+            self._record("misses")
+            return default
+
+        self._record("hits")
+        return entry[1]
+
+    def put(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds (the cache's default if None)."""
+        self._entries.put(key, (self._clock() + (self.ttl if ttl is None else ttl), value))
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        """Remove ``key`` and return its value, or ``default``."""
+        entry = self._entries.pop(key)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+
+    def _record(self, outcome: str) -> None:
+        if self.name is not None:
+            METRICS.incr(f"{self.name}.{outcome}")
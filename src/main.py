@@ -22,11 +22,35 @@ from cmds import (
     wikirandom,
     wikisearch,
 )
+from database.database_core import DATA, DB_EXECUTOR
+from http_client import HTTP
+from wikiutils import ARTICLE_POOL, WIKI_EXECUTOR
+
+
+class WikiWabbit(discord.Client):
+    """Discord client that owns the bot's shared resources."""
+
+    async def setup_hook(self) -> None:
+        """Open the shared HTTP client, start warming the article pool and flushing database writes."""
+        await HTTP.start()
+        ARTICLE_POOL.start()
+        DATA.start()
+
+    async def close(self) -> None:
+        """Release the shared resources before disconnecting."""
+        await ARTICLE_POOL.stop()
+        await HTTP.close()
+        await DATA.flush()
+        WIKI_EXECUTOR.shutdown()
+        DB_EXECUTOR.shutdown()
+        DATA.close()
+        await super().close()
+
 
 # loads the enviroment variables and initilazies the discord client
 load_dotenv(".env")
 intents = discord.Intents.all()
-client = discord.Client(
+client = WikiWabbit(
     intents=intents,
     heartbeat_timeout=120.0,
 )
@@ -0,0 +1,82 @@
+"""Lightweight in-process metrics.
+
+This module contains a tiny registry of counters, gauges and timings used to
+observe the bot's hot paths (pools, caches, upstream calls). Nothing is pushed
+anywhere; call ``METRICS.snapshot()`` (or log it) to inspect the values.
+"""
+
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from statistics import fmean, quantiles
+
+_TIMING_SAMPLES = 1_024
+
+
+class Metrics:
+    """Registry of named counters, gauges and timings."""
+
+    def __init__(self) -> None:
+        self._counters: defaultdict[str, int] = defaultdict(int)
+        self._gauges: dict[str, float] = {}
+        self._timings: defaultdict[str, deque[float]] = defaultdict(lambda: deque(maxlen=_TIMING_SAMPLES))
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Increment the counter ``name`` by ``amount``."""
+        self._counters[name] += amount
+
+    def gauge(self, name: str, value: float) -> None:
+        """Set the gauge ``name`` to ``value``."""
+        self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a single duration sample for the timing ``name``."""
+        self._timings[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the body of a ``with`` block and record it under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> int:
+        """Return the current value of the counter ``name``."""
+        return self._counters.get(name, 0)
+
+    def ratio(self, numerator: str, *others: str) -> float:
+        """Return ``numerator / (numerator + others)`` for a set of counters, or 0.0 if all are zero."""
+        top = self.counter(numerator)
+        total = top + sum(self.counter(name) for name in others)
+        return top / total if total else 0.0
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return a copy of every metric, with timings summarised."""
+        timings = {}
+        for name, samples in self._timings.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            cuts = quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else [ordered[0]] * 99
+            timings[name] = {
+                "count": len(ordered),
+                "mean": fmean(ordered),
+                "p50": cuts[49],
+                "p95": cuts[94],
+                "max": ordered[-1],
+            }
+
+        return {"counters": dict(self._counters), "gauges": dict(self._gauges), "timings": timings}
+
+    def reset(self) -> None:
+        """Forget every recorded value."""
+        self._counters.clear()
+        self._gauges.clear()
+        self._timings.clear()
+
+
+# Pre-instantiated registry shared by the whole bot.
+METRICS = Metrics()
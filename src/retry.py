@@ -0,0 +1,129 @@
+"""Bounded retries with jittered exponential backoff.
+
+Retrying by recursion (e.g. drawing another random article whenever the last
+one was a redirect) has no upper bound: when an upstream misbehaves it turns
+into a storm of back-to-back requests and can hit the recursion limit. Here
+every call site gets a ``RetryPolicy`` with an attempt and a time budget, waits
+a jittered, growing delay between attempts and keeps its own counters in
+``METRICS`` (``retry.<name>.attempts``, ``.retries``, ``.errors``, ``.exhausted``).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+from metrics import METRICS
+
+
+class RetryBudgetExceededError(RuntimeError):
+    """Every attempt allowed by a ``RetryPolicy`` failed."""
+
+    def __init__(self, name: str, attempts: int) -> None:
+        super().__init__(f"{name} failed after {attempts} attempts")
+        self.name = name
+        self.attempts = attempts
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How hard a call site tries before giving up.
+
+    Attributes
+    ----------
+    attempts (int): The maximum number of attempts.
+    deadline (float): Seconds after which no new attempt is started.
+    base_delay (float): Upper bound of the first delay, doubled after every attempt.
+    max_delay (float): Upper bound of any delay.
+    retry_on (tuple[type[Exception], ...]): Exceptions counted as a failed attempt, anything else propagates.
+
+    """
+
+    attempts: int = 5
+    deadline: float = 30.0
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    retry_on: tuple[type[Exception], ...] = ()
+
+    def delay(self, attempt: int) -> float:
+        """Return the "full jitter" delay to wait after the failed attempt ``attempt`` (from 1)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))  # noqa: S311
+
+
+async def retry[T](name: str, attempt: Callable[[], Awaitable[T | None]], policy: RetryPolicy) -> T:
+    """Await ``attempt()`` until it returns something other than None, within the policy's budget.
+
+    Args:
+    ----
+    name (str): Name of the call site, used for logs and metrics.
+    attempt (Callable[[], Awaitable[T | None]]): One attempt. None, or raising one of
+        ``policy.retry_on``, means try again.
+    policy (RetryPolicy): The budget.
+
+    Returns:
+    -------
+    T: The first result that isn't None.
+
+    Raises:
+    ------
+    RetryBudgetExceededError: If no attempt succeeded, chained to the last error if any.
+
+    """
+    deadline = time.monotonic() + policy.deadline
+    error: Exception | None = None
+
+    for number in range(1, policy.attempts + 1):
+        METRICS.incr(f"retry.{name}.attempts")
+        try:
+            result = await attempt()
+        except policy.retry_on as e:
+            METRICS.incr(f"retry.{name}.errors")
+            logging.info("Retry %s: attempt %d failed: %r", name, number, e)
+            error = e
+        else:
+            if result is not None:
+                return result
+
+        remaining = deadline - time.monotonic()
+        if number == policy.attempts or remaining <= 0:
+            break
+        METRICS.incr(f"retry.{name}.retries")
+        await asyncio.sleep(min(policy.delay(number), remaining))
+
+    METRICS.incr(f"retry.{name}.exhausted")
+    raise RetryBudgetExceededError(name, number) from error
+
+
+async def first_valid[C, T](
+    name: str,
+    draw: Callable[[], Awaitable[Sequence[C]]],
+    validate: Callable[[Sequence[C]], Awaitable[T | None]],
+    policy: RetryPolicy,
+) -> T:
+    """Draw a batch of candidates and validate them together, until one is valid.
+
+    Args:
+    ----
+    name (str): Name of the call site, used for logs and metrics.
+    draw (Callable[[], Awaitable[Sequence[C]]]): Returns a batch of candidates, possibly empty.
+    validate (Callable[[Sequence[C]], Awaitable[T | None]]): Checks the whole batch (e.g. in one
+        request) and returns the first valid candidate, or None.
+    policy (RetryPolicy): The budget, one attempt per batch.
+
+    Returns:
+    -------
+    T: The first valid candidate.
+
+    Raises:
+    ------
+    RetryBudgetExceededError: If no batch had a valid candidate.
+
+    """
+
+    async def attempt() -> T | None:
+        candidates = await draw()
+        return await validate(candidates) if candidates else None
+
+    return await retry(name, attempt, policy)
@@ -0,0 +1,49 @@
+"""Local verification of guessed article titles.
+
+Every wiki-guesser guess used to be searched on Wikipedia before being compared
+to the answer. The answer's canonical title and the titles redirecting to it are
+known when the game starts, so ``TitleAliases`` keeps their normalized forms in
+a set and most guesses are checked without any network I/O.
+"""
+
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from wiki.metadata import ArticleRecord
+
+
+def normalize_title(title: str) -> str:
+    """Return the form titles are compared in: casefolded, without diacritics, with whitespace collapsed."""
+    decomposed = unicodedata.normalize("NFKD", title.replace("_", " "))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+@dataclass(frozen=True, slots=True)
+class TitleAliases:
+    """The normalized titles that all name one article.
+
+    Attributes
+    ----------
+    canonical (str): The article's canonical title.
+    aliases (frozenset[str]): Normalized forms of the canonical title and its redirects.
+
+    """
+
+    canonical: str
+    aliases: frozenset[str]
+
+    @classmethod
+    def from_titles(cls, canonical: str, redirects: Iterable[str] = ()) -> "TitleAliases":
+        """Build the alias set of an article from its canonical title and the titles redirecting to it."""
+        return cls(canonical, frozenset(normalize_title(title) for title in (canonical, *redirects)))
+
+    @classmethod
+    def from_record(cls, record: ArticleRecord) -> "TitleAliases":
+        """Build the alias set of an article from its record (fetched with ``redirects=True``)."""
+        return cls.from_titles(record.title(), record.redirects)
+
+    def matches(self, title: str) -> bool:
+        """Return True if ``title`` names the article."""
+        return normalize_title(title) in self.aliases
@@ -0,0 +1,148 @@
+"""Pluggable sources of articles.
+
+The games only need a handful of operations: resolve a title, search, pick a
+random popular article, read an article's record and filter by categories.
+``ArticleBackend`` is that interface. ``wikiutils.LiveBackend`` answers it from
+the live Wikipedia API and ``DumpBackend`` from a local ``wiki.dump`` file,
+without any network I/O.
+"""
+
+import dataclasses
+import secrets
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+
+from pywikibot import Page
+
+from wiki.categories import contains
+from wiki.dump import DumpReader
+from wiki.links import reservoir_sample
+from wiki.metadata import ArticleRecord
+from wiki.pageviews import Difficulty
+
+type Article = Page | ArticleRecord
+
+
+class ArticleBackend(ABC):
+    """Source of the articles the games are played with."""
+
+    @abstractmethod
+    async def search(self, query: str) -> Article | None:
+        """Return the article best matching ``query``, or None."""
+
+    @abstractmethod
+    async def search_all(self, query: str, max_number: int) -> tuple[Article, ...]:
+        """Return up to ``max_number`` articles matching ``query``."""
+
+    @abstractmethod
+    async def random_article(self, difficulty: Difficulty | None = None) -> Article:
+        """Return a random popular article, in the ``difficulty`` tier if given."""
+
+    @abstractmethod
+    async def records(self, titles: Iterable[str], **kwargs: object) -> dict[str, ArticleRecord | None]:
+        """Return the records of the titles, see ``wiki.metadata.fetch_records`` for ``kwargs``."""
+
+    @abstractmethod
+    async def sample_links(self, title: str, count: int, *, limit: int | None = None) -> list[str]:
+        """Return ``count`` mainspace titles drawn uniformly from the first ``limit`` the article links to."""
+
+    @abstractmethod
+    async def category_articles(self, categories: Sequence[str], *, exclude: set[int]) -> list[Article]:
+        """Return a random article in every category, skipping the page ids in ``exclude`` (empty if none)."""
+
+    @abstractmethod
+    async def with_categories(self, articles: Iterable[Article], categories: Sequence[str]) -> list[Article]:
+        """Return the articles that are in every category."""
+
+
+class DumpBackend(ArticleBackend):
+    """Backend serving everything from a memory-mapped dump.
+
+    Searches are exact (normalised) title and redirect lookups, falling back to
+    title prefix matches. Extracts are intro extracts only.
+
+    Attributes
+    ----------
+    dump (DumpReader): The dump.
+    top (int | None): Random picks are drawn from this many of the most viewed articles.
+
+    """
+
+    def __init__(self, dump: DumpReader, *, top: int | None = None) -> None:
+        """Initialize the DumpBackend.
+
+        Args:
+        ----
+        dump (DumpReader): The dump.
+        top (int | None): Random picks are drawn from this many of the most viewed articles, None for all.
+
+        """
+        self.dump = dump
+        self.top = top
+
+    async def search(self, query: str) -> ArticleRecord | None:
+        """Return the article titled (or redirected from) ``query``, else the first title starting with it."""
+        record = self.dump.lookup(query)
+        if record is not None:
+            return record
+        return next(iter(self.dump.prefix(query, 1)), None)
+
+    async def search_all(self, query: str, max_number: int) -> tuple[ArticleRecord, ...]:
+        """Return up to ``max_number`` articles whose title starts with ``query``."""
+        return tuple(self.dump.prefix(query, max_number))
+
+    async def random_article(self, difficulty: Difficulty | None = None) -> ArticleRecord:
+        """Return a random article among the most viewed, in the ``difficulty`` tier if given."""
+        if difficulty is None:
+            return self.dump.random(self.top)
+
+        ranked = self.dump.ranked if self.top is None else min(self.top, self.dump.ranked)
+        start, stop = difficulty.ranks(ranked)
+        return self.dump.random(stop, start=start)
+
+    async def records(
+        self,
+        titles: Iterable[str],
+        *,
+        extract_chars: int | None = 1200,
+        links: int = 50,
+        **_: object,
+    ) -> dict[str, ArticleRecord | None]:
+        """Return the records of the titles, trimmed like ``fetch_records`` would."""
+        found = {}
+        for title in titles:
+            record = self.dump.lookup(title)
+            if record is not None:
+                record = dataclasses.replace(
+                    record,
+                    summary="" if extract_chars == 0 else record.extract(extract_chars),
+                    links=record.links[:links],
+                )
+            found[title] = record
+        return found
+
+    async def sample_links(self, title: str, count: int, *, limit: int | None = None) -> list[str]:
+        """Return ``count`` titles drawn uniformly from the first ``limit`` the article links to."""
+        record = self.dump.lookup(title)
+        return reservoir_sample(record.links[:limit], count) if record is not None else []
+
+    async def category_articles(self, categories: Sequence[str], *, exclude: set[int]) -> list[ArticleRecord]:
+        """Return a random article in every category, skipping the page ids in ``exclude``."""
+        indexes = sorted((self.dump.category_members(category) for category in categories), key=len)
+        if not indexes:
+            return []
+
+        smallest, *others = indexes
+        pageids = [
+            pageid for pageid in smallest if pageid not in exclude and all(contains(other, pageid) for other in others)
+        ]
+        if not pageids:
+            return []
+
+        record = self.dump.get(pageids[secrets.randbelow(len(pageids))])
+        return [record] if record is not None else []
+
+    async def with_categories(self, articles: Iterable[Article], categories: Sequence[str]) -> list[Article]:
+        """Return the articles that are in every category."""
+        indexes = [self.dump.category_members(category) for category in categories]
+        return [article for article in articles if all(contains(index, article.pageid) for index in indexes)]
@@ -0,0 +1,90 @@
+"""Censoring of an article's title out of its excerpt.
+
+Wiki-guesser shows an article's excerpt without the words of its title. Every
+title word, in any case and with or without diacritics ("Dvorak" also hides
+"Dvořák", "Straße" both "Straße" and "Strasse"), is compiled into a single
+regular expression, so the excerpt is censored in one pass. Short words are only hidden as whole words, longer ones
+also where they start a word ("Pythonic" gives away "Python").
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+
+CENSORED = "~~CENSORED~~"
+# Title words at least this long are also censored at the start of longer words.
+PREFIX_LENGTH = 4
+
+
+def _base(char: str) -> str:
+    """Return ``char`` casefolded without its diacritics, e.g. "É" -> "e"."""
+    return "".join(part for part in unicodedata.normalize("NFKD", char) if not unicodedata.combining(part)).casefold()
+
+
+def _letter_variants() -> dict[str, str]:
+    """Return every latin letter mapped to the accented letters it is the base of."""
+    variants: defaultdict[str, str] = defaultdict(str)
+    for code in range(0xC0, 0x250):
+        char = chr(code)
+        base = _base(char)
+        if len(base) == 1 and base.isascii() and base.isalpha():
+            variants[base] += char
+    return dict(variants)
+
+
+# "e" -> "ÈÉÊËèéêëĒē...", so every title letter can match its accented forms.
+_VARIANTS = _letter_variants()
+
+
+@dataclass(frozen=True, slots=True)
+class CensoredExcerpt:
+    """An excerpt with its article's title censored out.
+
+    Attributes
+    ----------
+    text (str): The censored excerpt.
+    sentences (tuple[str, ...]): The non-empty sentences of ``text``, revealed one at a time.
+
+    """
+
+    text: str
+    sentences: tuple[str, ...]
+
+
+def title_pattern(title: str) -> re.Pattern[str] | None:
+    """Return a pattern matching the words of ``title``, or None if it has no words."""
+    # Longest first, so that a word is never cut short by one of its prefixes. The word as written is kept
+    # next to its base, which differs in length when a letter casefolds to several ("ß" -> "ss").
+    words = sorted(
+        {form for word in re.findall(r"\w+", title) for form in (_base_word(word), word.lower())},
+        key=len,
+        reverse=True,
+    )
+    if not words:
+        return None
+
+    alternatives = [
+        _word_pattern(word) if len(word) >= PREFIX_LENGTH else rf"{_word_pattern(word)}(?!\w)" for word in words
+    ]
+    return re.compile(rf"(?<!\w)(?:{'|'.join(alternatives)})", re.IGNORECASE)
+
+
+def censor_excerpt(title: str, text: str) -> CensoredExcerpt:
+    """Censor the words of ``title`` out of ``text`` and split it into sentences."""
+    pattern = title_pattern(title)
+    if pattern is not None:
+        text = pattern.sub(CENSORED, text)
+    return CensoredExcerpt(text, tuple(sentence for sentence in text.strip("\n").split(".") if sentence))
+
+
+def _base_word(word: str) -> str:
+    return "".join(_base(char) for char in word)
+
+
+def _word_pattern(word: str) -> str:
+    parts = []
+    for char in word:
+        variants = _VARIANTS.get(char)
+        parts.append(f"[{char}{variants}]" if variants else re.escape(char))
+    return "".join(parts)
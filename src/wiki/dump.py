@@ -0,0 +1,364 @@
+"""Memory-mapped, indexed Wikipedia dump.
+
+``import_dump`` turns a JSON lines export (one article per line) into a single
+file that ``DumpReader`` maps into memory. Title lookups, page id lookups,
+category memberships and random picks are binary searches or array reads on
+the mapping, so no request is ever made and the dump is never loaded whole.
+
+Each input line is an object with ``pageid`` and ``title`` and, optionally,
+``revid``, ``url``, ``extract`` (the intro), ``links``, ``categories``,
+``redirects`` (titles redirecting to the article) and ``views`` (a pageview
+count, used to rank articles for random picks).
+
+File layout, every section aligned to 8 bytes::
+
+    header | records | title keys | title starts | title targets | page ids | page targets
+           | ranked | category keys | category starts | posting starts | postings
+
+Records are length-prefixed JSON. Keys are sorted UTF-8 blobs with an array of
+start offsets; targets are record offsets and postings are sorted page ids.
+"""
+
+import json
+import mmap
+import secrets
+import sqlite3
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from wiki.aliases import normalize_title
+from wiki.categories import category_key
+from wiki.metadata import ArticleRecord
+
+MAGIC = b"WWDUMP01"
+_SECTIONS = (
+    "title_keys",
+    "title_starts",
+    "title_targets",
+    "pageids",
+    "page_targets",
+    "ranked",
+    "category_keys",
+    "category_starts",
+    "posting_starts",
+    "postings",
+)
+_COUNTS = ("titles", "pages", "ranked", "categories")
+_HEADER = struct.Struct(f"<8s{len(_SECTIONS) + len(_COUNTS)}Q")
+_LENGTH = struct.Struct("<I")
+_WORD = 8
+# Rows buffered before an index array is written out.
+_CHUNK = 65_536
+
+
+class DumpFormatError(ValueError):
+    """The file isn't a dump written by ``import_dump``."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(f"Not a Wikipedia dump: {path}")
+
+
+def import_dump(lines: Iterable[str], path: str | Path) -> int:
+    """Build a dump file from JSON lines, streaming.
+
+    Records are written out as they are read; only the index rows are kept, in
+    a temporary SQLite database that also sorts them.
+
+    Args:
+    ----
+    lines (Iterable[str]): The JSON lines, e.g. an open file.
+    path (str | Path): Where to write the dump.
+
+    Returns:
+    -------
+    int: The number of articles imported.
+
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as scratch, path.open("wb") as out:
+        index = sqlite3.connect(Path(scratch) / "index.sqlite3")
+        index.executescript(
+            """
+            CREATE TABLE titles (key BLOB PRIMARY KEY, priority INTEGER, target INTEGER);
+            CREATE TABLE pages (pageid INTEGER PRIMARY KEY, target INTEGER, views INTEGER);
+            CREATE TABLE members (category BLOB, pageid INTEGER, PRIMARY KEY (category, pageid));
+            """
+        )
+
+        out.write(bytes(_HEADER.size))
+        _pad(out)
+        count = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            count += 1
+            _import_article(index, out, json.loads(line))
+
+        offsets = _write_indexes(index, out)
+        counts = [index.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("titles", "pages")]  # noqa: S608
+        counts.append(index.execute("SELECT COUNT(*) FROM pages WHERE views > 0").fetchone()[0])
+        counts.append(index.execute("SELECT COUNT(DISTINCT category) FROM members").fetchone()[0])
+        index.close()
+
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, *(offsets[section] for section in _SECTIONS), *counts))
+
+    return count
+
+
+def _import_article(index: sqlite3.Connection, out: BinaryIO, article: dict) -> None:
+    record = {
+        "pageid": article["pageid"],
+        "title": article["title"],
+        "revid": article.get("revid", 0),
+        "url": article.get("url", ""),
+        "extract": article.get("extract", ""),
+        "image_url": article.get("image_url"),
+        "links": article.get("links", []),
+        "categories": [category_key(category) for category in article.get("categories", ())],
+        "redirects": article.get("redirects", []),
+    }
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+    target = out.tell()
+    out.write(_LENGTH.pack(len(payload)))
+    out.write(payload)
+
+    # The canonical title wins over a redirect normalising to the same key.
+    index.executemany(
+        "INSERT INTO titles VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE"
+        " SET priority = excluded.priority, target = excluded.target WHERE excluded.priority < priority",
+        [
+            (normalize_title(title).encode(), priority, target)
+            for priority, titles in enumerate(([record["title"]], record["redirects"]))
+            for title in titles
+        ],
+    )
+    index.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (record["pageid"], target, article.get("views", 0)))
+    index.executemany(
+        "INSERT OR IGNORE INTO members VALUES (?, ?)",
+        [(category.encode(), record["pageid"]) for category in record["categories"]],
+    )
+
+
+def _write_indexes(index: sqlite3.Connection, out: BinaryIO) -> dict[str, int]:
+    offsets: dict[str, int] = {}
+
+    def section(name: str, values: Iterable[int] | None = None, blobs: Iterable[bytes] | None = None) -> None:
+        _pad(out)
+        offsets[name] = out.tell()
+        if blobs is not None:
+            for blob in blobs:
+                out.write(blob)
+        else:
+            _write_words(out, values)
+
+    def column(query: str, position: int = 0) -> Iterator:
+        return (row[position] for row in index.execute(query))
+
+    titles = "SELECT key, target FROM titles ORDER BY key"
+    section("title_keys", blobs=column(titles))
+    section("title_starts", _starts(len(key) for key in column(titles)))
+    section("title_targets", column(titles, 1))
+
+    section("pageids", column("SELECT pageid FROM pages ORDER BY pageid"))
+    section("page_targets", column("SELECT target FROM pages ORDER BY pageid"))
+    section("ranked", column("SELECT target FROM pages WHERE views > 0 ORDER BY views DESC, pageid"))
+
+    categories = "SELECT category, COUNT(*) FROM members GROUP BY category ORDER BY category"
+    section("category_keys", blobs=column(categories))
+    section("category_starts", _starts(len(key) for key in column(categories)))
+    section("posting_starts", _starts(column(categories, 1)))
+    section("postings", column("SELECT pageid FROM members ORDER BY category, pageid"))
+    return offsets
+
+
+def _starts(lengths: Iterable[int]) -> Iterator[int]:
+    """Return the running offsets of consecutive items, starting at 0 and ending at the total."""
+    total = 0
+    yield total
+    for length in lengths:
+        total += length
+        yield total
+
+
+def _write_words(out: BinaryIO, values: Iterable[int]) -> None:
+    chunk = array("Q")
+    for value in values:
+        chunk.append(value)
+        if len(chunk) >= _CHUNK:
+            chunk.tofile(out)
+            chunk = array("Q")
+    chunk.tofile(out)
+
+
+def _pad(out: BinaryIO) -> None:
+    out.write(bytes(-out.tell() % _WORD))
+
+
+class DumpReader:
+    """Read-only, memory-mapped view of a dump written by ``import_dump``.
+
+    Attributes
+    ----------
+    path (Path): The dump file.
+
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Map the dump into memory.
+
+        Args:
+        ----
+        path (str | Path): The dump file.
+
+        Raises:
+        ------
+        DumpFormatError: If the file isn't a dump.
+
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size:
+            raise DumpFormatError(self.path)
+        magic, *fields = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise DumpFormatError(self.path)
+
+        offsets = dict(zip(_SECTIONS, fields, strict=False))
+        counts = dict(zip(_COUNTS, fields[len(_SECTIONS) :], strict=True))
+        self._offsets = offsets
+
+        self._title_starts = self._words("title_starts", counts["titles"] + 1)
+        self._title_targets = self._words("title_targets", counts["titles"])
+        self._pageids = self._words("pageids", counts["pages"])
+        self._page_targets = self._words("page_targets", counts["pages"])
+        self._ranked = self._words("ranked", counts["ranked"])
+        self._category_starts = self._words("category_starts", counts["categories"] + 1)
+        self._posting_starts = self._words("posting_starts", counts["categories"] + 1)
+        self._postings = self._words("postings", self._posting_starts[-1])
+
+    def __len__(self) -> int:
+        return len(self._pageids)
+
+    def close(self) -> None:
+        """Unmap the dump."""
+        for view in (
+            self._title_starts,
+            self._title_targets,
+            self._pageids,
+            self._page_targets,
+            self._ranked,
+            self._category_starts,
+            self._posting_starts,
+            self._postings,
+        ):
+            view.release()
+        self._map.close()
+
+    def lookup(self, title: str) -> ArticleRecord | None:
+        """Return the article with this title, or redirected to from it. Titles are compared normalised."""
+        position = self._search(self._offsets["title_keys"], self._title_starts, normalize_title(title).encode())
+        if position is None:
+            return None
+        return self._record(self._title_targets[position])
+
+    def prefix(self, query: str, limit: int = 10) -> list[ArticleRecord]:
+        """Return up to ``limit`` distinct articles with a title (or redirect) starting with ``query``."""
+        key = normalize_title(query).encode()
+        base = self._offsets["title_keys"]
+        position = self._bisect(base, self._title_starts, key)
+
+        found: dict[int, ArticleRecord] = {}
+        while position < len(self._title_targets) and len(found) < limit:
+            if not self._key(base, self._title_starts, position).startswith(key):
+                break
+            target = self._title_targets[position]
+            if target not in found:
+                found[target] = self._record(target)
+            position += 1
+        return list(found.values())
+
+    def get(self, pageid: int) -> ArticleRecord | None:
+        """Return the article with this page id, or None."""
+        position = bisect_left(self._pageids, pageid)
+        if position == len(self._pageids) or self._pageids[position] != pageid:
+            return None
+        return self._record(self._page_targets[position])
+
+    @property
+    def ranked(self) -> int:
+        """Return the number of articles ``random`` draws from, by rank."""
+        return len(self._ranked) or len(self._page_targets)
+
+    def random(self, top: int | None = None, *, start: int = 0) -> ArticleRecord:
+        """Return a random article ranked between ``start`` and ``top`` (excluded) by views.
+
+        Falls back to every article when the dump has no pageview counts.
+
+        Raises
+        ------
+        IndexError: If the dump is empty.
+
+        """
+        targets = self._ranked if len(self._ranked) else self._page_targets
+        count = len(targets) if top is None else min(top, len(targets))
+        if count <= 0:
+            message = "The dump has no articles"
+            raise IndexError(message)
+        start = min(start, count - 1)
+        return self._record(targets[start + secrets.randbelow(count - start)])
+
+    def category_members(self, category: str) -> memoryview:
+        """Return the sorted page ids of a category's articles (empty if unknown)."""
+        position = self._search(self._offsets["category_keys"], self._category_starts, category_key(category).encode())
+        if position is None:
+            return self._postings[0:0]
+        return self._postings[self._posting_starts[position] : self._posting_starts[position + 1]]
+
+    def _record(self, target: int) -> ArticleRecord:
+        (length,) = _LENGTH.unpack_from(self._map, target)
+        start = target + _LENGTH.size
+        data = json.loads(self._map[start : start + length])
+        return ArticleRecord(
+            pageid=data["pageid"],
+            name=data["title"],
+            revid=data["revid"],
+            url=data["url"],
+            summary=data["extract"],
+            image_url=data["image_url"],
+            links=tuple(data["links"]),
+            categories=tuple(data["categories"]),
+            redirects=tuple(data["redirects"]),
+        )
+
+    def _words(self, section: str, count: int) -> memoryview:
+        start = self._offsets[section]
+        return memoryview(self._map)[start : start + count * _WORD].cast("Q")
+
+    def _key(self, base: int, starts: memoryview, position: int) -> bytes:
+        return self._map[base + starts[position] : base + starts[position + 1]]
+
+    def _bisect(self, base: int, starts: memoryview, key: bytes) -> int:
+        return bisect_left(range(len(starts) - 1), key, key=lambda position: self._key(base, starts, position))
+
+    def _search(self, base: int, starts: memoryview, key: bytes) -> int | None:
+        position = self._bisect(base, starts, key)
+        if position < len(starts) - 1 and self._key(base, starts, position) == key:
+            return position
+        return None
+
+
+if __name__ == "__main__":
+    # Run from src, the package imports need it on the path: python -m wiki.dump <articles.jsonl> <output.dump>
+    with Path(sys.argv[1]).open(encoding="utf-8") as source:
+        import_dump(source, sys.argv[2])
@@ -0,0 +1,87 @@
+"""Streaming of the titles an article links to.
+
+Articles can link to thousands of pages. ``iter_link_titles`` reads them
+page by page from ``prop=links``, filtered by namespace, and yields plain
+titles, so nothing beyond one API page is ever held. ``sample_link_titles``
+keeps a uniform random sample of them with reservoir sampling.
+
+The functions here are blocking; run them through an executor from coroutines.
+"""
+
+import secrets
+from collections.abc import Iterable, Iterator, Sequence
+
+import pywikibot
+
+# Most links the API returns per request to normal clients.
+MAX_LINKS = 500
+
+
+def iter_link_titles(
+    site: pywikibot.site.APISite,
+    title: str,
+    *,
+    namespaces: Sequence[int] = (0,),
+    limit: int | None = None,
+) -> Iterator[str]:
+    """Yield the titles of the pages an article links to, in the API's (alphabetical) order.
+
+    Args:
+    ----
+    site (APISite): The site to query.
+    title (str): The article. Redirects are followed.
+    namespaces (Sequence[int]): Only yield links to these namespaces, main by default.
+    limit (int | None): Stop after this many titles, None for all of them.
+
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    parameters = {
+        "action": "query",
+        "formatversion": 2,
+        "redirects": True,
+        "titles": title,
+        "prop": "links",
+        "plnamespace": list(namespaces),
+        "pllimit": min(limit, MAX_LINKS) if limit is not None else MAX_LINKS,
+    }
+    count = 0
+    while True:
+        data = site.simple_request(**parameters).submit()
+        for page in data.get("query", {}).get("pages", ()):
+            for link in page.get("links", ()):
+                yield link["title"]
+                count += 1
+                if count == limit:
+                    return
+
+        continuation = data.get("continue")
+        if not continuation:
+            return
+        parameters = {**parameters, **continuation}
+
+
+def reservoir_sample[T](items: Iterable[T], count: int) -> list[T]:
+    """Return ``count`` items (fewer if there aren't as many) drawn uniformly in a single pass over ``items``."""
+    sample: list[T] = []
+    for seen, item in enumerate(items):
+        if seen < count:
+            sample.append(item)
+        else:
+            slot = secrets.randbelow(seen + 1)
+            if slot < count:
+                sample[slot] = item
+    return sample
+
+
+def sample_link_titles(
+    site: pywikibot.site.APISite,
+    title: str,
+    count: int,
+    *,
+    namespaces: Sequence[int] = (0,),
+    limit: int | None = None,
+) -> list[str]:
+    """Return ``count`` titles drawn uniformly from the article's first ``limit`` links, see ``iter_link_titles``."""
+    return reservoir_sample(iter_link_titles(site, title, namespaces=namespaces, limit=limit), count)
@@ -0,0 +1,212 @@
+"""Batched article metadata fetches.
+
+Setting up a game used to cost one MediaWiki request per property (existence,
+extract, links, page image, image file info, ...). ``fetch_records`` asks for
+all of them for one or many titles in a single ``prop=`` query and returns
+lightweight ``ArticleRecord`` objects instead of pywikibot pages.
+
+The functions here are blocking; run them through an executor from coroutines.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import pywikibot
+
+# The MediaWiki API accepts at most 50 titles per query for normal clients.
+MAX_TITLES = 50
+MAX_REQUESTS = 10
+
+
+@dataclass(frozen=True, slots=True)
+class ArticleRecord:
+    """Snapshot of the parts of a Wikipedia article the bot uses.
+
+    The ``title``, ``full_url`` and ``extract`` methods mirror pywikibot's
+    ``Page`` so a record can be used where only those are needed.
+
+    Attributes
+    ----------
+    pageid (int): The page id.
+    name (str): The canonical title.
+    revid (int): The id of the latest revision.
+    url (str): The canonical url.
+    summary (str): The plain text extract.
+    image_url (str | None): The url of the lead image.
+    links (tuple[str, ...]): Titles of the mainspace articles linked from the page.
+    categories (tuple[str, ...]): The page's categories, without the ``Category:`` prefix.
+    redirects (tuple[str, ...]): Titles of the mainspace redirects to the page.
+
+    """
+
+    pageid: int
+    name: str
+    revid: int = 0
+    url: str = ""
+    summary: str = ""
+    image_url: str | None = None
+    links: tuple[str, ...] = ()
+    categories: tuple[str, ...] = ()
+    redirects: tuple[str, ...] = ()
+
+    def title(self) -> str:
+        """Return the canonical title."""
+        return self.name
+
+    def full_url(self) -> str:
+        """Return the canonical url."""
+        return self.url
+
+    def extract(self, chars: int | None = None) -> str:
+        """Return the extract, cut at a word boundary after at most ``chars`` characters."""
+        if chars is None or len(self.summary) <= chars:
+            return self.summary
+        return self.summary[:chars].rsplit(" ", 1)[0]
+
+
+def fetch_records(  # noqa: PLR0913
+    site: pywikibot.site.APISite,
+    titles: Iterable[str],
+    *,
+    extract_chars: int | None = 1200,
+    intro: bool = True,
+    links: int = 50,
+    categories: bool = False,
+    redirects: bool = False,
+) -> dict[str, ArticleRecord | None]:
+    """Fetch records for many titles with as few requests as possible.
+
+    Args:
+    ----
+    site (APISite): The site to query.
+    titles (Iterable[str]): The titles to fetch. Redirects are followed.
+    extract_chars (int | None): Length of the extract. None for the whole text, 0 for no extract.
+    intro (bool): Only extract the text before the first section.
+    links (int): How many links to fetch per article, 0 for none.
+    categories (bool): Also fetch the (non hidden) categories.
+    redirects (bool): Also fetch the titles of the redirects to each article.
+
+    Returns:
+    -------
+    dict[str, ArticleRecord | None]: Every requested title mapped to its record, None if it doesn't exist.
+
+    """
+    titles = list(dict.fromkeys(titles))
+    found: dict[str, ArticleRecord | None] = {}
+
+    for start in range(0, len(titles), MAX_TITLES):
+        chunk = titles[start : start + MAX_TITLES]
+        parameters = _query_parameters(
+            chunk, extract_chars=extract_chars, intro=intro, links=links, categories=categories, redirects=redirects
+        )
+        found.update(_fetch_chunk(site, chunk, parameters, links=links))
+
+    return found
+
+
+def _query_parameters(  # noqa: PLR0913
+    titles: Sequence[str],
+    *,
+    extract_chars: int | None,
+    intro: bool,
+    links: int,
+    categories: bool,
+    redirects: bool,
+) -> dict[str, Any]:
+    props = ["info", "pageimages"]
+    parameters: dict[str, Any] = {
+        "action": "query",
+        "formatversion": 2,
+        "redirects": True,
+        "titles": titles,
+        "inprop": "url",
+        "piprop": "original",
+    }
+
+    if extract_chars != 0:
+        props.append("extracts")
+        parameters.update(explaintext=True, exsectionformat="plain", exintro=intro, exlimit="max")
+        if extract_chars is not None:
+            parameters["exchars"] = extract_chars
+
+    if links:
+        props.append("links")
+        parameters.update(plnamespace=0, pllimit=min(links * len(titles), 500))
+
+    if categories:
+        props.append("categories")
+        parameters.update(clshow="!hidden", cllimit="max")
+
+    if redirects:
+        props.append("redirects")
+        parameters.update(rdprop="title", rdnamespace=0, rdlimit="max")
+
+    parameters["prop"] = props
+    return parameters
+
+
+def _fetch_chunk(
+    site: pywikibot.site.APISite,
+    titles: Sequence[str],
+    parameters: dict[str, Any],
+    *,
+    links: int,
+) -> dict[str, ArticleRecord | None]:
+    pages: dict[str, dict] = {}
+    aliases: dict[str, str] = {}
+
+    for _ in range(MAX_REQUESTS):
+        data = site.simple_request(**parameters).submit()
+        query = data.get("query", {})
+
+        for alias in (*query.get("normalized", ()), *query.get("redirects", ())):
+            aliases[alias["from"]] = alias["to"]
+
+        for page in query.get("pages", ()):
+            merged = pages.setdefault(page["title"], {})
+            for key, value in page.items():
+                if isinstance(value, list):
+                    merged.setdefault(key, []).extend(value)
+                else:
+                    merged.setdefault(key, value)
+
+        continuation = data.get("continue")
+        if not continuation or _only_links_left(continuation, pages, links):
+            break
+        parameters = {**parameters, **continuation}
+
+    records = {title: _to_record(page, links=links) for title, page in pages.items()}
+
+    found = {}
+    for title in titles:
+        canonical = title
+        # Follow normalisation and then redirects, guarding against loops.
+        for _ in range(3):
+            canonical = aliases.get(canonical, canonical)
+        found[title] = records.get(canonical)
+    return found
+
+
+def _only_links_left(continuation: dict, pages: dict[str, dict], links: int) -> bool:
+    """Return True if the only thing left to continue is links every page already has enough of."""
+    if set(continuation) - {"continue", "plcontinue"}:
+        return False
+    return all(len(page.get("links", ())) >= links for page in pages.values() if "missing" not in page)
+
+
+def _to_record(page: dict, *, links: int) -> ArticleRecord | None:
+    if page.get("missing") or page.get("invalid"):
+        return None
+
+    return ArticleRecord(
+        pageid=page["pageid"],
+        name=page["title"],
+        revid=page.get("lastrevid", 0),
+        url=page.get("fullurl", ""),
+        summary=page.get("extract", ""),
+        image_url=page.get("original", {}).get("source"),
+        links=tuple(link["title"] for link in page.get("links", ()))[:links],
+        categories=tuple(category["title"].removeprefix("Category:") for category in page.get("categories", ())),
+        redirects=tuple(redirect["title"] for redirect in page.get("redirects", ())),
+    )
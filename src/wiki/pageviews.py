@@ -0,0 +1,281 @@
+"""Per-date cache of Wikimedia pageviews top lists.
+
+The Wikimedia REST API publishes a list of the ~1000 most viewed articles for
+every day. Lists for past days never change, so they are kept in a small
+in-memory LRU backed by a compact SQLite file, and repeat draws are served
+without any network I/O.
+
+Each list is indexed once, as ``RankedTitles``, when it enters the cache:
+entries that aren't articles (``Main_Page``, ``Special:Search``...) are
+dropped and the remaining views are summed up. Draws, in any ``Difficulty``
+tier, are uniform by default; a views-weighted draw is a single binary search.
+"""
+
+import bisect
+import logging
+import os
+import secrets
+import sqlite3
+import zlib
+from array import array
+from datetime import UTC, date, datetime
+from enum import StrEnum
+from itertools import accumulate
+from pathlib import Path
+
+from http_client import HttpClient
+from lru import LRUCache
+
+PAGEVIEWS_URL = os.environ.get(
+    "PAGEVIEWS_URL", "https://wikimedia.org/api/rest_v1/metrics/pageviews/top/en.wikipedia/all-access/{day}"
+)
+# Name of the ``HttpClient`` upstream the REST API is reached through.
+UPSTREAM = "wikimedia"
+
+type TopList = list[tuple[str, int]]
+
+# Titles in the top lists that aren't articles, besides other namespaces.
+NON_ARTICLES = frozenset({"main_page", "-", "undefined"})
+# Namespace prefixes of English Wikipedia, and their aliases, casefolded.
+NAMESPACES = frozenset(
+    {
+        "media", "special", "talk", "user", "user_talk", "wikipedia", "wikipedia_talk", "wp", "project",
+        "file", "file_talk", "image", "mediawiki", "mediawiki_talk", "template", "template_talk", "help",
+        "help_talk", "category", "category_talk", "portal", "portal_talk", "draft", "draft_talk",
+        "timedtext", "timedtext_talk", "module", "module_talk", "wt",
+    }
+)  # fmt: skip
+
+
+class Difficulty(StrEnum):
+    """Tiers of popularity random articles are drawn from, by rank in a list of most viewed articles."""
+
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
+
+    def ranks(self, count: int) -> tuple[int, int]:
+        """Return the ``[start, stop)`` ranks of the tier among ``count`` ranked articles."""
+        start, stop = _TIERS[self]
+        # Small lists still get at least one article per tier.
+        return min(int(start * count), max(count - 1, 0)), max(int(stop * count), 1)
+
+
+# Difficulty -> fractions of the ranked list it covers.
+_TIERS = {Difficulty.EASY: (0.0, 0.1), Difficulty.MEDIUM: (0.1, 0.4), Difficulty.HARD: (0.4, 1.0)}
+
+
+def is_article(title: str) -> bool:
+    """Return True if a top list title is a mainspace article."""
+    folded = title.casefold()
+    if folded in NON_ARTICLES:
+        return False
+    prefix, colon, _ = folded.partition(":")
+    return not colon or prefix.replace(" ", "_") not in NAMESPACES
+
+
+class RankedTitles:
+    """Index of the articles of one top list for uniform or views-weighted draws.
+
+    Attributes
+    ----------
+    articles (TopList): The list as published, including non-articles.
+    titles (list[str]): The articles, most viewed first.
+
+    """
+
+    def __init__(self, articles: TopList) -> None:
+        """Initialize the RankedTitles.
+
+        Args:
+        ----
+        articles (TopList): A top list, most viewed first.
+
+        """
+        self.articles = articles
+        ranked = [(title, views) for title, views in articles if is_article(title)]
+        self.titles = [title for title, _ in ranked]
+        # Running total of the views, every article weighs at least 1.
+        self._cumulative = array("q", accumulate(max(views, 1) for _, views in ranked))
+
+    def __len__(self) -> int:
+        """Return the number of articles."""
+        return len(self.titles)
+
+    def sample(self, count: int, difficulty: Difficulty | None = None, *, weighted: bool = False) -> list[str]:
+        """Return up to ``count`` distinct titles drawn uniformly, or with probability proportional to their views.
+
+        Args:
+        ----
+        count (int): How many draws to make, duplicates are dropped.
+        difficulty (Difficulty | None): Only draw from this tier, None for the whole list.
+        weighted (bool): Weigh the titles by their views.
+
+        Returns:
+        -------
+        list[str]: The titles, in the order drawn.
+
+        """
+        if not self.titles:
+            return []
+
+        start, stop = difficulty.ranks(len(self.titles)) if difficulty else (0, len(self.titles))
+        if not weighted:
+            drawn = (start + secrets.randbelow(stop - start) for _ in range(count))
+            return list(dict.fromkeys(self.titles[rank] for rank in drawn))
+
+        low = self._cumulative[start - 1] if start else 0
+        total = self._cumulative[stop - 1] - low
+
+        drawn = (
+            bisect.bisect_right(self._cumulative, low + secrets.randbelow(total), start, stop) for _ in range(count)
+        )
+        return list(dict.fromkeys(self.titles[rank] for rank in drawn))
+
+
+class PageviewsCacheMissError(LookupError):
+    """No top list is available without going to the network."""
+
+    def __init__(self) -> None:
+        super().__init__("No cached pageviews top lists are available")
+
+
+def _day_key(day: date) -> str:
+    return day.strftime("%Y-%m-%d")
+
+
+def _encode(articles: TopList) -> bytes:
+    return zlib.compress("\n".join(f"{title}\t{views}" for title, views in articles).encode())
+
+
+def _decode(payload: bytes) -> TopList:
+    articles = []
+    for line in zlib.decompress(payload).decode().splitlines():
+        title, _, views = line.rpartition("\t")
+        articles.append((title, int(views)))
+    return articles
+
+
+class TopListCache:
+    """Cache of daily top-viewed article lists.
+
+    Attributes
+    ----------
+    path (Path): The SQLite file the lists are persisted to.
+    cache_only (bool): If True, never go to the network and only draw from cached days.
+    max_days (int): Once this many days are cached, new draws reuse cached days instead of fetching.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str | Path,
+        *,
+        http: HttpClient,
+        memory_size: int = 32,
+        max_days: int = 365,
+        cache_only: bool = False,
+    ) -> None:
+        """Initialize the TopListCache.
+
+        Args:
+        ----
+        path (str | Path): The SQLite file the lists are persisted to.
+        http (HttpClient): Client used to reach the Wikimedia REST API.
+        memory_size (int): How many decoded lists to keep in memory.
+        max_days (int): How many distinct days to collect before only reusing cached ones.
+        cache_only (bool): Serve exclusively from the cache.
+
+        """
+        self._memory: LRUCache[str, RankedTitles] = LRUCache(memory_size, name="pageviews_cache")
+        self._db: sqlite3.Connection | None = None
+        self._days: list[str] = []
+        self._http = http
+        self.path = Path(path)
+        self.max_days = max_days
+        self.cache_only = cache_only
+
+    @property
+    def days(self) -> list[str]:
+        """Return the days (``YYYY-MM-DD``) with a cached top list."""
+        self._connect()
+        return list(self._days)
+
+    def get(self, day: date) -> TopList | None:
+        """Return the cached top list for ``day``, or None."""
+        ranked = self._get(_day_key(day))
+        return ranked.articles if ranked is not None else None
+
+    def put(self, day: date, articles: TopList) -> None:
+        """Persist the top list for ``day``."""
+        key = _day_key(day)
+        db = self._connect()
+        with db:
+            db.execute("INSERT OR REPLACE INTO toplists (day, payload) VALUES (?, ?)", (key, _encode(articles)))
+        if key not in self._days:
+            self._days.append(key)
+        self._memory.put(key, RankedTitles(articles))
+
+    async def draw(self, day: date) -> TopList:
+        """Return the top list for ``day``, see ``ranked``."""
+        return (await self.ranked(day)).articles
+
+    async def ranked(self, day: date) -> RankedTitles:
+        """Return the indexed top list for ``day``, going to the network only when needed.
+
+        When running cache-only, or once ``max_days`` days have been collected,
+        a random cached day is used instead of fetching ``day``.
+
+        Raises
+        ------
+        PageviewsCacheMissError: If nothing is cached and the network may not be used.
+
+        """
+        self._connect()
+        cached = self._get(_day_key(day))
+        if cached is not None:
+            return cached
+
+        if self.cache_only or len(self._days) >= self.max_days:
+            if not self._days:
+                raise PageviewsCacheMissError
+            return self._get(secrets.choice(self._days))
+
+        articles = await self.fetch(day)
+        # Lists for today (or later) are incomplete, only past days are final.
+        if articles and day.strftime("%Y-%m-%d") < datetime.now(UTC).strftime("%Y-%m-%d"):
+            self.put(day, articles)
+            return self._get(_day_key(day))
+        return RankedTitles(articles)
+
+    async def fetch(self, day: date) -> TopList:
+        """Download the top list for ``day``. Returns an empty list if there is none."""
+        url = PAGEVIEWS_URL.format(day=day.strftime("%Y/%m/%d"))
+        async with self._http.get(url, upstream=UPSTREAM) as response:
+            json = await response.json()
+        try:
+            return [(entry["article"], entry["views"]) for entry in json["items"][0]["articles"]]
+        except (KeyError, IndexError) as e:
+            logging.info("Pageviews:\nFunc: fetch\nException: %s", e)
+            return []
+
+    def _get(self, key: str) -> RankedTitles | None:
+        ranked = self._memory.get(key)
+        if ranked is not None:
+            return ranked
+
+        row = self._connect().execute("SELECT payload FROM toplists WHERE day = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        ranked = RankedTitles(_decode(row[0]))
+        self._memory.put(key, ranked)
+        return ranked
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS toplists (day TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+            self._days = [day for (day,) in self._db.execute("SELECT day FROM toplists")]
+        return self._db
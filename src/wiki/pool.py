@@ -0,0 +1,129 @@
+"""Background warm pool of ready-to-use items.
+
+The pool keeps a bounded number of pre-fetched items around so that hot paths
+(e.g. ``rand_wiki``) can pop one in O(1) instead of waiting on Wikipedia. A
+background task refills the pool whenever it drops below its low watermark.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from metrics import METRICS
+
+_RETRY_DELAY = 5.0
+
+
+class WarmPool[T]:
+    """A bounded, self-refilling pool of items produced by an async callable.
+
+    Attributes
+    ----------
+    name (str): Name used as the prefix of the pool's metrics.
+    size (int): The number of items the refill task tries to keep ready.
+    low_watermark (int): Refilling starts once the depth drops below this.
+
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[], Awaitable[T]],
+        *,
+        name: str,
+        size: int,
+        low_watermark: int | None = None,
+    ) -> None:
+        """Initialize the WarmPool.
+
+        Args:
+        ----
+        producer (Callable[[], Awaitable[T]]): Coroutine function creating one item.
+        name (str): Name used as the prefix of the pool's metrics.
+        size (int): The number of items to keep ready.
+        low_watermark (int | None): Depth under which a refill is triggered. Defaults to half of ``size``.
+
+        """
+        self._producer = producer
+        self._items: deque[T] = deque()
+        self._refill_needed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.name = name
+        self.size = max(size, 0)
+        self.low_watermark = self.size // 2 if low_watermark is None else min(low_watermark, self.size)
+
+    @property
+    def depth(self) -> int:
+        """Return the number of items ready to be popped."""
+        return len(self._items)
+
+    @property
+    def running(self) -> bool:
+        """Return True if the refill task is alive."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the refill task on the running event loop, if it isn't running already."""
+        if self.running or not self.size:
+            return
+
+        self._refill_needed = asyncio.Event()
+        self._refill_needed.set()
+        self._task = asyncio.create_task(self._refill_forever(), name=f"{self.name}-refill")
+
+    async def stop(self) -> None:
+        """Stop the refill task and drop every pooled item."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._items.clear()
+        METRICS.gauge(f"{self.name}.depth", 0)
+
+    async def get(self) -> T:
+        """Return a pooled item, or produce one inline if the pool is empty."""
+        self.start()
+
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            METRICS.incr(f"{self.name}.misses")
+            self._refill_needed.set()
+            return await self._producer()
+
+        METRICS.incr(f"{self.name}.hits")
+        METRICS.gauge(f"{self.name}.depth", self.depth)
+        if self.depth < self.low_watermark:
+            self._refill_needed.set()
+        return item
+
+    def stats(self) -> dict[str, float]:
+        """Return the pool's depth and miss rate."""
+        return {
+            "depth": self.depth,
+            "hits": METRICS.counter(f"{self.name}.hits"),
+            "misses": METRICS.counter(f"{self.name}.misses"),
+            "miss_rate": METRICS.ratio(f"{self.name}.misses", f"{self.name}.hits"),
+        }
+
+    async def _refill_forever(self) -> None:
+        """Top the pool back up to ``size`` every time a refill is requested."""
+        while True:
+            await self._refill_needed.wait()
+            self._refill_needed.clear()
+
+            while self.depth < self.size:
+                start = time.perf_counter()
+                try:
+                    item = await self._producer()
+                except Exception:
+                    logging.exception("Warm pool %s failed to produce an item", self.name)
+                    await asyncio.sleep(_RETRY_DELAY)
+                    continue
+
+                METRICS.observe(f"{self.name}.refill_latency", time.perf_counter() - start)
+                self._items.append(item)
+                METRICS.gauge(f"{self.name}.depth", self.depth)
@@ -5,26 +5,122 @@ data from Wikipedia. It also contains a class that can be used to generate
 articles with a specific category or title
 """
 
-import functools
+import asyncio
 import logging
-import random
+import os
 import secrets
 from collections import defaultdict
-from collections.abc import AsyncGenerator, Sequence
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable, Iterable, Sequence
 from datetime import UTC, date, datetime
-from typing import ClassVar
+from pathlib import Path
+from typing import ClassVar, NamedTuple
 
-import aiohttp
 import pywikibot
 import pywikibot.page
 from discord import Colour, Embed, User
 from pywikibot import Page
-
-from database.database_core import DATA, NullUserError
-from database.user import UserController, _User
+from pywikibot.family import AutoFamily
+
+from blocking import BlockingCallTimeoutError, BlockingExecutor
+from database.database_core import DATA
+from http_client import HTTP
+from lru import LRUCache, TTLCache
+from retry import RetryPolicy, first_valid
+from wiki.aliases import normalize_title
+from wiki.backend import Article, ArticleBackend, DumpBackend
+from wiki.categories import CategoryIndex
+from wiki.censor import CensoredExcerpt, censor_excerpt
+from wiki.dump import DumpReader
+from wiki.links import sample_link_titles
+from wiki.metadata import ArticleRecord, fetch_records
+from wiki.pageviews import Difficulty, TopListCache
+from wiki.pool import WarmPool
 
 UA = "WikiWabbit/1.1.0 (https://pure-pulsars.web.app/; dannytheheretic@proton.me)"
-site = pywikibot.Site("en", "wikipedia", user=UA)
+
+
+def _make_site() -> pywikibot.site.APISite:
+    """Return English Wikipedia, or the MediaWiki API at ``WIKI_API_URL`` (e.g. a local stand-in) if set."""
+    api_url = os.environ.get("WIKI_API_URL", "")
+    if not api_url:
+        return pywikibot.Site("en", "wikipedia", user=UA)
+
+    family = AutoFamily("standin", api_url)
+    return pywikibot.Site(family.code, family, user=UA)
+
+
+site = _make_site()
+
+WARM_POOL_SIZE = int(os.environ.get("WIKI_POOL_SIZE", "8"))
+WARM_POOL_LOW_WATERMARK = int(os.environ.get("WIKI_POOL_LOW_WATERMARK", "4"))
+CACHE_DIR = Path(os.environ.get("WIKI_CACHE_DIR", "cache"))
+TITLE_CONCURRENCY = int(os.environ.get("WIKI_TITLE_CONCURRENCY", "8"))
+SEARCH_CACHE_NEGATIVE_TTL = float(os.environ.get("SEARCH_CACHE_NEGATIVE_TTL", "600"))
+RANDOM_CANDIDATES = int(os.environ.get("WIKI_RANDOM_CANDIDATES", "8"))
+# Draw random articles with probability proportional to their views instead of uniformly from the top list.
+RANDOM_WEIGHTED = os.environ.get("WIKI_RANDOM_WEIGHTED", "0") == "1"
+# Links sampled from are the first (alphabetical) this many, bounding the requests of huge articles.
+LINK_SAMPLE_LIMIT = int(os.environ.get("WIKI_LINK_SAMPLE_LIMIT", "2000"))
+
+# Budget of a random article draw, each attempt validates a batch of ``RANDOM_CANDIDATES`` titles at once.
+RANDOM_ARTICLE_RETRY = RetryPolicy(
+    attempts=int(os.environ.get("WIKI_RANDOM_ATTEMPTS", "5")),
+    deadline=float(os.environ.get("WIKI_RANDOM_DEADLINE", "30")),
+    retry_on=(KeyError, BlockingCallTimeoutError, pywikibot.exceptions.Error),
+)
+
+# Thread pool for pywikibot's blocking calls, so they never stall the event loop.
+WIKI_EXECUTOR = BlockingExecutor(
+    "wiki_calls",
+    max_workers=int(os.environ.get("WIKI_MAX_WORKERS", "8")),
+    timeout=float(os.environ.get("WIKI_CALL_TIMEOUT", "30")),
+)
+
+# Category -> article page ids, answers category filters without per-article requests.
+CATEGORY_INDEX = CategoryIndex(
+    CACHE_DIR / "categories.sqlite3",
+    ttl=float(os.environ.get("CATEGORY_INDEX_TTL", "86400")),
+)
+
+HTTP.add_upstream(
+    "wikimedia",
+    timeout=float(os.environ.get("WIKIMEDIA_TIMEOUT", "10")),
+    headers={"User-Agent": UA},
+)
+
+# Normalized query -> search results, shared by every guild. Empty results are cached too.
+SEARCH_CACHE: TTLCache[Hashable, object] = TTLCache(
+    int(os.environ.get("SEARCH_CACHE_SIZE", "2048")),
+    ttl=float(os.environ.get("SEARCH_CACHE_TTL", "3600")),
+    name="search_cache",
+)
+_SEARCHES_IN_FLIGHT: dict[Hashable, asyncio.Future] = {}
+_MISSING = object()
+
+
+class _EmbedPayload(NamedTuple):
+    title: str
+    description: str
+    image_url: str | None
+
+
+# (page id, revision id) -> rendered embed content, so hot articles render without any request.
+EMBED_CACHE: LRUCache[tuple[int, int], _EmbedPayload] = LRUCache(
+    int(os.environ.get("EMBED_CACHE_SIZE", "512")), name="embed_cache"
+)
+
+# (page id, revision id) -> excerpt with the title censored out, computed as articles enter ``ARTICLE_POOL``.
+EXCERPT_CACHE: LRUCache[tuple[int, int], CensoredExcerpt] = LRUCache(
+    int(os.environ.get("EXCERPT_CACHE_SIZE", "256")), name="excerpt_cache"
+)
+
+# Daily pageviews top lists, shared by every random draw.
+TOP_LISTS = TopListCache(
+    CACHE_DIR / "pageviews.sqlite3",
+    http=HTTP,
+    max_days=int(os.environ.get("PAGEVIEWS_CACHE_DAYS", "365")),
+    cache_only=os.environ.get("PAGEVIEWS_CACHE_ONLY", "0") == "1",
+)
 
 
 def rand_date() -> date:
@@ -39,39 +135,148 @@ def rand_date() -> date:
     return datetime.fromtimestamp(timestamp=now - secrets.randbelow(now - y), tz=UTC)
 
 
-async def make_embed(article: Page) -> Embed:
+async def make_embed(article: Page | ArticleRecord) -> Embed:
     """Return a Discord Embed.
 
     Args:
     ----
-    article (Page): The article to create the embed for.
+    article (Page | ArticleRecord): The article to create the embed for.
 
     Returns:
     -------
     Embed: The embed.
 
-    Raises:
-    ------
-    AttributeError: If the image url cannot be found.
-
     """
-    embed = Embed(title=article.title())
-    embed.description = f"{article.extract(chars=400)}...([read more]({article.full_url()}))"
-    url = article.page_image()
-    try:
-        url = url.latest_file_info.url
-    except AttributeError:
-        url = None
-    embed.set_image(url=url)
+    payload = await _embed_payload(article)
+    if payload is None:
+        # The article doesn't exist anymore, e.g. deleted since it was drawn.
+        embed = Embed(title=article.title())
+        embed.description = "Sorry, this article couldn't be found."
+        return embed
+    embed = Embed(title=payload.title)
+    embed.description = payload.description
+    embed.set_image(url=payload.image_url)
     return embed
 
 
-def make_img_embed(article: Page, error_message: str = "Sorry no image found") -> Embed:
+async def _embed_payload(article: Page | ArticleRecord) -> _EmbedPayload | None:
+    """Return the content of an article's embed, from ``EMBED_CACHE`` if its revision is unchanged.
+
+    A ``Page`` whose info isn't loaded yet costs a blocking request for its revision before the cache is
+    looked up, so a cold miss costs two requests; records carry their revision.
+    """
+    if isinstance(article, ArticleRecord):
+        key = (article.pageid, article.revid) if article.revid else None
+    else:
+        # Free for pages whose info is already loaded, e.g. by an existence check.
+        key = await WIKI_EXECUTOR.run(_revision_key, article)
+
+    payload = EMBED_CACHE.get(key) if key is not None else None
+    if payload is not None:
+        return payload
+
+    record = await get_article_record(article, extract_chars=400, links=0)
+    if record is None:
+        return None
+
+    payload = _EmbedPayload(
+        record.title(), f"{record.extract(chars=400)}...([read more]({record.full_url()}))", record.image_url
+    )
+    EMBED_CACHE.put((record.pageid, record.revid), payload)
+    return payload
+
+
+def _revision_key(page: Page) -> tuple[int, int] | None:
+    if not page.exists():
+        return None
+    return page.pageid, page.latest_revision_id
+
+
+async def get_article_records(titles: Iterable[str], **kwargs: object) -> dict[str, ArticleRecord | None]:
+    """Fetch the records of many articles in as few requests as possible.
+
+    Args:
+    ----
+    titles (Iterable[str]): The titles to fetch.
+    **kwargs (object): Passed on to ``wiki.metadata.fetch_records``.
+
+    Returns:
+    -------
+    dict[str, ArticleRecord | None]: The records, None for titles that don't exist.
+
+    """
+    return await BACKEND.records(titles, **kwargs)
+
+
+async def get_article_record(article: Page | ArticleRecord | str, **kwargs: object) -> ArticleRecord | None:
+    """Return the record of a single article, fetching everything in one request.
+
+    Args:
+    ----
+    article (Page | ArticleRecord | str): The article, or its title. Records are returned as is.
+    **kwargs (object): Passed on to ``wiki.metadata.fetch_records``.
+
+    Returns:
+    -------
+    ArticleRecord | None: The record, None if the article doesn't exist.
+
+    """
+    if isinstance(article, ArticleRecord):
+        return article
+
+    title = article if isinstance(article, str) else article.title()
+    return (await get_article_records([title], **kwargs))[title]
+
+
+def censored_excerpt(record: ArticleRecord) -> CensoredExcerpt:
+    """Return the record's extract with its title censored out, from ``EXCERPT_CACHE`` if already computed.
+
+    Args:
+    ----
+    record (ArticleRecord): The article.
+
+    """
+    key = (record.pageid, record.revid)
+    excerpt = EXCERPT_CACHE.get(key)
+    if excerpt is None:
+        excerpt = censor_excerpt(record.title(), record.extract())
+        EXCERPT_CACHE.put(key, excerpt)
+    return excerpt
+
+
+async def sample_links(article: Page | ArticleRecord | str, count: int) -> list[str]:
+    """Return up to ``count`` titles of articles linked from ``article``, drawn uniformly.
+
+    Only titles are streamed, see ``wiki.links``, and at most ``LINK_SAMPLE_LIMIT`` are considered.
+
+    Args:
+    ----
+    article (Page | ArticleRecord | str): The article, or its title.
+    count (int): How many titles to return.
+
+    """
+    title = article if isinstance(article, str) else article.title()
+    return await BACKEND.sample_links(title, count, limit=LINK_SAMPLE_LIMIT)
+
+
+async def get_image_url(article: Page | ArticleRecord) -> str | None:
+    """Return the url of an article's lead image, or None if it has none.
+
+    Args:
+    ----
+    article (Page | ArticleRecord): The article to get the image of.
+
+    """
+    payload = await _embed_payload(article)
+    return payload.image_url if payload else None
+
+
+async def make_img_embed(article: Page | ArticleRecord, error_message: str = "Sorry no image found") -> Embed:
     """Return a Discord Image type Embed.
 
     Args:
     ----
-    article (Page): The article to create the embed for.
+    article (Page | ArticleRecord): The article to create the embed for.
     error_message (str): The error message if no picture is found.
 
     Returns:
@@ -84,10 +289,8 @@ def make_img_embed(article: Page, error_message: str = "Sorry no image found") -
 
     """
     embed = Embed(colour=Colour.blue(), type="image")
-    img_data = article.page_image()
-    try:
-        img_url = img_data.get_file_url()
-    except AttributeError:
+    img_url = await get_image_url(article)
+    if img_url is None:
         img_url = "https://wikimedia.org/static/images/project-logos/enwiki-2x.png"
         embed.description = error_message
     embed.set_image(url=img_url)
@@ -137,6 +340,10 @@ async def search_wikipedia(query: str) -> Page | None:
     Page: The first page found. None if no results are found.
 
     """
+    return await _cached_search(("best", normalize_query(query)), lambda: BACKEND.search(query))
+
+
+def _search_wikipedia(query: str) -> Page | None:
     result = Page(site, title=query)
 
     if not result.exists() or result.isRedirectPage():
@@ -169,122 +376,93 @@ async def search_wikipedia_generator(query: str, max_number: int = 10) -> AsyncG
     Page: The first page found. None if no results are found.
 
     """
-    results = tuple(site.search(query, total=max_number))
+    results = await _cached_search(
+        ("all", normalize_query(query), max_number), lambda: BACKEND.search_all(query, max_number)
+    )
 
     for result in results:
         yield result
 
 
-async def rand_wiki() -> Page:
-    """Return a random popular wikipedia article."""
-    return await ArticleGenerator().fetch_article()
+def _search(query: str, total: int) -> tuple[Page, ...]:
+    return tuple(site.search(query, total=total))
 
 
-async def loss_update(guild: int, user: User) -> None:
-    """Update the user in the database.
+def normalize_query(query: str) -> str:
+    """Return the cache key of a search query: casefolded, with whitespace collapsed."""
+    return " ".join(query.casefold().split())
 
-    Args:
-    ----
-    guild (int): The guild id.
-    user (User): The user to update.
-    score (int): The score to update.
 
+async def _cached_search[T](key: Hashable, search: Callable[[], Awaitable[T]]) -> T:
+    """Return the cached result for ``key``, running ``search`` at most once for concurrent callers.
+
+    Empty results are cached too, for ``SEARCH_CACHE_NEGATIVE_TTL`` seconds.
     """
-    uid = user.id
-    try:
-        db_ref_user = await DATA.get_user(guild, uid)
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="times_played",
-            value=db_ref_user["times_played"] + 1,
-        )
+    cached = SEARCH_CACHE.get(key, _MISSING)
+    if cached is not _MISSING:
+        return cached
 
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="failure",
-            value=db_ref_user["failure"] + 1,
-        )
+    task = _SEARCHES_IN_FLIGHT.get(key)
+    if task is None:
 
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="last_played",
-            value=datetime.now(UTC).timestamp(),
-        )
+        async def search_and_store() -> T:
+            result = await search()
+            SEARCH_CACHE.put(key, result, ttl=None if result else SEARCH_CACHE_NEGATIVE_TTL)
+            return result
 
-    except NullUserError:
-        new_user = UserController(
-            info=_User(
-                name=user.global_name,
-                times_played=1,
-                failure=1,
-                score=0,
-                last_played=datetime.now(UTC).timestamp(),
-            ),
-        )
-        await DATA.add_user(uid, new_user, guild)
+        task = asyncio.ensure_future(search_and_store())
+        _SEARCHES_IN_FLIGHT[key] = task
+        task.add_done_callback(lambda _: _SEARCHES_IN_FLIGHT.pop(key, None))
+
+    # Shielded so one caller giving up doesn't cancel the search for the others.
+    return await asyncio.shield(task)
+
+
+async def _search_all(query: str) -> list[Page]:
+    return [result async for result in search_wikipedia_generator(query)]
+
+
+async def rand_wiki() -> Article:
+    """Return a random popular wikipedia article.
+
+    Articles are popped from ``ARTICLE_POOL``, which is kept topped up in the
+    background, so this only waits on Wikipedia when the pool runs dry. Pooled
+    articles are records, with their links, redirects and censored excerpt ready.
+    """
+    return await ARTICLE_POOL.get()
 
 
-async def win_update(guild: int, user: User, score: int) -> None:
-    """Update the user in the database.
+async def loss_update(guilds: Iterable[int], user: User) -> None:
+    """Record a lost ranked game for the user.
 
     Args:
     ----
-    guild (int): The guild id.
+    guilds (Iterable[int]): The guild ids to record it in, e.g. the user's guild and the global ``0``.
     user (User): The user to update.
-    score (int): The score to update.
 
     Notes:
     -----
-    This interfaces directly with the database connection provided by database_core.py.
-    For more information on the functions used here, see database_core.py.
+    Every guild is updated in a single request, see ``DatabaseController.record_result``.
 
     """
-    uid = user.id
-    try:
-        db_ref_user = await DATA.get_user(guild, uid)
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="times_played",
-            value=db_ref_user["times_played"] + 1,
-        )
+    await DATA.record_result(guilds, user.id, name=user.global_name or user.name, won=False)
 
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="score",
-            value=db_ref_user["score"] + score,
-        )
 
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="last_played",
-            value=datetime.now(UTC).timestamp(),
-        )
+async def win_update(guilds: Iterable[int], user: User, score: int) -> None:
+    """Record a won ranked game for the user.
 
-        await DATA.update_value_for_user(
-            guild_id=guild,
-            user_id=uid,
-            key="wins",
-            value=db_ref_user["wins"] + 1,
-        )
+    Args:
+    ----
+    guilds (Iterable[int]): The guild ids to record it in, e.g. the user's guild and the global ``0``.
+    user (User): The user to update.
+    score (int): The score to add.
 
-    except NullUserError:
-        new_user = UserController(
-            info=_User(
-                name=user.global_name,
-                times_played=1,
-                wins=1,
-                score=score,
-                last_played=datetime.now(UTC).timestamp(),
-            ),
-        )
+    Notes:
+    -----
+    Every guild is updated in a single request, see ``DatabaseController.record_result``.
 
-        await DATA.add_user(uid, new_user, guild)
+    """
+    await DATA.record_result(guilds, user.id, name=user.global_name or user.name, won=True, score=score)
 
 
 def get_all_categories_from_article(article: Page) -> list[str]:
@@ -340,22 +518,32 @@ class ArticleGenerator:
     ----------
     categories (tuple[str]): A tuple of categories to search for.
     titles (list[str]): A list of titles to search for.
-    _current_article (Page): The current article.
-    _generated_articles (set[Page]): A set of generated articles.
+    concurrency (int): How many titles are resolved at once.
+    batch (bool): Resolve exact titles (following redirects) in batched queries before searching.
+    difficulty (Difficulty | None): Popularity tier of random articles, None for any.
+    _current_article (Article): The current article.
+    _generated_articles (set[Article]): A set of generated articles.
 
     """
 
     _article_limit: ClassVar[int] = 1_000
 
-    _current_article: Page
-    _generated_articles: set[Page]
+    _current_article: Article
+    _generated_articles: set[Article]
     categories: tuple[str]
     titles: list[str]
+    concurrency: int
+    batch: bool
+    difficulty: Difficulty | None
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         titles: Sequence[str] | None = None,
         categories: Sequence[str] | None = None,
+        *,
+        concurrency: int = TITLE_CONCURRENCY,
+        batch: bool = False,
+        difficulty: Difficulty | None = None,
     ) -> None:
         """Initialize the ArticleGenerator.
 
@@ -363,11 +551,18 @@ class ArticleGenerator:
         ----
         titles (Sequence[str]): A list of titles to search for.
         categories (Sequence[str]): A list of categories to search for.
+        concurrency (int): How many titles are resolved at once.
+        batch (bool): Resolve exact titles in batched queries (up to 50 per request) before searching.
+        difficulty (Difficulty | None): Draw random articles from this popularity tier only. The warm
+            pool is untiered, so tiered draws always wait on the backend.
 
         """
         self._current_article = None
         self.titles = titles or []
         self.categories = categories or ()
+        self.concurrency = concurrency
+        self.batch = batch
+        self.difficulty = difficulty
         self._generated_articles = set()
 
     # Make this class a generator that will iterate over subsequent calls to fetch_article.
@@ -375,7 +570,7 @@ class ArticleGenerator:
         """Return the generator."""
         return self
 
-    async def __anext__(self) -> Page:
+    async def __anext__(self) -> Article:
         """Return the next article."""
         try:
             return await self.fetch_article()
@@ -384,7 +579,7 @@ class ArticleGenerator:
             raise StopAsyncIteration from err
 
     @property
-    def current_article(self) -> Page:
+    def current_article(self) -> Article:
         """Return the current article."""
         return self._current_article
 
@@ -392,36 +587,39 @@ class ArticleGenerator:
         """Clear the cache."""
         self._generated_articles.clear()
 
-    async def fetch_article(self) -> Page:
+    async def fetch_article(self) -> Article:
         """Return an article. Functon that retrieves the next article from the generator."""
         return await anext(self.next_article())
 
-    async def next_article(self) -> AsyncGenerator[Page, None]:
+    async def next_article(self) -> AsyncGenerator[Article, None]:
         """Return a new article."""
         while True:
             self._current_article = await self.fetch_valid_article()
             yield self._current_article
 
-    async def fetch_valid_article(self) -> Page:
-        """Return a valid Page based on the current constraints."""
+    async def fetch_valid_article(self) -> Article:
+        """Return a valid article based on the current constraints."""
         articles = await self._articles_from_titles() if self.titles else []
 
         # Filter articles that have already been generated.
         articles = [article for article in articles if article not in self._generated_articles]
 
         if self.categories:
-            if not articles:
+            if articles:
+                articles = await BACKEND.with_categories(articles, self.categories)
+            else:
+                # Articles pulled from the categories are already filtered.
                 articles = await self._articles_from_categories()
 
             try:
-                article = secrets.choice([article for article in articles if self.article_has_categories(article)])
+                article = secrets.choice(articles)
 
             except IndexError as err:
                 message = f"No articles found in the categories: {self.categories}."
                 raise ArticleGeneratorError(message) from err
 
         elif not articles and not self.titles:
-            article = await self.random_article()
+            article = await self.random_article(self.difficulty)
 
         else:
             try:
@@ -436,32 +634,20 @@ class ArticleGenerator:
 
         return article
 
-    async def _articles_from_categories(self) -> list[Page]:
-        """Return an article from the list of categories."""
-        category_pages = {category: set(pywikibot.Category(site, category).articles()) for category in self.categories}
-
-        # If there are mutlitple categories, get the intersection of the articles.
-        articles = functools.reduce(set.union, category_pages.values())
-
-        # For each of these articles, check if they have all the categories.
-        articles = [article for article in articles if self.article_has_categories(article)]
-
-        try:
-            return articles
-
-        except IndexError as err:
-            message = "No articles found in the categories."
-            raise ArticleGeneratorError(message) from err
+    async def _articles_from_categories(self) -> list[Article]:
+        """Return a random new article in all of the categories."""
+        generated = {article.pageid for article in self._generated_articles}
+        return await BACKEND.category_articles(self.categories, exclude=generated)
 
-    async def _articles_from_titles(self) -> list[Page]:
+    async def _articles_from_titles(self) -> list[Article]:
         """Return an article from the list of titles."""
         # If categories are provided, do a broader search.
         if self.categories:
+            results = await self._resolve_concurrently(_search_all, self.titles)
             title_articles: dict[str, set[Page]] = defaultdict(set)
 
-            for title in self.titles:
-                async for article in search_wikipedia_generator(title):
-                    title_articles[title].add(article)
+            for title, found in zip(self.titles, results, strict=True):
+                title_articles[title].update(found)
 
             articles = {a for articles in title_articles.values() for a in articles}
 
@@ -480,7 +666,7 @@ class ArticleGenerator:
 
         else:
             # Get top page for each of the titles.
-            articles = [await search_wikipedia(title) for title in self.titles]
+            articles = await self._resolve_titles()
 
         if None in articles:
             titles_not_found = [
@@ -496,35 +682,162 @@ class ArticleGenerator:
 
         return articles
 
-    def article_has_categories(self, article: Page) -> bool:
-        """Return True if the article has all the categories."""
-        article_categories = get_all_categories_from_article(article)
-        article_categories = {category.casefold() for category in article_categories}
+    async def _resolve_titles(self) -> list[Article | None]:
+        """Return the top article for each title, in the order of the titles."""
+        resolved: dict[str, Article | None] = {}
 
-        return all(category.casefold() in article_categories for category in self.categories)
+        if self.batch:
+            records = await get_article_records(self.titles, extract_chars=0, links=0)
+            resolved = {title: record for title, record in records.items() if record is not None}
+
+        missing = [title for title in dict.fromkeys(self.titles) if title not in resolved]
+        found = await self._resolve_concurrently(search_wikipedia, missing)
+        resolved.update(zip(missing, found, strict=True))
+
+        return [resolved[title] for title in self.titles]
+
+    async def _resolve_concurrently[T](self, resolve: Callable[[str], Awaitable[T]], titles: Sequence[str]) -> list[T]:
+        """Run ``resolve`` on every title, at most ``concurrency`` at once, keeping the input order."""
+        slots = asyncio.Semaphore(max(self.concurrency, 1))
+
+        async def bounded(title: str) -> T:
+            async with slots:
+                return await resolve(title)
+
+        return await asyncio.gather(*(bounded(title) for title in titles))
+
+    def article_has_categories(self, article: Article) -> bool:
+        """Return True if the article has all the categories. Blocking with the live backend."""
+        return _has_categories(article, self.categories)
 
     @staticmethod
-    async def random_article() -> Page:
-        """Return a random article."""
-        date = rand_date()
-        date = f"{date.year}/{date.month:02}/{date.day:02}"
-        url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/en.wikipedia/all-access/{date}"
-        json = None
-        async with aiohttp.ClientSession(headers={"UserAgent": UA}) as session, session.get(url) as response:
-            json = await response.json()
-        try:
-            articles = json["items"][0]["articles"]
-            random.shuffle(articles)
-            title = articles[0]["article"]
-            page = Page(site, title)
-            if page.isRedirectPage() or not page.exists():
-                return await rand_wiki()
-        except KeyError as e:
-            logging.info("Wikiutils:\nFunc: random_article\nException: %s", e)
-            return await rand_wiki()
-        return page
+    async def random_article(difficulty: Difficulty | None = None) -> Article:
+        """Return a random article, in the ``difficulty`` tier if given."""
+        return await BACKEND.random_article(difficulty)
 
     @staticmethod
     def get_all_categories_from_article(article: Page) -> list[str]:
         """Return all categories from an article."""
         return [category.title().replace("Category:", "") for category in article.categories()]
+
+
+def _has_categories(article: Article, categories: Sequence[str]) -> bool:
+    """Return True if the article has all the categories, according to ``CATEGORY_INDEX``. Blocking."""
+    unindexed = []
+    for category in categories:
+        members = CATEGORY_INDEX.members(site, category)
+        if not members:
+            # Unknown to the index (e.g. a differently capitalised name), ask the article.
+            unindexed.append(category)
+        elif not CATEGORY_INDEX.contains(site, category, article.pageid):
+            return False
+
+    if not unindexed:
+        return True
+
+    page = article if isinstance(article, Page) else Page(site, article.title())
+    article_categories = {category.casefold() for category in get_all_categories_from_article(page)}
+
+    return all(category.casefold() in article_categories for category in unindexed)
+
+
+class LiveBackend(ArticleBackend):
+    """Backend serving everything from the live Wikipedia API, through ``WIKI_EXECUTOR``."""
+
+    async def search(self, query: str) -> Page | None:
+        """Return the page titled ``query``, else the best search result."""
+        return await WIKI_EXECUTOR.run(_search_wikipedia, query)
+
+    async def search_all(self, query: str, max_number: int) -> tuple[Page, ...]:
+        """Return up to ``max_number`` search results for ``query``."""
+        return await WIKI_EXECUTOR.run(_search, query, max_number)
+
+    async def random_article(self, difficulty: Difficulty | None = None) -> Page:
+        """Return a random article from the pageviews top list of a random day, weighted by views if ``RANDOM_WEIGHTED``.
+
+        Raises
+        ------
+        RetryBudgetExceededError: If no playable article was found within ``RANDOM_ARTICLE_RETRY``.
+
+        """
+
+        async def draw() -> list[str]:
+            return (await TOP_LISTS.ranked(rand_date())).sample(
+                RANDOM_CANDIDATES, difficulty, weighted=RANDOM_WEIGHTED
+            )
+
+        return await first_valid("random_article", draw, self._first_playable, RANDOM_ARTICLE_RETRY)
+
+    @staticmethod
+    async def _first_playable(titles: Sequence[str]) -> Page | None:
+        """Return the first title that exists and isn't a redirect, checked in a single request."""
+        records = await WIKI_EXECUTOR.run(fetch_records, site, titles, extract_chars=0, links=0)
+        for title in titles:
+            record = records.get(title)
+            # Redirects are followed, a playable title is its own record's title.
+            if record is not None and normalize_title(record.title()) == normalize_title(title):
+                return Page(site, record.title())
+        return None
+
+    async def records(self, titles: Iterable[str], **kwargs: object) -> dict[str, ArticleRecord | None]:
+        """Fetch the records of the titles in as few requests as possible."""
+        return await WIKI_EXECUTOR.run(fetch_records, site, titles, **kwargs)
+
+    async def sample_links(self, title: str, count: int, *, limit: int | None = None) -> list[str]:
+        """Return ``count`` mainspace titles drawn uniformly from the first ``limit`` the article links to."""
+        return await WIKI_EXECUTOR.run(sample_link_titles, site, title, count, limit=limit)
+
+    async def category_articles(self, categories: Sequence[str], *, exclude: set[int]) -> list[Page]:
+        """Return a random article in every category, skipping the page ids in ``exclude``."""
+        return await WIKI_EXECUTOR.run(self._category_articles, categories, exclude)
+
+    async def with_categories(self, articles: Iterable[Article], categories: Sequence[str]) -> list[Article]:
+        """Return the articles that are in every category."""
+        return await WIKI_EXECUTOR.run(
+            lambda: [article for article in articles if _has_categories(article, categories)]
+        )
+
+    @staticmethod
+    def _category_articles(categories: Sequence[str], exclude: set[int]) -> list[Page]:
+        # If there are mutlitple categories, get the intersection of the articles.
+        pageids = [pageid for pageid in CATEGORY_INDEX.intersection(site, categories) if pageid not in exclude]
+        if not pageids:
+            return []
+
+        # Only the chosen article is ever loaded.
+        return list(site.load_pages_from_pageids([secrets.choice(pageids)]))
+
+
+def _make_backend() -> ArticleBackend:
+    if os.environ.get("WIKI_BACKEND", "live") != "dump":
+        return LiveBackend()
+
+    top = os.environ.get("WIKI_DUMP_TOP", "")
+    return DumpBackend(
+        DumpReader(os.environ.get("WIKI_DUMP_PATH", str(CACHE_DIR / "enwiki.dump"))),
+        top=int(top) if top else None,
+    )
+
+
+# Where articles come from: the live API, or a local dump with WIKI_BACKEND=dump.
+BACKEND = _make_backend()
+
+
+async def _pooled_article() -> Article:
+    """Return a random article's record, with everything the games need fetched and its excerpt censored."""
+    article = await ArticleGenerator.random_article()
+    record = await get_article_record(article, redirects=True)
+    if record is None:
+        return article
+
+    censored_excerpt(record)
+    return record
+
+
+# Pool of validated random articles backing ``rand_wiki``.
+ARTICLE_POOL: WarmPool[Article] = WarmPool(
+    _pooled_article,
+    name="wiki_pool",
+    size=WARM_POOL_SIZE,
+    low_watermark=WARM_POOL_LOW_WATERMARK,
+)
@@ -0,0 +1,5 @@
+"""Local stand-in for the Wikipedia APIs, see ``tests.standin.server``."""
+
+from .server import StandIn, request_key
+
+__all__ = ["StandIn", "request_key"]
@@ -0,0 +1,38 @@
+"""Run the stand-in server: ``python -m tests.standin recordings.jsonl --port 8765 --latency 0.05``."""
+
+import argparse
+import asyncio
+import logging
+
+from .server import StandIn
+
+
+async def serve(arguments: argparse.Namespace) -> None:
+    """Serve until interrupted."""
+    standin = StandIn(
+        arguments.recordings, latency=arguments.latency, jitter=arguments.jitter, record=arguments.record
+    )
+    await standin.start(arguments.host, arguments.port)
+    for name, value in standin.environ().items():
+        print(f'{name}="{value}"')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await standin.stop()
+
+
+def main() -> None:
+    """Parse the arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recordings", help="JSON lines file of recorded responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added before every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds, up to this much.")
+    parser.add_argument("--record", action="store_true", help="Forward unknown requests upstream and record them.")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Record/replay stand-in for the MediaWiki Action API and the Wikimedia REST API.
+
+``StandIn`` is a local ``aiohttp`` server that answers every request from a
+JSON lines file of recorded responses, optionally after an injected delay, so
+timings are reproducible and nothing leaves the box. In record mode, requests
+without a recording are forwarded to the real upstream and the response is
+appended to the file.
+
+Requests are matched on method, path and parameters (query string and form
+body), ignoring parameters that change from run to run such as ``maxlag``.
+Point the bot at it with ``WIKI_API_URL``, ``PAGEVIEWS_URL``, ``WIKIPEDIA_URL``
+and ``API_NINJAS_URL``.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from collections import Counter
+from collections.abc import Mapping
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+# Parameters pywikibot varies between otherwise identical requests.
+IGNORED_PARAMS = frozenset({"maxlag", "requestid", "curtimestamp"})
+
+# Path prefix -> real service, used when recording.
+UPSTREAMS = {
+    "/w/": "https://en.wikipedia.org",
+    "/wiki/": "https://en.wikipedia.org",
+    "/api/rest_v1/": "https://wikimedia.org",
+    "/v1/": "https://api.api-ninjas.com",
+}
+
+type RequestKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+def request_key(method: str, path: str, params: Mapping[str, str]) -> RequestKey:
+    """Return the key a request is recorded and replayed under."""
+    return method.upper(), path, tuple(sorted((k, v) for k, v in params.items() if k not in IGNORED_PARAMS))
+
+
+class StandIn:
+    """Replaying HTTP server.
+
+    Attributes
+    ----------
+    path (Path): The JSON lines file of recordings.
+    latency (float): Seconds added before every response.
+    jitter (float): Up to this many seconds are added at random on top of ``latency``.
+    record (bool): Forward unknown requests upstream and record their responses.
+    calls (Counter[str]): Requests served per path.
+    misses (Counter[str]): Requests without a recording per path.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str | Path,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        record: bool = False,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the StandIn.
+
+        Args:
+        ----
+        path (str | Path): The JSON lines file of recordings. Created when recording.
+        latency (float): Seconds added before every response.
+        jitter (float): Up to this many seconds are added at random on top of ``latency``.
+        record (bool): Forward unknown requests upstream and record their responses.
+        seed (int): Seed of the jitter, so runs are reproducible.
+
+        """
+        self.path = Path(path)
+        self.latency = latency
+        self.jitter = jitter
+        self.record = record
+        self.calls: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self._random = random.Random(seed)  # noqa: S311
+        self._recordings: dict[RequestKey, dict] = {}
+        self._runner: web.AppRunner | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self.url = ""
+        self.load()
+
+    def load(self) -> None:
+        """(Re)load the recordings file."""
+        self._recordings.clear()
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._recordings[request_key(entry["method"], entry["path"], dict(entry["params"]))] = entry
+
+    def add(  # noqa: PLR0913
+        self,
+        method: str,
+        path: str,
+        params: Mapping[str, str],
+        body: object,
+        *,
+        status: int = 200,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Add a JSON recording in memory, e.g. from a test."""
+        entry = {
+            "headers": headers,
+            "method": method.upper(),
+            "path": path,
+            "params": sorted(params.items()),
+            "status": status,
+            "content_type": "application/json",
+            "body": json.dumps(body),
+        }
+        self._recordings[request_key(method, path, params)] = entry
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base url, e.g. ``http://127.0.0.1:8765``."""
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = site._server.sockets[0].getsockname()[:2]  # noqa: SLF001
+        self.url = f"http://{bound_host}:{bound_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def environ(self) -> dict[str, str]:
+        """Return the environment variables pointing the bot at this server."""
+        return {
+            "WIKI_API_URL": f"{self.url}/w/api.php",
+            "PAGEVIEWS_URL": f"{self.url}/api/rest_v1/metrics/pageviews/top/en.wikipedia/all-access/{{day}}",
+            "WIKIPEDIA_URL": self.url,
+            "API_NINJAS_URL": self.url,
+        }
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update({key: str(value) for key, value in (await request.post()).items()})
+
+        self.calls[request.path] += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        key = request_key(request.method, request.path, params)
+        entry = self._recordings.get(key)
+        if entry is None and self.record:
+            entry = await self._forward(request, params)
+        if entry is None:
+            self.misses[request.path] += 1
+            logging.info("Stand-in has no recording for %s", key)
+            return web.json_response({"error": {"code": "standin-miss", "info": repr(key)}}, status=404)
+
+        return web.Response(
+            text=entry["body"],
+            status=entry["status"],
+            content_type=entry["content_type"],
+            headers=entry.get("headers"),
+        )
+
+    async def _forward(self, request: web.Request, params: dict[str, str]) -> dict | None:
+        base = next((url for prefix, url in UPSTREAMS.items() if request.path.startswith(prefix)), None)
+        if base is None:
+            return None
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(headers={"User-Agent": request.headers.get("User-Agent", "")})
+        async with self._session.request(
+            request.method,
+            base + request.path,
+            params=params if request.method == "GET" else None,
+            data=params if request.method != "GET" else None,
+            allow_redirects=False,
+        ) as response:
+            entry = {
+                "method": request.method,
+                "path": request.path,
+                "params": sorted(params.items()),
+                "status": response.status,
+                "content_type": response.content_type,
+                "body": await response.text(),
+            }
+            if "Location" in response.headers:
+                # Keep redirects (e.g. Special:RandomInCategory) on the stand-in.
+                entry["headers"] = {"Location": response.headers["Location"].removeprefix(base)}
+
+        self._recordings[request_key(request.method, request.path, params)] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+        return entry
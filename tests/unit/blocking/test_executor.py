@@ -0,0 +1,84 @@
+"""Test the BlockingExecutor class."""
+# ruff: noqa: SLF001, S101, D103, PLR2004
+
+import asyncio
+import threading
+import time
+
+import pytest
+from src.blocking import BlockingCallTimeoutError, BlockingExecutor
+
+
+@pytest.mark.asyncio()
+async def test_runs_off_the_event_loop() -> None:
+    executor = BlockingExecutor("test_offloop", max_workers=2)
+
+    thread = await executor.run(threading.current_thread)
+
+    assert thread is not threading.current_thread()
+    assert thread.name.startswith("test_offloop")
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio()
+async def test_passes_arguments() -> None:
+    executor = BlockingExecutor("test_args", max_workers=1)
+
+    assert await executor.run(int, "ff", base=16) == 255
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio()
+async def test_loop_stays_responsive() -> None:
+    executor = BlockingExecutor("test_responsive", max_workers=1)
+    ticks = []
+
+    async def tick() -> None:
+        for _ in range(5):
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(executor.run(time.sleep, 0.1), tick())
+
+    assert len(ticks) == 5
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio()
+async def test_timeout() -> None:
+    executor = BlockingExecutor("test_timeout", max_workers=1, timeout=0.01)
+
+    with pytest.raises(BlockingCallTimeoutError):
+        await executor.run(time.sleep, 0.1)
+
+    # The slot is only handed back once the timed out call returns.
+    assert executor._slots.locked()
+    await asyncio.sleep(0.15)
+    assert not executor._slots.locked()
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio()
+async def test_bounded_concurrency() -> None:
+    executor = BlockingExecutor("test_bounded", max_workers=2)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work() -> None:
+        with lock:
+            running.append(None)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+    assert max(peak) == 2
+
+    executor.shutdown()
@@ -0,0 +1,164 @@
+"""Test the DatabaseController on SQLite storage."""
+# ruff: noqa: S101, D102, D103, PLR2004
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from src.blocking import BlockingExecutor
+from src.database import database_core
+from src.database.database_core import DatabaseController, NullUserError
+from src.database.sqlite import METRICS, SQLiteBackend
+from src.database.user import UserController, _User
+
+
+@pytest_asyncio.fixture()
+async def database(tmp_path: Path) -> AsyncIterator[DatabaseController]:
+    for cache in (database_core.USER_CACHE, database_core.LEADERBOARDS, database_core.RANK_INDEXES):
+        cache.clear()
+    database_core.EPOCHS.clear()
+    executor = BlockingExecutor("test_database", max_workers=2)
+    controller = DatabaseController(SQLiteBackend(tmp_path / "scores.sqlite3", executor))
+    yield controller
+    controller.close()
+    executor.shutdown()
+
+
+@pytest.mark.asyncio()
+async def test_record_result(database: DatabaseController) -> None:
+    await database.record_result([1, 0], 7, name="seven", won=True, score=30)
+    await database.record_result([1, 0], 8, name="eight", won=False)
+    await database.record_result([1, 0], 7, name="seven", won=False, score=5)
+
+    user = await database.get_user(1, 7)
+    assert user["score"] == 35
+    assert (user["wins"], user["failure"], user["times_played"]) == (1, 1, 2)
+    assert [record["name"] for record in await database.get_leaderboard(0)] == ["seven", "eight"]
+    assert await database.get_rank(1, 8) == (2, 2)
+    with pytest.raises(NullUserError):
+        await database.get_user(1, 9)
+
+
+@pytest.mark.asyncio()
+async def test_newcomer_joins_a_full_leaderboard(database: DatabaseController) -> None:
+    for user_id in range(1, 11):
+        await database.record_result([1], user_id, name=str(user_id), won=True, score=user_id * 10)
+    assert len(await database.get_leaderboard(1)) == 10
+    database_core.USER_CACHE.clear()
+    database_core.RANK_INDEXES.clear()
+
+    await database.record_result([1], 42, name="newcomer", won=True, score=500)
+
+    leaderboard = await database.get_leaderboard(1)
+    assert leaderboard[0]["name"] == "newcomer"
+    assert leaderboard[0]["score"] == 500
+
+
+@pytest.mark.asyncio()
+async def test_add_and_update_user(database: DatabaseController) -> None:
+    await database.add_user(7, UserController(_User(name="seven", score=12)), 1)
+    await database.update_value_for_user(1, "7", 20, "score")
+
+    assert (await database.get_user(1, 7))["score"] == 20
+    database_core.USER_CACHE.clear()
+    assert (await database.get_user(1, 7))["score"] == 20
+
+
+@pytest.mark.asyncio()
+async def test_reset_scores(database: DatabaseController) -> None:
+    await database.record_result([1], 7, name="seven", won=True, score=30)
+    await database.record_result([1], 8, name="eight", won=True, score=10)
+
+    assert await database.reset_scores(1) == 1
+
+    assert (await database.get_user(1, 7))["score"] == 0
+    assert await database.get_leaderboard(1) == []
+    assert await database.get_rank(1, 7) == (1, 2)
+
+    await database.record_result([1], 8, name="eight", won=True, score=4)
+    assert [record["name"] for record in await database.get_leaderboard(1)] == ["eight"]
+    assert await database.get_rank(1, 7) == (2, 2)
+    # The previous season stays in the records.
+    database_core.USER_CACHE.clear()
+    assert (await database.get_server(1))["7"]["score"] == 0
+    assert (await database.get_all_servers())[1]["7"]["score"] == 30
+
+
+class UnrankedSQLite(SQLiteBackend):
+    """SQLiteBackend without rank queries, like Firebase, counting its guild reads."""
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+        self.guild_reads = 0
+
+    async def get_guild(self, guild_id: int) -> dict[str, dict]:
+        self.guild_reads += 1
+        return await super().get_guild(guild_id)
+
+    async def rank(self, guild_id: int, score_field: str, user_id: str) -> None:  # noqa: ARG002
+        return None
+
+
+@pytest.mark.asyncio()
+async def test_ranks_read_the_guild_once(tmp_path: Path) -> None:
+    executor = BlockingExecutor("test_ranks", max_workers=2)
+    storage = UnrankedSQLite(tmp_path / "scores.sqlite3", executor)
+    database = DatabaseController(storage)
+    database_core.RANK_INDEXES.clear()
+    await database.record_result([1, 0], 7, name="seven", won=True, score=30)
+
+    assert await database.get_rank(0, 7) == (1, 1)
+    assert storage.guild_reads == 1
+
+    await database.record_result([1, 0], 8, name="eight", won=True, score=40)
+    await database.record_result([1, 0], 9, name="nine", won=False)
+    database_core.USER_CACHE.clear()
+    await database.record_result([1, 0], 7, name="seven", won=True, score=20)
+
+    assert await database.get_rank(0, 7) == (1, 3)
+    assert await database.get_rank(0, 8) == (2, 3)
+    assert await database.get_rank(0, 9) == (3, 3)
+    assert await database.get_neighbours(0, 9, 1) == [("8", 40), ("9", 0)]
+    assert storage.guild_reads == 1
+    database.close()
+    executor.shutdown()
+
+
+class CountingSQLite(SQLiteBackend):
+    """SQLiteBackend counting its user reads."""
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+        self.user_reads = 0
+
+    async def get_user(self, guild_id: int, user_id: str) -> dict | None:
+        self.user_reads += 1
+        return await super().get_user(guild_id, user_id)
+
+
+@pytest.mark.asyncio()
+async def test_writes_go_through_the_user_cache(tmp_path: Path) -> None:
+    executor = BlockingExecutor("test_user_cache", max_workers=2)
+    storage = CountingSQLite(tmp_path / "scores.sqlite3", executor)
+    database = DatabaseController(storage)
+    database_core.USER_CACHE.clear()
+    hits, misses = METRICS.counter("user_cache.hits"), METRICS.counter("user_cache.misses")
+
+    await database.add_user(7, UserController(_User(name="seven", score=12)), 1)
+    assert (await database.get_user(1, 7))["score"] == 12
+    await database.record_result([1], 7, name="seven", won=True, score=30)
+    user = await database.get_user(1, 7)
+
+    assert (user["score"], user["wins"], user["times_played"]) == (42, 1, 1)
+    assert storage.user_reads == 0
+    # record_result reads the cached copy to update it, then each get_user hits.
+    assert METRICS.counter("user_cache.hits") - hits == 3
+    assert METRICS.counter("user_cache.misses") == misses
+
+    await database.record_result([1], 8, name="eight", won=False)
+    assert (await database.get_user(1, 8))["failure"] == 1
+    assert storage.user_reads == 1
+    assert METRICS.counter("user_cache.misses") - misses == 2
+    database.close()
+    executor.shutdown()
@@ -0,0 +1,31 @@
+"""Test the score seasons."""
+# ruff: noqa: S101, D103, PLR2004
+
+from src.database.epochs import current, current_records, key_epoch, score_key, stored
+
+RECORD = {"name": "player", "score": 120, "score_1": 40, "wins": 3}
+
+
+def test_score_key() -> None:
+    assert score_key(0) == "score"
+    assert score_key(2) == "score_2"
+    assert key_epoch("score") == 0
+    assert key_epoch("score_2") == 2
+
+
+def test_current_reads_the_epochs_score() -> None:
+    assert current(RECORD, 0) == {"name": "player", "score": 120, "wins": 3}
+    assert current(RECORD, 1) == {"name": "player", "score": 40, "wins": 3}
+    assert current(RECORD, 2) == {"name": "player", "score": 0, "wins": 3}
+
+
+def test_current_records() -> None:
+    assert current_records({"7": RECORD}, 1) == {"7": {"name": "player", "score": 40, "wins": 3}}
+
+
+def test_stored_round_trips() -> None:
+    new = {"name": "player", "score": 5, "wins": 0}
+
+    assert stored(new, 0) == new
+    assert stored(new, 3) == {"name": "player", "score_3": 5, "wins": 0}
+    assert current(stored(new, 3), 3) == new
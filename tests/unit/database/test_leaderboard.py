@@ -0,0 +1,39 @@
+"""Test the TopK leaderboard."""
+# ruff: noqa: S101, D103, PLR2004
+
+from src.database.leaderboard import TopK
+
+RECORDS = {str(user_id): {"name": f"player {user_id}", "score": user_id * 10} for user_id in range(20)}
+
+
+def test_keeps_the_best() -> None:
+    board = TopK(3, RECORDS)
+
+    assert [record["score"] for record in board.top()] == [190, 180, 170]
+    assert 19 in board
+    assert "16" not in board
+    assert board.score(17) == 170
+    assert board.score(1) is None
+
+
+def test_updates_move_players_in_and_out() -> None:
+    board = TopK(3, RECORDS)
+
+    board.update(1, {"name": "player 1", "score": 175})
+    assert [record["name"] for record in board.top()] == ["player 19", "player 18", "player 1"]
+    assert 17 not in board
+
+    board.update(2, {"name": "player 2", "score": 100})
+    assert 2 not in board
+
+    board.update(1, {"name": "player 1", "score": 500})
+    assert board.top()[0] == {"name": "player 1", "score": 500}
+    assert len(board) == 3
+
+
+def test_small_guilds() -> None:
+    board = TopK(10, {"1": {"name": "only", "score": 5}})
+    board.update(2, {"name": "new", "score": 0})
+
+    assert [record["name"] for record in board.top()] == ["only", "new"]
+    assert TopK(0, RECORDS).top() == []
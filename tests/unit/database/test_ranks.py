@@ -0,0 +1,99 @@
+"""Test the RankIndex order statistics."""
+# ruff: noqa: S101, S311, D103, PLR2004
+
+import random
+
+from src.database.ranks import FenwickTree, RankIndex
+
+RECORDS = {str(user_id): {"name": f"player {user_id}", "score": user_id * 10} for user_id in range(20)}
+
+
+def test_fenwick_tree_grows() -> None:
+    tree = FenwickTree(2)
+    tree.add(0, 1)
+    tree.add(9, 2)
+
+    assert tree.size >= 10
+    assert tree.prefix(0) == 1
+    assert tree.prefix(8) == 1
+    assert tree.prefix(100) == 3
+    assert tree.find(0) == 0
+    assert tree.find(1) == 9
+
+
+def test_rank() -> None:
+    index = RankIndex.from_records(RECORDS, bucket_width=25)
+
+    assert len(index) == 20
+    assert index.rank(19) == 1
+    assert index.rank("0") == 20
+    assert index.rank(12) == 8
+    assert index.rank(42) is None
+
+
+def test_ties_share_a_rank() -> None:
+    index = RankIndex(bucket_width=10)
+    for user_id, score in [(1, 50), (2, 30), (3, 50), (4, 10)]:
+        index.set(user_id, score)
+
+    assert index.rank(1) == index.rank(3) == 1
+    assert index.rank(2) == 3
+    assert index.rank(4) == 4
+
+
+def test_updates_move_players() -> None:
+    index = RankIndex.from_records(RECORDS, bucket_width=25)
+
+    index.set(0, 1000)
+    assert index.rank(0) == 1
+    assert index.rank(19) == 2
+
+    index.set(0, 0)
+    index.remove(19)
+    assert 19 not in index
+    assert len(index) == 19
+    assert index.rank(18) == 1
+    assert index.score(0) == 0
+
+
+def test_around() -> None:
+    index = RankIndex.from_records(RECORDS, bucket_width=25)
+
+    assert index.around(10, 1) == [("11", 110), ("10", 100), ("9", 90)]
+    assert index.around(19, 2) == [("19", 190), ("18", 180), ("17", 170)]
+    assert index.around(42) == []
+
+
+def test_players_without_points() -> None:
+    index = RankIndex.from_records({str(user_id): {"score": 0} for user_id in range(1000)}, bucket_width=25)
+    index.set("new", 0)
+    index.set("7", 5)
+
+    assert index.rank("new") == index.rank("0") == 2
+    assert index.rank(7) == 1
+    assert index.around("7", 2) == [("7", 5), ("0", 0), ("1", 0)]
+    assert index.around("999", 1) == [("998", 0), ("999", 0), ("new", 0)]
+
+    index.remove("new")
+    index.set("1", 30)
+    assert index.around("0", 1) == [("7", 5), ("0", 0), ("10", 0)]
+    assert len(index) == 1000
+
+
+def test_matches_sorting() -> None:
+    rng = random.Random(4)
+    index = RankIndex(bucket_width=7)
+    scores: dict[str, int] = {}
+    for _ in range(300):
+        user_id = str(rng.randrange(60))
+        if rng.random() < 0.1:
+            index.remove(user_id)
+            scores.pop(user_id, None)
+        else:
+            scores[user_id] = rng.choice([0, rng.randrange(500)])
+            index.set(user_id, scores[user_id])
+
+    ordered = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    for position, (user_id, score) in enumerate(ordered):
+        assert index.rank(user_id) == 1 + sum(other > score for other in scores.values())
+        assert index.around(user_id, 0) == [ordered[position]]
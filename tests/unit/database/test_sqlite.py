@@ -0,0 +1,96 @@
+"""Test the SQLiteBackend storage."""
+# ruff: noqa: S101, D103, PLR2004
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from src.blocking import BlockingExecutor
+from src.database.sqlite import SQLiteBackend
+from src.database.storage import UserChange
+
+
+@pytest_asyncio.fixture()
+async def storage(tmp_path: Path) -> AsyncIterator[SQLiteBackend]:
+    executor = BlockingExecutor("test_sqlite", max_workers=2)
+    backend = SQLiteBackend(tmp_path / "scores.sqlite3", executor)
+    yield backend
+    backend.close()
+    executor.shutdown()
+
+
+def _game(guild_id: int, user_id: str, score: int, *, field: str = "score") -> UserChange:
+    return UserChange(
+        guild_id, user_id, fields={"name": f"player {user_id}"}, increments={field: score, "times_played": 1}
+    )
+
+
+@pytest.mark.asyncio()
+async def test_uses_wal(storage: SQLiteBackend) -> None:
+    await storage.get_epoch(1)
+
+    assert storage._connect().execute("PRAGMA journal_mode").fetchone() == ("wal",)  # noqa: SLF001
+
+
+@pytest.mark.asyncio()
+async def test_set_and_get_user(storage: SQLiteBackend) -> None:
+    record = {"name": "a", "last_played": 1.5, "score": 10, "score_1": 3, "times_played": 2, "wins": 1, "failure": 1}
+    await storage.set_user(1, "7", record)
+
+    assert await storage.get_user(1, "7") == record
+    assert await storage.get_user(1, "8") is None
+    assert await storage.get_user(2, "7") is None
+
+    await storage.set_user(1, "7", {"name": "b", "score": 1})
+    assert await storage.get_user(1, "7") == {
+        "name": "b",
+        "last_played": 0,
+        "score": 1,
+        "times_played": 0,
+        "wins": 0,
+        "failure": 0,
+    }
+
+
+@pytest.mark.asyncio()
+async def test_commit_creates_and_increments(storage: SQLiteBackend) -> None:
+    await storage.commit([_game(1, "7", 5), _game(0, "7", 5)])
+    await storage.commit([_game(1, "7", 3)])
+
+    user = await storage.get_user(1, "7")
+    assert user["score"] == 8
+    assert user["times_played"] == 2
+    assert user["name"] == "player 7"
+    assert (await storage.get_all()).keys() == {0, 1}
+
+
+@pytest.mark.asyncio()
+async def test_top_and_rank(storage: SQLiteBackend) -> None:
+    await storage.commit([_game(1, str(user_id), user_id * 10) for user_id in range(1, 21)])
+    await storage.commit([_game(1, "21", 0), _game(1, "5", 50, field="score_1")])
+
+    top = await storage.top(1, "score", 3)
+    assert [record["score"] for record in top.values()] == [200, 190, 180]
+    assert list(top) == ["20", "19", "18"]
+    assert await storage.top(1, "score_1", 3) == {
+        "5": {"name": "player 5", "last_played": 0, "times_played": 2, "wins": 0, "failure": 0, "score_1": 50}
+    }
+
+    assert await storage.rank(1, "score", "20") == (1, 21)
+    assert await storage.rank(1, "score", "1") == (20, 21)
+    assert await storage.rank(1, "score_1", "5") == (1, 21)
+    # Players without a score in the epoch share the last rank.
+    assert await storage.rank(1, "score_1", "20") == (2, 21)
+    assert await storage.rank(1, "score", "42") == (None, 21)
+
+
+@pytest.mark.asyncio()
+async def test_epochs(storage: SQLiteBackend) -> None:
+    assert await storage.get_epoch(1) == 0
+
+    await storage.start_epoch(1, 1, [{"name": "a", "score": 3}])
+    await storage.start_epoch(1, 2)
+
+    assert await storage.get_epoch(1) == 2
+    assert await storage.get_epoch(2) == 0
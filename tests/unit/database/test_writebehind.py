@@ -0,0 +1,206 @@
+"""Test the WriteBehind buffer."""
+# ruff: noqa: S101, D102, D103, PLR2004
+
+import asyncio
+import os
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from src.blocking import BlockingCallTimeoutError, BlockingExecutor
+from src.database import writebehind
+from src.database.sqlite import SQLiteBackend
+from src.database.storage import BatchId, UserChange
+from src.database.writebehind import METRICS, WriteBehind, merge
+
+
+class FlakySQLite(SQLiteBackend):
+    """SQLiteBackend counting its commits.
+
+    They fail while ``failing`` is set, and time out after being applied while ``timing_out`` is set.
+    """
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+        self.commits: list[int] = []
+        self.failing = False
+        self.timing_out = False
+
+    async def commit(self, changes: Sequence[UserChange], batch: BatchId | None = None) -> None:
+        if self.failing:
+            raise OSError
+        self.commits.append(len(changes))
+        await super().commit(changes, batch)
+        if self.timing_out:
+            raise BlockingCallTimeoutError(self.path.name, 1)
+
+
+@pytest_asyncio.fixture()
+async def storage(tmp_path: Path) -> AsyncIterator[FlakySQLite]:
+    executor = BlockingExecutor("test_writebehind", max_workers=1)
+    backend = FlakySQLite(tmp_path / "scores.sqlite3", executor)
+    yield backend
+    backend.close()
+    executor.shutdown()
+
+
+def _game(user_id: str, score: int, *, guild_id: int = 1) -> UserChange:
+    return UserChange(guild_id, user_id, fields={"name": user_id}, increments={"score": score, "times_played": 1})
+
+
+def test_merge() -> None:
+    merged = merge(_game("7", 3), _game("7", 4))
+    assert merged.increments == {"score": 7, "times_played": 2}
+    assert merged.fields == {"name": "7"}
+
+    reset = merge(merge(_game("7", 3), UserChange(1, "7", fields={"score": 0})), _game("7", 2))
+    assert reset.fields == {"name": "7", "score": 2}
+    assert reset.increments == {"times_played": 2}
+
+
+@pytest.mark.asyncio()
+async def test_coalesces_commits(storage: FlakySQLite, tmp_path: Path) -> None:
+    buffer = WriteBehind(storage, tmp_path / "journal", interval=60)
+    for score in (1, 2, 3):
+        await buffer.commit([_game("7", score), _game("7", score, guild_id=0)])
+
+    assert buffer.pending == 2
+    assert (await buffer.get_user(1, "7"))["score"] == 6
+    assert await storage.get_user(1, "7") is None
+
+    await buffer.flush()
+
+    assert storage.commits == [2]
+    assert (await storage.get_user(0, "7"))["times_played"] == 3
+    assert not (tmp_path / "journal").exists()
+    buffer.close()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="directories are only synced on POSIX")
+@pytest.mark.asyncio()
+async def test_syncs_the_journal(storage: FlakySQLite, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    synced: list[int] = []
+    fsync = os.fsync
+
+    def recording_fsync(descriptor: int) -> None:
+        synced.append(os.fstat(descriptor).st_ino)
+        fsync(descriptor)
+
+    monkeypatch.setattr(writebehind.os, "fsync", recording_fsync)
+    buffer = WriteBehind(storage, tmp_path / "journal", interval=60)
+    await buffer.commit([_game("7", 1)])
+    directory, journal = tmp_path.stat().st_ino, (tmp_path / "journal").stat().st_ino
+
+    # The new journal's directory entry, then the line, before the commit returns.
+    assert synced == [directory, journal]
+
+    await buffer.flush()
+
+    # The rename to the flushing journal, then its batch token.
+    assert synced == [directory, journal, directory, journal]
+    buffer.close()
+
+
+@pytest.mark.asyncio()
+async def test_flushes_when_full(storage: FlakySQLite, tmp_path: Path) -> None:
+    buffer = WriteBehind(storage, tmp_path / "journal", interval=60, max_entries=2)
+    await buffer.commit([_game("7", 1)])
+    await asyncio.sleep(0.05)
+    assert storage.commits == []
+
+    await buffer.commit([_game("8", 1)])
+    await asyncio.sleep(0.05)
+    assert storage.commits == [2]
+    buffer.close()
+
+
+@pytest.mark.asyncio()
+async def test_replays_the_journal(storage: FlakySQLite, tmp_path: Path) -> None:
+    buffer = WriteBehind(storage, tmp_path / "journal", interval=60)
+    await buffer.commit([_game("7", 5)])
+    await buffer.commit([_game("7", 1)])
+    buffer.close()
+    # Cut short by a crash.
+    with (tmp_path / "journal").open("a") as journal:
+        journal.write('[[1, "8", {}')
+
+    replayed = WriteBehind(storage, tmp_path / "journal", interval=60)
+    assert replayed.pending == 1
+    await replayed.flush()
+
+    assert (await storage.get_user(1, "7"))["score"] == 6
+    assert await storage.get_user(1, "8") is None
+    replayed.close()
+
+
+@pytest.mark.asyncio()
+async def test_failed_flush_keeps_the_changes(storage: FlakySQLite, tmp_path: Path) -> None:
+    buffer = WriteBehind(storage, tmp_path / "journal", interval=60)
+    await buffer.commit([_game("7", 5)])
+    storage.failing = True
+    with pytest.raises(OSError):  # noqa: PT011
+        await buffer.flush()
+
+    await buffer.commit([_game("7", 1)])
+    # The failed batch is kept apart from the newer changes.
+    assert buffer.pending == 2
+    assert (await buffer.get_user(1, "7"))["score"] == 6
+    buffer.close()
+
+    # Both journals are replayed after a crash, oldest first.
+    storage.failing = False
+    replayed = WriteBehind(storage, tmp_path / "journal", interval=60)
+    await replayed.flush()
+    assert (await storage.get_user(1, "7"))["score"] == 6
+    assert not (tmp_path / "journal.flushing").exists()
+    replayed.close()
+
+
+@pytest.mark.asyncio()
+async def test_replays_only_the_flushing_journal(storage: FlakySQLite, tmp_path: Path) -> None:
+    buffer = WriteBehind(storage, tmp_path / "journal", name="test_replay_depth", interval=60)
+    await buffer.commit([_game("7", 5)])
+    await buffer.commit([_game("8", 1)])
+    storage.failing = True
+    with pytest.raises(OSError):  # noqa: PT011
+        await buffer.flush()
+    buffer.close()
+
+    storage.failing = False
+    replayed = WriteBehind(storage, tmp_path / "journal", name="test_replay_depth", interval=60)
+    assert METRICS.snapshot()["gauges"]["test_replay_depth.journal_depth"] == 2
+    await replayed.flush()
+    assert METRICS.snapshot()["gauges"]["test_replay_depth.journal_depth"] == 0
+    replayed.close()
+
+
+@pytest.mark.asyncio()
+async def test_timed_out_batch_is_committed_once(storage: FlakySQLite, tmp_path: Path) -> None:
+    buffer = WriteBehind(storage, tmp_path / "journal", interval=60)
+    await buffer.commit([_game("7", 5)])
+    storage.timing_out = True
+    with pytest.raises(BlockingCallTimeoutError):
+        await buffer.flush()
+    storage.timing_out = False
+
+    # Applied, though the buffer couldn't know.
+    assert (await buffer.get_user(1, "7"))["score"] == 5
+    await buffer.commit([_game("7", 1)])
+    await buffer.flush()
+    assert storage.commits == [1, 1]
+    assert (await storage.get_user(1, "7"))["score"] == 6
+
+    # Nor is it committed again when replayed after a crash.
+    storage.timing_out = True
+    await buffer.commit([_game("7", 2)])
+    with pytest.raises(BlockingCallTimeoutError):
+        await buffer.flush()
+    buffer.close()
+    storage.timing_out = False
+    replayed = WriteBehind(storage, tmp_path / "journal", interval=60)
+    assert replayed.pending == 1
+    await replayed.flush()
+    assert (await storage.get_user(1, "7"))["score"] == 8
+    assert not (tmp_path / "journal.flushing").exists()
+    replayed.close()
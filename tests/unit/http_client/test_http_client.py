@@ -0,0 +1,57 @@
+"""Test the shared HttpClient."""
+# ruff: noqa: SLF001, S101, D103, PLR2004
+
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from src.http_client import METRICS, HttpClient, UnknownUpstreamError
+
+
+@pytest_asyncio.fixture()
+async def server_url() -> AsyncIterator[str]:
+    async def echo(request: web.Request) -> web.Response:
+        return web.json_response({"headers": dict(request.headers)})
+
+    app = web.Application()
+    app.router.add_get("/", echo)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    yield f"http://127.0.0.1:{port}/"
+
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio()
+async def test_connections_are_reused(server_url: str) -> None:
+    METRICS.reset()
+    client = HttpClient()
+    client.add_upstream("local", timeout=5, headers={"User-Agent": "test"})
+
+    for _ in range(5):
+        async with client.get(server_url, upstream="local") as response:
+            body = await response.json()
+
+    assert body["headers"]["User-Agent"] == "test"
+    stats = client.stats()
+    assert stats["requests"] == 5
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 4
+    assert METRICS.counter("http.local.requests") == 5
+
+    await client.close()
+
+
+@pytest.mark.asyncio()
+async def test_unknown_upstream() -> None:
+    client = HttpClient()
+
+    with pytest.raises(UnknownUpstreamError):
+        client.get("http://127.0.0.1/", upstream="nope")
+
+    await client.close()
@@ -0,0 +1,61 @@
+"""Test the TTLCache class."""
+# ruff: noqa: S101, D102, D103, PLR2004
+
+from src.lru import METRICS, TTLCache
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = Clock()
+    cache: TTLCache[str, int] = TTLCache(4, ttl=10, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_and_negative_results() -> None:
+    clock = Clock()
+    cache: TTLCache[str, int | None] = TTLCache(4, ttl=10, clock=clock)
+    missing = object()
+    cache.put("nothing", None, ttl=2)
+
+    assert cache.get("nothing", missing) is None
+    assert "nothing" in cache
+    clock.now = 2
+    assert cache.get("nothing", missing) is missing
+
+
+def test_size_bound_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_hits_and_misses_are_counted() -> None:
+    METRICS.reset()
+    cache: TTLCache[str, int] = TTLCache(2, ttl=60, name="queries")
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    assert METRICS.counter("queries.hits") == 1
+    assert METRICS.counter("queries.misses") == 1
@@ -0,0 +1,85 @@
+"""Test the bounded retry helpers."""
+# ruff: noqa: S101, D103, PLR2004
+
+from collections.abc import Sequence
+
+import pytest
+from src.retry import METRICS, RetryBudgetExceededError, RetryPolicy, first_valid, retry
+
+FAST = RetryPolicy(attempts=4, base_delay=0.001, max_delay=0.002, retry_on=(KeyError,))
+
+
+@pytest.mark.asyncio()
+async def test_retry_until_a_result() -> None:
+    results = iter([None, None, "found"])
+
+    async def attempt() -> str | None:
+        return next(results)
+
+    assert await retry("test_until", attempt, FAST) == "found"
+    assert METRICS.counter("retry.test_until.attempts") == 3
+    assert METRICS.counter("retry.test_until.retries") == 2
+
+
+@pytest.mark.asyncio()
+async def test_retry_gives_up_after_the_attempt_budget() -> None:
+    calls = 0
+
+    async def attempt() -> None:
+        nonlocal calls
+        calls += 1
+        raise KeyError(calls)
+
+    with pytest.raises(RetryBudgetExceededError) as info:
+        await retry("test_attempts", attempt, FAST)
+
+    assert calls == 4
+    assert isinstance(info.value.__cause__, KeyError)
+    assert METRICS.counter("retry.test_attempts.errors") == 4
+    assert METRICS.counter("retry.test_attempts.exhausted") == 1
+
+
+@pytest.mark.asyncio()
+async def test_retry_gives_up_after_the_deadline() -> None:
+    calls = 0
+
+    async def attempt() -> None:
+        nonlocal calls
+        calls += 1
+
+    with pytest.raises(RetryBudgetExceededError):
+        await retry("test_deadline", attempt, RetryPolicy(attempts=1_000, deadline=0))
+
+    assert calls == 1
+
+
+@pytest.mark.asyncio()
+async def test_other_errors_propagate() -> None:
+    async def attempt() -> None:
+        raise ValueError
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        await retry("test_propagate", attempt, FAST)
+
+
+@pytest.mark.asyncio()
+async def test_first_valid_checks_whole_batches() -> None:
+    batches = iter([[], [1, 3], [5, 6, 8]])
+    checked = []
+
+    async def draw() -> list[int]:
+        return next(batches)
+
+    async def validate(candidates: Sequence[int]) -> int | None:
+        checked.append(list(candidates))
+        return next((candidate for candidate in candidates if candidate % 2 == 0), None)
+
+    assert await first_valid("test_batches", draw, validate, FAST) == 6
+    assert checked == [[1, 3], [5, 6, 8]]
+
+
+def test_delays_grow_within_bounds() -> None:
+    policy = RetryPolicy(base_delay=1, max_delay=3)
+
+    assert all(0 <= policy.delay(1) <= 1 for _ in range(100))
+    assert all(0 <= policy.delay(10) <= 3 for _ in range(100))
@@ -0,0 +1,74 @@
+"""Test the record/replay stand-in server."""
+# ruff: noqa: S101, D103, PLR2004
+
+import json
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import aiohttp
+import pytest
+import pytest_asyncio
+
+from tests.standin import StandIn
+
+SITEINFO = {"batchcomplete": True, "query": {"general": {"sitename": "Wikipedia"}}}
+
+
+@pytest_asyncio.fixture()
+async def standin(tmp_path: Path) -> AsyncIterator[StandIn]:
+    recording = {
+        "method": "GET",
+        "path": "/w/api.php",
+        "params": [["action", "query"], ["meta", "siteinfo"]],
+        "status": 200,
+        "content_type": "application/json",
+        "body": json.dumps(SITEINFO),
+    }
+    path = tmp_path / "recordings.jsonl"
+    path.write_text(json.dumps(recording) + "\n")
+
+    server = StandIn(path)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.mark.asyncio()
+async def test_replays_recordings_ignoring_volatile_params(standin: StandIn) -> None:
+    async with aiohttp.ClientSession() as session:
+        params = {"meta": "siteinfo", "action": "query", "maxlag": "5"}
+        async with session.get(f"{standin.url}/w/api.php", params=params) as response:
+            assert response.status == 200
+            assert await response.json() == SITEINFO
+
+        # The method is part of the key.
+        async with session.post(f"{standin.url}/w/api.php", data=params) as response:
+            assert response.status == 404
+
+        async with session.get(f"{standin.url}/w/api.php", params={"action": "parse"}) as response:
+            assert response.status == 404
+            assert (await response.json())["error"]["code"] == "standin-miss"
+
+    assert standin.calls["/w/api.php"] == 3
+    assert standin.misses["/w/api.php"] == 2
+
+
+@pytest.mark.asyncio()
+async def test_injected_latency(standin: StandIn) -> None:
+    standin.latency = 0.05
+    standin.add("GET", "/api/rest_v1/metrics/pageviews/top/x", {}, {"items": []})
+
+    async with aiohttp.ClientSession() as session:
+        start = time.perf_counter()
+        async with session.get(f"{standin.url}/api/rest_v1/metrics/pageviews/top/x") as response:
+            assert await response.json() == {"items": []}
+        assert time.perf_counter() - start >= 0.05
+
+
+def test_environ_points_at_server(standin: StandIn) -> None:
+    environ = standin.environ()
+
+    assert environ["WIKI_API_URL"] == f"{standin.url}/w/api.php"
+    assert environ["PAGEVIEWS_URL"].startswith(standin.url)
+    assert environ["PAGEVIEWS_URL"].endswith("/{day}")
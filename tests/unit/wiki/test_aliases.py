@@ -0,0 +1,22 @@
+"""Test the TitleAliases class."""
+# ruff: noqa: S101, D103
+
+from src.wiki.aliases import TitleAliases, normalize_title
+from src.wiki.metadata import ArticleRecord
+
+
+def test_normalize_title() -> None:
+    assert normalize_title("  Pokémon_Red  and   Blue ") == "pokemon red and blue"
+    assert normalize_title("STRASSE") == normalize_title("straße")
+
+
+def test_matches_canonical_title_and_redirects() -> None:
+    record = ArticleRecord(pageid=1, name="Python (programming language)", redirects=("Python language", "Python3"))
+    aliases = TitleAliases.from_record(record)
+
+    assert aliases.canonical == "Python (programming language)"
+    assert aliases.matches("python (Programming Language)")
+    assert aliases.matches("python_language")
+    assert aliases.matches("PYTHON3")
+    assert not aliases.matches("Python")
+    assert not aliases.matches("Monty Python")
@@ -0,0 +1,73 @@
+"""Test the CategoryIndex class."""
+# ruff: noqa: SLF001, S101, D102, D103, PLR2004
+
+from array import array
+from pathlib import Path
+
+import pytest
+from src.wiki.categories import CategoryIndex, category_key
+
+MEMBERS = {
+    "Astronomy": [30, 10, 20, 40],
+    "Physics": [50, 20, 40, 60],
+    "Empty": [],
+}
+
+
+class FakeIndex(CategoryIndex):
+    """CategoryIndex with canned category members instead of API calls."""
+
+    fetched: list[str]
+
+    def fetch(self, site: object, category: str) -> array:  # noqa: ARG002
+        self.fetched.append(category)
+        return array("I", sorted(MEMBERS.get(category, ())))
+
+
+@pytest.fixture()
+def index(tmp_path: Path) -> FakeIndex:
+    index = FakeIndex(tmp_path / "categories.sqlite3")
+    index.fetched = []
+    return index
+
+
+def test_category_key() -> None:
+    assert category_key("Category:programming_languages") == "Programming languages"
+    assert category_key("  Astronomy ") == "Astronomy"
+
+
+def test_members_are_sorted_and_cached(index: FakeIndex) -> None:
+    assert list(index.members(None, "Astronomy")) == [10, 20, 30, 40]
+    assert list(index.members(None, "Category:astronomy")) == [10, 20, 30, 40]
+
+    assert index.fetched == ["Astronomy"]
+
+
+def test_intersection(index: FakeIndex) -> None:
+    assert index.intersection(None, ["Astronomy", "Physics"]) == [20, 40]
+    assert index.intersection(None, ["Astronomy", "Empty"]) == []
+    assert index.intersection(None, []) == []
+
+
+def test_contains(index: FakeIndex) -> None:
+    assert index.contains(None, "Physics", 60)
+    assert not index.contains(None, "Physics", 10)
+
+
+def test_persisted_across_instances(tmp_path: Path, index: FakeIndex) -> None:
+    index.members(None, "Astronomy")
+
+    reopened = FakeIndex(tmp_path / "categories.sqlite3")
+    reopened.fetched = []
+
+    assert list(reopened.members(None, "Astronomy")) == [10, 20, 30, 40]
+    assert reopened.fetched == []
+
+
+def test_ttl_expiry(index: FakeIndex) -> None:
+    index.ttl = 0
+
+    index.members(None, "Astronomy")
+    index.members(None, "Astronomy")
+
+    assert index.fetched == ["Astronomy", "Astronomy"]
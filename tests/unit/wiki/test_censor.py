@@ -0,0 +1,30 @@
+"""Test the title censoring of excerpts."""
+# ruff: noqa: S101, D103
+
+from src.wiki.censor import CENSORED, censor_excerpt, title_pattern
+
+
+def test_every_case_and_diacritic_variant() -> None:
+    excerpt = censor_excerpt("Antonín Dvořák", "Antonin Dvorak (DVOŘÁK) was Czech. ANTONÍN dvořák wrote.")
+
+    assert excerpt.text == f"{CENSORED} {CENSORED} ({CENSORED}) was Czech. {CENSORED} {CENSORED} wrote."
+    assert excerpt.sentences == (f"{CENSORED} {CENSORED} ({CENSORED}) was Czech", f" {CENSORED} {CENSORED} wrote")
+
+
+def test_letters_casefolding_to_several() -> None:
+    assert censor_excerpt("Straße", "Die Straße ist lang.").text == f"Die {CENSORED} ist lang."
+    assert censor_excerpt("Straße", "STRASSE, strasse.").text == f"{CENSORED}, {CENSORED}."
+
+
+def test_short_words_only_as_whole_words() -> None:
+    excerpt = censor_excerpt("A Song of Ice and Fire", "Andrew sang songs of fire and ice.")
+
+    assert excerpt.text == f"Andrew sang {CENSORED}s {CENSORED} {CENSORED} {CENSORED} {CENSORED}."
+
+
+def test_punctuation_in_titles() -> None:
+    excerpt = censor_excerpt("Python (programming language)", "Python is a language. Pythonic programs.")
+
+    assert excerpt.sentences == (f"{CENSORED} is a {CENSORED}", f" {CENSORED}ic programs")
+    assert title_pattern("(...)") is None
+    assert censor_excerpt("(...)", "Nothing. To hide.").sentences == ("Nothing", " To hide")
@@ -0,0 +1,114 @@
+"""Test the memory-mapped dump and its backend."""
+# ruff: noqa: S101, D103, PLR2004
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from src.wiki.backend import DumpBackend
+from src.wiki.dump import DumpFormatError, DumpReader, import_dump
+from src.wiki.pageviews import Difficulty
+
+ARTICLES = [
+    {
+        "pageid": 23862,
+        "title": "Python (programming language)",
+        "revid": 42,
+        "extract": "Python is a high-level, general-purpose programming language.",
+        "links": ["Guido van Rossum", "Zen of Python"],
+        "categories": ["Category:Programming languages", "Dynamically typed programming languages"],
+        "redirects": ["Python language", "Python3"],
+        "views": 500,
+    },
+    {
+        "pageid": 7,
+        "title": "Pythonidae",
+        "categories": ["Snakes"],
+        "views": 900,
+    },
+    {
+        "pageid": 99,
+        "title": "Ruby (programming language)",
+        "categories": ["Programming languages"],
+    },
+]
+
+
+@pytest.fixture()
+def dump(tmp_path: Path) -> Iterator[DumpReader]:
+    lines = (json.dumps(article) for article in ARTICLES)
+    assert import_dump(lines, tmp_path / "test.dump") == 3
+
+    reader = DumpReader(tmp_path / "test.dump")
+    yield reader
+    reader.close()
+
+
+def test_lookup_titles_and_redirects(dump: DumpReader) -> None:
+    record = dump.lookup("python_(Programming language)")
+
+    assert record.pageid == 23862
+    assert record.revid == 42
+    assert record.links == ("Guido van Rossum", "Zen of Python")
+    assert record.redirects == ("Python language", "Python3")
+    assert dump.lookup("PYTHON3") == record
+    assert dump.lookup("Python") is None
+    assert dump.get(99).title() == "Ruby (programming language)"
+    assert dump.get(8) is None
+    assert len(dump) == 3
+
+
+def test_prefix_search(dump: DumpReader) -> None:
+    titles = [record.title() for record in dump.prefix("python", 10)]
+
+    assert titles == ["Python (programming language)", "Pythonidae"]
+    assert len(dump.prefix("python", 1)) == 1
+    assert dump.prefix("java") == []
+
+
+def test_random_picks_by_views(dump: DumpReader) -> None:
+    assert dump.random(top=1).title() == "Pythonidae"
+    assert {dump.random().pageid for _ in range(50)} <= {7, 23862}
+    assert dump.random(2, start=1).title() == "Python (programming language)"
+    assert dump.ranked == 2
+
+
+def test_category_members(dump: DumpReader) -> None:
+    assert list(dump.category_members("Programming_languages")) == [99, 23862]
+    assert list(dump.category_members("Category:Snakes")) == [7]
+    assert list(dump.category_members("Lizards")) == []
+
+
+def test_rejects_other_files(tmp_path: Path) -> None:
+    (tmp_path / "other").write_bytes(b"not a dump" * 100)
+
+    with pytest.raises(DumpFormatError):
+        DumpReader(tmp_path / "other")
+
+
+@pytest.mark.asyncio()
+async def test_backend(dump: DumpReader) -> None:
+    backend = DumpBackend(dump)
+
+    assert (await backend.search("Python language")).pageid == 23862
+    assert (await backend.search("Pythoni")).pageid == 7
+    assert await backend.search("Java") is None
+
+    records = await backend.records(["Python3", "Java"], extract_chars=0, links=1)
+    assert records["Python3"].summary == ""
+    assert records["Python3"].links == ("Guido van Rossum",)
+    assert records["Java"] is None
+    assert sorted(await backend.sample_links("Python3", 5)) == ["Guido van Rossum", "Zen of Python"]
+    assert len(await backend.sample_links("Python3", 5, limit=1)) == 1
+    assert await backend.sample_links("Java", 5) == []
+
+    categories = ["Programming languages", "Dynamically typed programming languages"]
+    assert [record.pageid for record in await backend.category_articles(categories, exclude=set())] == [23862]
+    assert await backend.category_articles(categories, exclude={23862}) == []
+
+    assert (await backend.random_article(Difficulty.HARD)).pageid in {7, 23862}
+    assert (await backend.random_article(Difficulty.EASY)).pageid == 7
+
+    articles = [dump.get(7), dump.get(99)]
+    assert await backend.with_categories(articles, ["Programming languages"]) == [dump.get(99)]
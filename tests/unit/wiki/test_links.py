@@ -0,0 +1,69 @@
+"""Test the streaming of link titles."""
+# ruff: noqa: S101, D102, D103, PLR2004
+
+from src.wiki.links import iter_link_titles, reservoir_sample, sample_link_titles
+
+
+class FakeRequest:
+    """Stand-in for ``pywikibot.data.api.Request``."""
+
+    def __init__(self, response: dict) -> None:
+        self.response = response
+
+    def submit(self) -> dict:
+        return self.response
+
+
+class FakeSite:
+    """Stand-in for ``pywikibot.site.APISite`` serving links 500 at a time."""
+
+    def __init__(self, links: int) -> None:
+        self.titles = [f"Link {number:05}" for number in range(links)]
+        self.requests = []
+
+    def simple_request(self, **parameters: object) -> FakeRequest:
+        self.requests.append(parameters)
+        start = int(parameters.get("plcontinue", 0))
+        stop = start + parameters["pllimit"]
+        response = {
+            "query": {"pages": [{"title": "Big", "links": [{"ns": 0, "title": t} for t in self.titles[start:stop]]}]}
+        }
+        if stop < len(self.titles):
+            response["continue"] = {"plcontinue": str(stop), "continue": "||"}
+        return FakeRequest(response)
+
+
+def test_streams_every_page() -> None:
+    site = FakeSite(1_200)
+
+    titles = iter_link_titles(site, "Big")
+
+    assert next(titles) == "Link 00000"
+    assert len(site.requests) == 1
+    assert len(list(titles)) == 1_199
+    assert len(site.requests) == 3
+    assert site.requests[0]["plnamespace"] == [0]
+
+
+def test_limit_stops_early() -> None:
+    site = FakeSite(1_200)
+
+    assert list(iter_link_titles(site, "Big", limit=3)) == ["Link 00000", "Link 00001", "Link 00002"]
+    assert site.requests[0]["pllimit"] == 3
+    assert list(iter_link_titles(site, "Big", limit=0)) == []
+    assert len(list(iter_link_titles(site, "Big", limit=700))) == 700
+    assert len(site.requests) == 3
+
+
+def test_reservoir_sample() -> None:
+    assert sorted(reservoir_sample(range(2), 3)) == [0, 1]
+    assert reservoir_sample([], 3) == []
+
+    sample = reservoir_sample(range(10_000), 5)
+    assert len(set(sample)) == 5
+    # The whole range is drawn from, not just its start.
+    assert any(item >= 500 for _ in range(20) for item in reservoir_sample(range(10_000), 5))
+
+    titles = sample_link_titles(FakeSite(1_200), "Big", 3, limit=1_000)
+    assert len(set(titles)) == 3
+    assert all(title < "Link 01000" for title in titles)
@@ -0,0 +1,117 @@
+"""Test the batched metadata fetch."""
+# ruff: noqa: SLF001, S101, D102, D103, PLR2004
+
+import pytest
+from src.wiki.metadata import ArticleRecord, fetch_records
+
+
+class FakeRequest:
+    """Stand-in for ``pywikibot.data.api.Request``."""
+
+    def __init__(self, response: dict) -> None:
+        self.response = response
+
+    def submit(self) -> dict:
+        return self.response
+
+
+class FakeSite:
+    """Stand-in for ``pywikibot.site.APISite`` replaying canned responses."""
+
+    def __init__(self, *responses: dict) -> None:
+        self.responses = list(responses)
+        self.requests = []
+
+    def simple_request(self, **parameters: object) -> FakeRequest:
+        self.requests.append(parameters)
+        return FakeRequest(self.responses.pop(0))
+
+
+PYTHON = {
+    "pageid": 23862,
+    "ns": 0,
+    "title": "Python (programming language)",
+    "lastrevid": 42,
+    "fullurl": "https://en.wikipedia.org/wiki/Python_(programming_language)",
+    "extract": "Python is a high-level, general-purpose programming language.",
+    "original": {"source": "https://upload.wikimedia.org/python.svg"},
+    "links": [{"ns": 0, "title": "Guido van Rossum"}],
+}
+
+
+@pytest.fixture()
+def python_site() -> FakeSite:
+    return FakeSite(
+        {
+            "continue": {"plcontinue": "23862|0|ABC", "continue": "||"},
+            "query": {
+                "normalized": [{"from": "python_(programming_language)", "to": "Python (programming language)"}],
+                "redirects": [{"from": "Python language", "to": "Python (programming language)"}],
+                "pages": [PYTHON, {"ns": 0, "title": "Nope", "missing": True}],
+            },
+        },
+        {
+            "query": {
+                "pages": [
+                    {
+                        "pageid": 23862,
+                        "ns": 0,
+                        "title": "Python (programming language)",
+                        "links": [{"ns": 0, "title": "Zen of Python"}],
+                    },
+                ],
+            },
+        },
+    )
+
+
+def test_single_query_for_every_property(python_site: FakeSite) -> None:
+    records = fetch_records(python_site, ["python_(programming_language)", "Python language", "Nope"], links=2)
+
+    record = records["python_(programming_language)"]
+    assert records["Python language"] == record
+    assert records["Nope"] is None
+
+    assert record.pageid == 23862
+    assert record.revid == 42
+    assert record.title() == "Python (programming language)"
+    assert record.image_url == "https://upload.wikimedia.org/python.svg"
+    assert record.links == ("Guido van Rossum", "Zen of Python")
+
+    # One query, plus one continuation for the missing link.
+    assert len(python_site.requests) == 2
+    assert python_site.requests[1]["plcontinue"] == "23862|0|ABC"
+    assert set(python_site.requests[0]["prop"]) == {"info", "pageimages", "extracts", "links"}
+
+
+def test_stops_once_enough_links(python_site: FakeSite) -> None:
+    records = fetch_records(python_site, ["Python language"], links=1)
+
+    assert records["Python language"].links == ("Guido van Rossum",)
+    assert len(python_site.requests) == 1
+
+
+def test_optional_props() -> None:
+    site = FakeSite({"query": {"pages": [PYTHON]}})
+
+    fetch_records(site, ["Python (programming language)"], extract_chars=0, links=0, categories=True)
+
+    assert set(site.requests[0]["prop"]) == {"info", "pageimages", "categories"}
+
+
+def test_record_extract() -> None:
+    record = ArticleRecord(pageid=1, name="Test", summary="one two three")
+
+    assert record.extract() == "one two three"
+    assert record.extract(chars=9) == "one two"
+
+
+def test_redirect_titles() -> None:
+    page = {**PYTHON, "redirects": [{"ns": 0, "title": "Python language"}, {"ns": 0, "title": "Python3"}]}
+    site = FakeSite({"query": {"pages": [page]}})
+
+    records = fetch_records(site, ["Python (programming language)"], extract_chars=0, links=0, redirects=True)
+
+    assert records["Python (programming language)"].redirects == ("Python language", "Python3")
+    assert "redirects" in site.requests[0]["prop"]
+    assert site.requests[0]["rdnamespace"] == 0
@@ -0,0 +1,105 @@
+"""Test the TopListCache class."""
+# ruff: noqa: SLF001, S101, D103, PLR2004
+
+from datetime import date
+from pathlib import Path
+
+import pytest
+from src.http_client import HttpClient
+from src.wiki.pageviews import Difficulty, PageviewsCacheMissError, RankedTitles, TopListCache, is_article
+
+SAMPLE = [("Main_Page", 5_000_000), ("Python_(programming_language)", 12_345), ("Tab\tless", 7)]
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> TopListCache:
+    return TopListCache(tmp_path / "pageviews.sqlite3", http=HttpClient(), memory_size=2)
+
+
+def test_put_and_get_roundtrip(cache: TopListCache) -> None:
+    cache.put(date(2020, 1, 1), SAMPLE)
+
+    assert cache.get(date(2020, 1, 1)) == SAMPLE
+    assert cache.get(date(2020, 1, 2)) is None
+    assert cache.days == ["2020-01-01"]
+
+
+def test_persisted_across_instances(tmp_path: Path, cache: TopListCache) -> None:
+    cache.put(date(2020, 1, 1), SAMPLE)
+
+    reopened = TopListCache(tmp_path / "pageviews.sqlite3", http=HttpClient())
+
+    assert reopened.get(date(2020, 1, 1)) == SAMPLE
+
+
+@pytest.mark.asyncio()
+async def test_draw_fetches_once(cache: TopListCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    async def fetch(day: date) -> list[tuple[str, int]]:
+        calls.append(day)
+        return SAMPLE
+
+    monkeypatch.setattr(cache, "fetch", fetch)
+
+    assert await cache.draw(date(2020, 1, 1)) == SAMPLE
+    assert await cache.draw(date(2020, 1, 1)) == SAMPLE
+    assert calls == [date(2020, 1, 1)]
+
+
+@pytest.mark.asyncio()
+async def test_cache_only_reuses_cached_days(cache: TopListCache) -> None:
+    cache.cache_only = True
+
+    with pytest.raises(PageviewsCacheMissError):
+        await cache.draw(date(2020, 1, 1))
+
+    cache.put(date(2019, 5, 5), SAMPLE)
+
+    assert await cache.draw(date(2020, 1, 1)) == SAMPLE
+
+
+def test_non_articles_are_dropped() -> None:
+    assert is_article("Python_(programming_language)")
+    assert is_article("Star_Wars:_The_Last_Jedi")
+    assert not is_article("Main_Page")
+    assert not is_article("Special:Search")
+    assert not is_article("user talk:Example")
+
+    ranked = RankedTitles([*SAMPLE, ("Special:Search", 900_000)])
+    assert ranked.titles == ["Python_(programming_language)", "Tab\tless"]
+    assert set(ranked.sample(50)) <= {"Python_(programming_language)", "Tab\tless"}
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_sample_within_tiers(weighted: bool) -> None:  # noqa: FBT001
+    ranked = RankedTitles([(f"Article_{rank}", 1_000 - rank) for rank in range(100)])
+
+    def ranks(difficulty: Difficulty) -> set[int]:
+        return {int(title.split("_")[1]) for title in ranked.sample(200, difficulty, weighted=weighted)}
+
+    assert ranks(Difficulty.EASY) <= set(range(10))
+    assert ranks(Difficulty.MEDIUM) <= set(range(10, 40))
+    assert ranks(Difficulty.HARD) <= set(range(40, 100))
+    assert len(ranked.sample(3)) <= 3
+    assert RankedTitles([]).sample(3) == []
+
+
+def test_weighted_sample_follows_views() -> None:
+    ranked = RankedTitles([("Popular", 999_999), ("Obscure", 1)])
+
+    assert ranked.sample(1, weighted=True) == ["Popular"]
+    # Uniform by default.
+    assert set(ranked.sample(200)) == {"Popular", "Obscure"}
+    assert Difficulty.HARD.ranks(2) == (0, 2)
+    assert Difficulty.EASY.ranks(1) == (0, 1)
+
+
+@pytest.mark.asyncio()
+async def test_lists_are_indexed_once(cache: TopListCache) -> None:
+    cache.put(date(2020, 1, 1), SAMPLE)
+
+    ranked = await cache.ranked(date(2020, 1, 1))
+
+    assert ranked is await cache.ranked(date(2020, 1, 1))
+    assert ranked.articles == SAMPLE
@@ -0,0 +1,84 @@
+"""Test the WarmPool class."""
+# ruff: noqa: SLF001, S101, D103, PLR2004
+
+import asyncio
+import itertools
+
+import pytest
+from src.wiki.pool import WarmPool
+
+
+def make_producer() -> tuple[list[int], callable]:
+    """Return a list of produced items and a producer appending to it."""
+    produced = []
+    counter = itertools.count()
+
+    async def producer() -> int:
+        item = next(counter)
+        produced.append(item)
+        return item
+
+    return produced, producer
+
+
+@pytest.mark.asyncio()
+async def test_pool_fills_to_size() -> None:
+    produced, producer = make_producer()
+    pool = WarmPool(producer, name="test_pool_fill", size=4)
+
+    pool.start()
+    await asyncio.sleep(0.01)
+
+    assert pool.depth == 4
+    assert produced == [0, 1, 2, 3]
+
+    await pool.stop()
+
+
+@pytest.mark.asyncio()
+async def test_pool_pops_in_order_and_refills() -> None:
+    _, producer = make_producer()
+    pool = WarmPool(producer, name="test_pool_refill", size=4, low_watermark=3)
+
+    pool.start()
+    await asyncio.sleep(0.01)
+
+    assert [await pool.get() for _ in range(2)] == [0, 1]
+
+    await asyncio.sleep(0.01)
+    assert pool.depth == 4
+
+    await pool.stop()
+
+
+@pytest.mark.asyncio()
+async def test_pool_miss_produces_inline() -> None:
+    _, producer = make_producer()
+    pool = WarmPool(producer, name="test_pool_miss", size=0)
+
+    assert await pool.get() == 0
+    assert pool.stats()["misses"] == 1
+    assert pool.stats()["miss_rate"] == 1.0
+    assert not pool.running
+
+
+@pytest.mark.asyncio()
+async def test_pool_survives_producer_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.wiki.pool._RETRY_DELAY", 0)
+    calls = []
+
+    async def producer() -> int:
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError
+        return len(calls)
+
+    pool = WarmPool(producer, name="test_pool_errors", size=1)
+
+    pool.start()
+    await asyncio.sleep(0.01)
+
+    assert pool.running
+    assert await pool.get() == 2
+
+    await pool.stop()
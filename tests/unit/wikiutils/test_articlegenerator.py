@@ -1,8 +1,12 @@
 """Test the ArticleGenerator class."""
-# ruff: noqa: SLF001, S101, D103
+# ruff: noqa: SLF001, S101, D103, PLR2004
+
+import asyncio
 
 import pytest
 from pywikibot import Page
+from src import wikiutils
+from src.wiki.metadata import ArticleRecord
 from src.wikiutils import ArticleGenerator, ArticleGeneratorError
 
 
@@ -158,3 +162,57 @@ async def test_articlegenerator_as_iterator() -> None:
 
     assert len(recieved) == len(article_gen.titles)
     assert all(article in article_gen._generated_articles for article in recieved)
+
+
+class FakeSearch:
+    """Stand-in for ``search_wikipedia`` counting the searches running at once."""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.most_running = 0
+        self.searched: list[str] = []
+
+    async def __call__(self, title: str) -> ArticleRecord | None:
+        """Return the best match for ``title``, None for "Nowhere"."""
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        self.searched.append(title)
+        # Later titles finish first, so results only come back in order if they are put back in order.
+        await asyncio.sleep(0.01 / (len(self.searched) + 1))
+        self.running -= 1
+        return None if title == "Nowhere" else ArticleRecord(pageid=len(title), name=f"{title} (searched)")
+
+
+@pytest.mark.asyncio()
+async def test_titles_resolve_concurrently_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    search = FakeSearch()
+    monkeypatch.setattr(wikiutils, "search_wikipedia", search)
+    titles = [f"Title {number}" for number in range(10)]
+    article_gen = ArticleGenerator(titles=titles, concurrency=3)
+
+    resolved = await article_gen._resolve_titles()
+
+    assert [article.title() for article in resolved] == [f"{title} (searched)" for title in titles]
+    assert search.most_running == 3
+
+
+@pytest.mark.asyncio()
+async def test_batch_resolves_titles_in_one_lookup(monkeypatch: pytest.MonkeyPatch) -> None:
+    search = FakeSearch()
+    lookups: list[list[str]] = []
+
+    async def get_article_records(titles: list[str], **_: object) -> dict[str, ArticleRecord | None]:
+        lookups.append(list(titles))
+        return {title: ArticleRecord(pageid=1, name=title) if title == "Exact" else None for title in titles}
+
+    monkeypatch.setattr(wikiutils, "search_wikipedia", search)
+    monkeypatch.setattr(wikiutils, "get_article_records", get_article_records)
+    article_gen = ArticleGenerator(titles=["Fuzzy", "Exact", "Nowhere"], batch=True)
+
+    resolved = await article_gen._resolve_titles()
+
+    assert lookups == [["Fuzzy", "Exact", "Nowhere"]]
+    assert search.searched == ["Fuzzy", "Nowhere"]
+    assert resolved[0].title() == "Fuzzy (searched)"
+    assert resolved[1].title() == "Exact"
+    assert resolved[2] is None
@@ -3,7 +3,9 @@
 
 import pytest
 import pywikibot
-from src.wikiutils import get_all_categories_from_article, rand_wiki, site
+from src import wikiutils
+from src.wiki.metadata import ArticleRecord
+from src.wikiutils import get_all_categories_from_article, make_embed, rand_wiki, site
 
 N_RAND_WIKI_TESTS = 10
 
@@ -41,3 +43,36 @@ async def test_get_all_categories_from_article(sample_astronomy_articles: list[p
 
         # All example articles should alsohave any single other category.
         assert len(categories) > 1
+
+
+class UnloadedPage:
+    """Stand-in for a ``pywikibot.Page``, whose revision is only known after a request."""
+
+    def title(self) -> str:
+        """Return the page's title."""
+        return "Cached"
+
+
+@pytest.mark.asyncio()
+async def test_embeds_are_cached_by_revision(monkeypatch: pytest.MonkeyPatch) -> None:
+    revision = [5]
+    fetches: list[str] = []
+
+    async def get_article_record(article: UnloadedPage, **_: object) -> ArticleRecord:
+        fetches.append(article.title())
+        return ArticleRecord(pageid=1, name=article.title(), revid=revision[0], summary=f"Revision {revision[0]}")
+
+    monkeypatch.setattr(wikiutils, "_revision_key", lambda _: (1, revision[0]))
+    monkeypatch.setattr(wikiutils, "get_article_record", get_article_record)
+    wikiutils.EMBED_CACHE.clear()
+    page = UnloadedPage()
+
+    first = await make_embed(page)
+    again = await make_embed(page)
+    assert fetches == ["Cached"]
+    assert again.description == first.description
+
+    revision[0] = 6
+    edited = await make_embed(page)
+    assert fetches == ["Cached", "Cached"]
+    assert edited.description.startswith("Revision 6")